@@ -0,0 +1 @@
+"""Benchmarks and synthetic data for log-efficient-mcp (not shipped with the package)."""
@@ -0,0 +1,250 @@
+"""Deterministic synthetic log generator for the benchmarks.
+
+The same `GeneratorConfig` always produces byte-identical output. Lines are
+timestamp-ordered; their lengths follow a log-normal distribution around
+`line_length`, with a `long_line_rate` share of `long_line_bytes` lines
+(minified payloads). A `match_rate` share of lines are `ERROR ... upstream
+timeout code=50x latency_ms=N` events and a `rare_rate` share contain
+`checksum mismatch`, giving dense and rare search targets of known
+selectivity. Output is plain text or JSON lines, optionally gzip/zstd
+compressed (zstd needs the optional `zstandard` package).
+
+    python -m bench.generate /tmp/app.log --size 1G --format json --compression gzip
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import random
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+DENSE_QUERY = "upstream timeout"
+RARE_QUERY = "checksum mismatch"
+EXTRACT_QUERY = r"code=(\d+) latency_ms=(\d+)"
+BATCH_LINES = 10_000
+START_EPOCH = 1_714_521_600  # 2024-05-01T00:00:00Z
+
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+_SERVICES = ["api", "auth", "billing", "search", "worker", "scheduler", "gateway", "cache"]
+_LEVELS = ["INFO"] * 90 + ["DEBUG"] * 6 + ["WARN"] * 4
+_MESSAGES = [
+    "request completed",
+    "cache hit for key",
+    "scheduled job finished",
+    "connection pool resized",
+    "user session refreshed",
+    "retrying idempotent call",
+    "flushed metrics batch",
+    "loaded configuration",
+]
+_WORDS = [
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet",
+    "kilo", "lima", "mike", "november", "oscar", "papa", "quebec", "romeo", "sierra", "tango",
+]  # fmt: skip
+_PAYLOAD_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    size_bytes: int = 100 << 20
+    format: str = "plain"
+    compression: str = "none"
+    line_length: int = 120
+    length_sigma: float = 0.5
+    long_line_rate: float = 0.0005
+    long_line_bytes: int = 64 << 10
+    match_rate: float = 0.01
+    rare_rate: float = 0.00001
+    seed: int = 1
+
+    def key(self) -> str:
+        raw = json.dumps(asdict(self), sort_keys=True)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+    def file_name(self) -> str:
+        suffix = {"none": "", "gzip": ".gz", "zstd": ".zst"}[self.compression]
+        ext = "jsonl" if self.format == "json" else "log"
+        return f"synthetic-{self.format}-{self.size_bytes >> 20}m-{self.key()}.{ext}{suffix}"
+
+
+def parse_size(text: str) -> int:
+    """`100M`, `1.5G`, `4096` -> bytes."""
+    text = text.strip().upper().removesuffix("B").removesuffix("I")
+    unit = text[-1] if text and text[-1] in _SIZE_UNITS else ""
+    return int(float(text[: len(text) - len(unit)]) * _SIZE_UNITS[unit])
+
+
+def _open_output(path: Path, compression: str):
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise RuntimeError("zstd output needs the optional `zstandard` package.") from exc
+        return zstandard.ZstdCompressor(level=3).stream_writer(path.open("wb"), closefd=True)
+    if compression != "none":
+        raise ValueError(f"Unknown compression: {compression}")
+    return path.open("wb")
+
+
+class _LineMaker:
+    def __init__(self, config: GeneratorConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.clock_ms = START_EPOCH * 1000
+        self.second = -1
+        self.stamp_prefix = ""
+        self.mu = math.log(max(16, config.line_length))
+
+    def _stamp(self) -> str:
+        self.clock_ms += self.rng.randint(0, 3)
+        second, ms = divmod(self.clock_ms, 1000)
+        if second != self.second:
+            self.second = second
+            self.stamp_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        return f"{self.stamp_prefix}.{ms:03d}"
+
+    def _target_length(self) -> int:
+        if self.rng.random() < self.config.long_line_rate:
+            return self.config.long_line_bytes
+        return int(self.rng.lognormvariate(self.mu, self.config.length_sigma))
+
+    def _filler(self, length: int) -> str:
+        if length <= 0:
+            return ""
+        if length > 4096:
+            # Minified payloads: one base64-like token.
+            return "payload=" + "".join(self.rng.choices(_PAYLOAD_ALPHABET, k=length))
+        words = []
+        size = 0
+        while size < length:
+            word = self.rng.choice(_WORDS)
+            words.append(word)
+            size += len(word) + 1
+        return " ".join(words)
+
+    def line(self) -> tuple[str, str]:
+        """Return `(line, kind)` where kind is `dense`, `rare`, or `plain`."""
+        rng = self.rng
+        stamp = self._stamp()
+        service = rng.choice(_SERVICES)
+        request = f"{rng.getrandbits(48):012x}"
+        roll = rng.random()
+        if roll < self.config.rare_rate:
+            kind, level, message = "rare", "ERROR", f"{RARE_QUERY} on block {rng.randint(0, 1 << 20)}"
+            code, latency = 500, rng.randint(1, 50)
+        elif roll < self.config.rare_rate + self.config.match_rate:
+            kind, level, message = "dense", "ERROR", DENSE_QUERY
+            code, latency = rng.choice((502, 503, 504)), rng.randint(1000, 30000)
+        else:
+            kind, level, message = "plain", rng.choice(_LEVELS), rng.choice(_MESSAGES)
+            code, latency = 200, rng.randint(1, 900)
+        target = self._target_length()
+        if self.config.format == "json":
+            record = {
+                "ts": stamp + "Z",
+                "level": level.lower(),
+                "service": service,
+                "request_id": request,
+                "msg": message,
+                "code": code,
+                "latency_ms": latency,
+            }
+            body = json.dumps(record, separators=(",", ":"))
+            pad = target - len(body)
+            if pad > 12:
+                record["detail"] = self._filler(pad - 12)
+                body = json.dumps(record, separators=(",", ":"))
+            return body + "\n", kind
+        pid = rng.randint(100, 999)
+        head = f"{stamp} {level} {service}[{pid}]: {message} req={request} code={code} latency_ms={latency}"
+        filler = self._filler(target - len(head) - 1)
+        return (f"{head} {filler}\n" if filler else head + "\n"), kind
+
+
+def generate(path: Path, config: GeneratorConfig) -> dict[str, object]:
+    """Write up to `config.size_bytes` of uncompressed log text to `path`; return counts for the benchmarks."""
+    maker = _LineMaker(config)
+    counts = {"dense": 0, "rare": 0, "plain": 0}
+    written = 0
+    lines = 0
+    started = time.perf_counter()
+    with _open_output(path, config.compression) as out:
+        while written < config.size_bytes:
+            batch = []
+            for _ in range(BATCH_LINES):
+                line, kind = maker.line()
+                batch.append(line)
+                counts[kind] += 1
+            data = "".join(batch).encode("utf-8")
+            if written + len(data) > config.size_bytes:
+                keep = data.rfind(b"\n", 0, config.size_bytes - written) + 1
+                dropped = data[keep:]
+                counts["dense"] -= dropped.count(DENSE_QUERY.encode())
+                counts["rare"] -= dropped.count(RARE_QUERY.encode())
+                data = data[:keep]
+                if not data:
+                    break
+            out.write(data)
+            written += len(data)
+            lines += data.count(b"\n")
+    return {
+        "path": str(path),
+        "config": asdict(config),
+        "bytes": path.stat().st_size,
+        "uncompressed_bytes": written,
+        "lines": lines,
+        "dense_matches": counts["dense"],
+        "rare_matches": counts["rare"],
+        "generate_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def ensure_dataset(data_dir: Path, config: GeneratorConfig) -> dict[str, object]:
+    """Generate the dataset for `config` once; later calls reuse it via a `.meta.json` sidecar."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    path = data_dir / config.file_name()
+    meta_path = path.with_name(path.name + ".meta.json")
+    if path.exists() and meta_path.exists():
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    meta = generate(path, config)
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return meta
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--size", default="100M", help="uncompressed size, e.g. 100M, 1G, 10G")
+    parser.add_argument("--format", choices=("plain", "json"), default="plain")
+    parser.add_argument("--compression", choices=("none", "gzip", "zstd"), default="none")
+    parser.add_argument("--line-length", type=int, default=GeneratorConfig.line_length, help="median line length")
+    parser.add_argument("--long-line-rate", type=float, default=GeneratorConfig.long_line_rate)
+    parser.add_argument("--long-line-bytes", type=int, default=GeneratorConfig.long_line_bytes)
+    parser.add_argument("--match-rate", type=float, default=GeneratorConfig.match_rate)
+    parser.add_argument("--rare-rate", type=float, default=GeneratorConfig.rare_rate)
+    parser.add_argument("--seed", type=int, default=GeneratorConfig.seed)
+    args = parser.parse_args(argv)
+    config = GeneratorConfig(
+        size_bytes=parse_size(args.size),
+        format=args.format,
+        compression=args.compression,
+        line_length=args.line_length,
+        long_line_rate=args.long_line_rate,
+        long_line_bytes=args.long_line_bytes,
+        match_rate=args.match_rate,
+        rare_rate=args.rare_rate,
+        seed=args.seed,
+    )
+    print(json.dumps(generate(args.path, config), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""Benchmark harness for `log_explore` and `script_runna`.
+
+Generates (or reuses) synthetic datasets with `bench.generate`, runs every
+scenario in a fresh subprocess with an empty scan cache, and writes a JSON
+results file with per-scenario cold latency (first call), warm p50/p95
+latency, MB/s for full-file scans, response size, and peak RSS. With
+`--baseline`, each scenario's p50 is compared against the stored results and
+regressions beyond `--tolerance` are reported (and fail the run with
+`--fail-on-regression`).
+
+    python -m bench.run --size 100M --output /tmp/bench.json
+    python -m bench.run --baseline bench/baseline.json --fail-on-regression
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from bench.generate import (
+    DENSE_QUERY,
+    EXTRACT_QUERY,
+    RARE_QUERY,
+    START_EPOCH,
+    GeneratorConfig,
+    ensure_dataset,
+    parse_size,
+)
+
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / "log-efficient-mcp-bench"
+DEFAULT_TOLERANCE = 0.25
+# Differences below this are timer/scheduler noise, never regressions.
+NOISE_FLOOR_MS = 5.0
+DATASETS = {
+    "plain": {"format": "plain", "compression": "none"},
+    "json": {"format": "json", "compression": "none"},
+    "gzip": {"format": "plain", "compression": "gzip"},
+    "zstd": {"format": "plain", "compression": "zstd"},
+}
+
+
+@dataclass
+class Scenario:
+    name: str
+    dataset: str
+    tool: str
+    params: dict[str, object]
+    repeat: int = 5
+    # Scans the whole file, so MB/s is meaningful.
+    full_scan: bool = False
+    extra: dict[str, object] = field(default_factory=dict)
+
+
+def scenarios(metas: dict[str, dict], workers: int) -> list[Scenario]:
+    """The benchmark matrix for the generated datasets in `metas`."""
+    out: list[Scenario] = []
+    plain = metas.get("plain")
+    if plain:
+        path = plain["path"]
+        lines = plain["lines"]
+        out += [
+            Scenario("head", "plain", "log_explore", {"path": path, "action": "head", "max_lines": 200}),
+            Scenario("tail", "plain", "log_explore", {"path": path, "action": "tail", "max_lines": 200}),
+        ]
+        for depth, fraction in (("early", 0.01), ("middle", 0.5), ("late", 0.99)):
+            start = max(1, int(lines * fraction))
+            out.append(
+                Scenario(
+                    f"range-{depth}",
+                    "plain",
+                    "log_explore",
+                    {"path": path, "action": "range", "start_line": start, "end_line": start + 199},
+                )
+            )
+        # The generator advances its clock 1.5 ms per line on average.
+        middle = START_EPOCH + lines * 0.0015 / 2
+        out.append(
+            Scenario(
+                "time_range-middle",
+                "plain",
+                "log_explore",
+                {
+                    "path": path,
+                    "action": "time_range",
+                    "start_time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(middle)),
+                    "end_time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(middle + 1)),
+                    "max_lines": 1000,
+                },
+            )
+        )
+        out += [
+            Scenario(
+                "search-dense-context",
+                "plain",
+                "log_explore",
+                {"path": path, "action": "search", "query": DENSE_QUERY, "before": 2, "after": 2, "max_matches": 100},
+            ),
+            Scenario(
+                "search-rare-full",
+                "plain",
+                "log_explore",
+                {"path": path, "action": "search", "query": RARE_QUERY, "max_matches": 10_000, "workers": workers},
+                full_scan=True,
+            ),
+            Scenario(
+                "search-regex-full",
+                "plain",
+                "log_explore",
+                {
+                    "path": path,
+                    "action": "search",
+                    "query": r"code=50[34] latency_ms=2\d{4}",
+                    "regex": True,
+                    "max_matches": 100_000,
+                    "max_chars": 5_000_000,
+                    "workers": workers,
+                },
+                full_scan=True,
+            ),
+            Scenario(
+                "extract",
+                "plain",
+                "log_explore",
+                {"path": path, "action": "extract", "query": EXTRACT_QUERY, "max_matches": 5_000},
+            ),
+            Scenario(
+                "stats",
+                "plain",
+                "log_explore",
+                {"path": path, "action": "stats", "workers": workers},
+                full_scan=True,
+            ),
+            Scenario(
+                "aggregate-field",
+                "plain",
+                "log_explore",
+                {
+                    "path": path,
+                    "action": "aggregate",
+                    "query": r"code=(?P<code>\d+) latency_ms=(?P<ms>\d+)",
+                    "group_by": "code",
+                    "workers": workers,
+                },
+                repeat=3,
+                full_scan=True,
+            ),
+        ]
+    json_meta = metas.get("json")
+    if json_meta:
+        path = json_meta["path"]
+        out += [
+            Scenario(
+                "json-where",
+                "json",
+                "log_explore",
+                {
+                    "path": path,
+                    "action": "json",
+                    "where": 'level == "error" and latency_ms > 20000',
+                    "fields": "ts,code,latency_ms",
+                    "max_matches": 1000,
+                },
+            ),
+            Scenario("json-stats", "json", "log_explore", {"path": path, "action": "stats"}, full_scan=True),
+        ]
+    for compressed in ("gzip", "zstd"):
+        meta = metas.get(compressed)
+        if not meta:
+            continue
+        path = meta["path"]
+        out += [
+            Scenario(f"{compressed}-head", compressed, "log_explore", {"path": path, "action": "head"}),
+            Scenario(f"{compressed}-tail", compressed, "log_explore", {"path": path, "action": "tail"}, repeat=3),
+            Scenario(
+                f"{compressed}-search-rare-full",
+                compressed,
+                "log_explore",
+                {"path": path, "action": "search", "query": RARE_QUERY, "max_matches": 10_000},
+                repeat=3,
+                full_scan=True,
+            ),
+        ]
+    out += [
+        Scenario("script-noop", "", "script_runna", {"script": "true"}, repeat=10, extra={"compare_raw": "true"}),
+        Scenario(
+            "script-large-output",
+            "",
+            "script_runna",
+            {"script": "seq 1 2000000", "return_mode": "auto"},
+            repeat=3,
+            extra={"compare_raw": "seq 1 2000000 > /dev/null"},
+        ),
+    ]
+    return out
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _peak_rss_mb(who: int) -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(who).ru_maxrss * scale / (1 << 20), 1)
+
+
+def _response_chars(result: object) -> int:
+    if isinstance(result, dict):
+        content = result.get("content", result.get("inline_output"))
+        return len(content) if isinstance(content, str) else len(json.dumps(result, default=str))
+    return len(str(result))
+
+
+def _run_scenario_here(spec: dict[str, object]) -> dict[str, object]:
+    """Worker side: run one scenario in this (fresh) process."""
+    sys.path.insert(0, str(PACKAGE_ROOT))
+    import server
+
+    import_rss = _peak_rss_mb(resource.RUSAGE_SELF)
+    params = dict(spec["params"])
+    if spec["tool"] == "script_runna":
+        params["output_dir"] = spec["scratch_dir"]
+    func = getattr(server, spec["tool"])
+    samples = []
+    result: object = None
+    for _ in range(spec["repeat"]):
+        started = time.perf_counter()
+        result = func(**params)
+        samples.append((time.perf_counter() - started) * 1000)
+    out = {
+        "first_ms": round(samples[0], 2),
+        "p50_ms": round(_percentile(samples, 50), 2),
+        "p95_ms": round(_percentile(samples, 95), 2),
+        "samples": len(samples),
+        "response_chars": _response_chars(result),
+        "import_rss_mb": import_rss,
+        "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+    }
+    raw_script = spec.get("extra", {}).get("compare_raw")
+    if raw_script:
+        raw = []
+        for _ in range(spec["repeat"]):
+            started = time.perf_counter()
+            subprocess.run(["bash", "-lc", raw_script], check=False)
+            raw.append((time.perf_counter() - started) * 1000)
+        out["raw_p50_ms"] = round(_percentile(raw, 50), 2)
+        out["overhead_ms"] = round(out["p50_ms"] - out["raw_p50_ms"], 2)
+    out["children_peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_CHILDREN)
+    return out
+
+
+def run_scenario(scenario: Scenario, size_bytes: int | None) -> dict[str, object]:
+    """Run `scenario` in a subprocess with its own empty cache directory."""
+    with tempfile.TemporaryDirectory(prefix="log-efficient-mcp-bench-") as scratch:
+        spec = {**asdict(scenario), "scratch_dir": scratch}
+        env = {**os.environ, "LOG_EFFICIENT_MCP_CACHE_DIR": scratch, "PYTHONPATH": str(PACKAGE_ROOT)}
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.run", "--worker"],
+            input=json.dumps(spec),
+            capture_output=True,
+            text=True,
+            cwd=PACKAGE_ROOT,
+            env=env,
+            check=False,
+        )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if scenario.full_scan and size_bytes and result["p50_ms"] > 0:
+        result["cold_mb_per_s"] = round(size_bytes / (1 << 20) / (result["first_ms"] / 1000), 1)
+        result["mb_per_s"] = round(size_bytes / (1 << 20) / (result["p50_ms"] / 1000), 1)
+    return result
+
+
+def compare(results: dict[str, object], baseline: dict[str, object], tolerance: float) -> list[dict[str, object]]:
+    """Per-scenario p50 ratios against `baseline`; `regression` is set beyond `tolerance` (and the noise floor)."""
+    rows = []
+    base_scenarios = baseline.get("scenarios", {})
+    for name, current in results.get("scenarios", {}).items():
+        base = base_scenarios.get(name)
+        if not base or "p50_ms" not in base or "p50_ms" not in current:
+            continue
+        ratio = current["p50_ms"] / base["p50_ms"] if base["p50_ms"] else 1.0
+        rows.append(
+            {
+                "scenario": name,
+                "baseline_p50_ms": base["p50_ms"],
+                "p50_ms": current["p50_ms"],
+                "ratio": round(ratio, 3),
+                "regression": ratio > 1 + tolerance and current["p50_ms"] - base["p50_ms"] > NOISE_FLOOR_MS,
+            }
+        )
+    return rows
+
+
+def _print_table(results: dict[str, object], comparison: list[dict[str, object]]) -> None:
+    ratios = {row["scenario"]: row for row in comparison}
+    print(f"{'scenario':<32}{'first ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'cold MB/s':>11}{'RSS MB':>9}{'vs base':>10}")
+    for name, row in results["scenarios"].items():
+        if "error" in row:
+            print(f"{name:<32}  error: {row['error']}")
+            continue
+        cmp_row = ratios.get(name)
+        vs = f"{cmp_row['ratio']:.2f}x" + ("!" if cmp_row["regression"] else "") if cmp_row else ""
+        print(
+            f"{name:<32}{row['first_ms']:>10.1f}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}"
+            f"{row.get('cold_mb_per_s', ''):>11}{row['peak_rss_mb']:>9}{vs:>10}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", default="100M", help="uncompressed dataset size, e.g. 100M, 1G, 10G")
+    parser.add_argument("--datasets", default="plain,json,gzip,zstd", help="comma-separated subset of datasets")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="where datasets are generated")
+    parser.add_argument("--only", default="", help="comma-separated scenario name prefixes to run")
+    parser.add_argument("--workers", type=int, default=1, help="`workers` for full-scan log_explore scenarios")
+    parser.add_argument("--seed", type=int, default=GeneratorConfig.seed)
+    parser.add_argument("--output", type=Path, help="results JSON path (default: bench/results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed p50 slowdown ratio")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(_run_scenario_here(json.loads(sys.stdin.read()))))
+        return 0
+
+    size_bytes = parse_size(args.size)
+    metas: dict[str, dict] = {}
+    skipped: dict[str, str] = {}
+    for name in [item.strip() for item in args.datasets.split(",") if item.strip()]:
+        config = GeneratorConfig(size_bytes=size_bytes, seed=args.seed, **DATASETS[name])
+        try:
+            metas[name] = ensure_dataset(args.data_dir, config)
+        except RuntimeError as exc:
+            skipped[name] = str(exc)
+            print(f"skipping {name} dataset: {exc}", file=sys.stderr)
+
+    prefixes = [item.strip() for item in args.only.split(",") if item.strip()]
+    results: dict[str, object] = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "size_bytes": size_bytes,
+        "datasets": {name: {k: meta[k] for k in ("bytes", "lines", "dense_matches", "rare_matches")}
+                     for name, meta in metas.items()},
+        "skipped_datasets": skipped,
+        "scenarios": {},
+    }
+    for scenario in scenarios(metas, args.workers):
+        if prefixes and not any(scenario.name.startswith(prefix) for prefix in prefixes):
+            continue
+        print(f"running {scenario.name}...", file=sys.stderr)
+        dataset_bytes = metas[scenario.dataset]["uncompressed_bytes"] if scenario.dataset else None
+        results["scenarios"][scenario.name] = run_scenario(scenario, dataset_bytes)
+
+    comparison: list[dict[str, object]] = []
+    if args.baseline:
+        comparison = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        results["comparison"] = {"baseline": str(args.baseline), "tolerance": args.tolerance, "rows": comparison}
+
+    output = args.output or PACKAGE_ROOT / "bench" / "results" / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    _print_table(results, comparison)
+    print(f"results: {output}")
+
+    regressions = [row["scenario"] for row in comparison if row["regression"]]
+    if regressions:
+        print(f"regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1 if args.fail_on_regression else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
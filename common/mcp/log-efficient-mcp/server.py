@@ -1,9 +1,9 @@
 """FastMCP server entrypoint for log-efficient-mcp."""
 
 from mcp_app import mcp
-from tools import health, log_explore, script_runna, handoff_instructions
+from tools import health, log_explore, script_runna, script_job, handoff_instructions, metrics
 
-__all__ = ["mcp", "log_explore", "script_runna", "health", "handoff_instructions"]
+__all__ = ["mcp", "log_explore", "script_runna", "script_job", "health", "handoff_instructions", "metrics"]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools import file_reckoning  # noqa: E402
+from tools.reckoning import aggregate, source  # noqa: E402
+
+
+class AggregateActionTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmpdir.name) / "access.log"
+        lines = []
+        for i in range(1, 601):
+            code = 500 if i % 10 == 0 else (404 if i % 4 == 0 else 200)
+            lines.append(f"GET /api/{'users' if i % 3 else 'orders'} code={code} took={i}ms id=u{i % 7}\n")
+            if i % 50 == 0:
+                lines.append("  continuation without a code\n")
+        self.file_path.write_text("".join(lines), encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _aggregate(self, **kwargs):
+        return server.log_explore(path=str(self.file_path), action="aggregate", **kwargs)
+
+    def test_counts_top_k_and_numeric_summary(self):
+        result = self._aggregate(query=r"code=(?P<code>\d+) took=(?P<ms>\d+)ms", group_by="code", top_k=2)
+        self.assertEqual(result["matches"], 600)
+        self.assertEqual(result["group_by"], ["code"])
+        self.assertEqual(result["distinct"], 3)
+        self.assertFalse(result["approximate"])
+        self.assertEqual(result["top"], [{"key": "200", "count": 420}, {"key": "404", "count": 120}])
+        took = result["numeric"]["ms"]
+        self.assertEqual((took["count"], took["min"], took["max"], took["mean"]), (600, 1.0, 600.0, 300.5))
+        self.assertEqual((took["p50"], took["p99"]), (300.0, 594.0))
+        self.assertFalse(took["approximate_percentiles"])
+
+    def test_composite_keys_and_non_numeric_captures(self):
+        result = self._aggregate(query=r"/api/(\w+) code=(5\d\d)", top_k=5)
+        self.assertEqual(result["group_by"], ["1", "2"])
+        self.assertEqual(
+            result["top"],
+            [{"key": ["users", "500"], "count": 40}, {"key": ["orders", "500"], "count": 20}],
+        )
+        self.assertNotIn("1", result["numeric"])
+        self.assertIn("2", result["numeric"])
+
+    def test_engines_agree(self):
+        query = r"id=(u\d)"
+        with mock.patch.object(file_reckoning, "supports_byte_engine", return_value=False):
+            expected = self._aggregate(query=query)
+        for region_bytes in (64, 1 << 20):
+            with mock.patch.object(source, "REGION_BYTES", region_bytes):
+                self.assertEqual(self._aggregate(query=query), expected)
+                self.assertEqual(self._aggregate(query=r"\w+ code=500")["matches"], 60)
+
+    def test_unknown_group_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self._aggregate(query=r"code=(\d+)", group_by="status")
+
+    def test_heavy_hitters_bound_memory_and_error(self):
+        counter = aggregate.HeavyHitters(top_k=2, exact_limit=50)
+        for i in range(20_000):
+            counter.add("hot" if i % 3 == 0 else f"cold-{i}")
+        self.assertTrue(counter.approximate)
+        self.assertLessEqual(len(counter.counts), 2 * counter.capacity)
+        key, count = counter.top(1)[0]
+        self.assertEqual(key, "hot")
+        self.assertGreaterEqual(count, 6667 - counter.max_error)
+        self.assertLessEqual(count, 6667)
+
+    def test_reservoir_percentiles_are_close(self):
+        summary = aggregate.NumericSummary(sample_size=500)
+        for value in range(100_000):
+            summary.add(float(value))
+        result = summary.summary()
+        self.assertTrue(result["approximate_percentiles"])
+        self.assertEqual(len(summary.sample), 500)
+        self.assertAlmostEqual(result["p50"], 50_000, delta=7_500)
+        self.assertEqual(result["max"], 99_999.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
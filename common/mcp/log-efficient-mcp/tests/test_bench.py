@@ -0,0 +1,86 @@
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from bench import generate, run  # noqa: E402
+
+
+class SyntheticGeneratorTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.config = generate.GeneratorConfig(size_bytes=300_000, match_rate=0.05, rare_rate=0.01, seed=7)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_output_is_deterministic_and_within_size(self):
+        first = generate.generate(self.root / "a.log", self.config)
+        second = generate.generate(self.root / "b.log", self.config)
+        self.assertEqual((self.root / "a.log").read_bytes(), (self.root / "b.log").read_bytes())
+        self.assertLessEqual(first["bytes"], self.config.size_bytes)
+        self.assertGreater(first["bytes"], self.config.size_bytes - generate.GeneratorConfig.long_line_bytes - 512)
+        self.assertEqual(first["lines"], second["lines"])
+
+        other = generate.generate(self.root / "c.log", generate.GeneratorConfig(size_bytes=300_000, seed=8))
+        self.assertNotEqual((self.root / "a.log").read_bytes(), Path(other["path"]).read_bytes())
+
+    def test_reported_selectivity_matches_log_explore(self):
+        meta = generate.generate(self.root / "app.log", self.config)
+        text = (self.root / "app.log").read_text(encoding="utf-8")
+        self.assertEqual(text.count("\n"), meta["lines"])
+        self.assertEqual(text.count(generate.DENSE_QUERY), meta["dense_matches"])
+        self.assertEqual(text.count(generate.RARE_QUERY), meta["rare_matches"])
+        self.assertGreater(meta["rare_matches"], 0)
+
+        result = server.log_explore(
+            path=meta["path"], action="search", query=generate.RARE_QUERY, max_matches=10_000, collapse="none"
+        )
+        self.assertEqual(len(result.splitlines()), meta["rare_matches"])
+
+    def test_json_and_gzip_variants(self):
+        config = generate.GeneratorConfig(size_bytes=200_000, format="json", compression="gzip", seed=3)
+        meta = generate.ensure_dataset(self.root, config)
+        path = Path(meta["path"])
+        self.assertTrue(path.name.endswith(".jsonl.gz"))
+        lines = gzip.decompress(path.read_bytes()).decode("utf-8").splitlines()
+        self.assertEqual(len(lines), meta["lines"])
+        record = json.loads(lines[0])
+        expected = {"ts", "level", "service", "request_id", "msg", "code", "latency_ms"}
+        self.assertEqual(set(record) - {"detail"}, expected)
+        self.assertEqual(generate.ensure_dataset(self.root, config), meta)
+
+    def test_parse_size(self):
+        self.assertEqual(generate.parse_size("100M"), 100 << 20)
+        self.assertEqual(generate.parse_size("1.5G"), int(1.5 * (1 << 30)))
+        self.assertEqual(generate.parse_size("10gib"), 10 << 30)
+        self.assertEqual(generate.parse_size("4096"), 4096)
+
+
+class BaselineComparisonTests(unittest.TestCase):
+    def test_regressions_need_both_the_ratio_and_the_noise_floor(self):
+        baseline = {"scenarios": {"head": {"p50_ms": 1.0}, "search": {"p50_ms": 100.0}, "gone": {"p50_ms": 5.0}}}
+        results = {
+            "scenarios": {
+                "head": {"p50_ms": 3.0},
+                "search": {"p50_ms": 140.0},
+                "stats": {"p50_ms": 9.0},
+                "broken": {"error": "boom"},
+            }
+        }
+        rows = {row["scenario"]: row for row in run.compare(results, baseline, tolerance=0.25)}
+        self.assertEqual(set(rows), {"head", "search"})
+        self.assertFalse(rows["head"]["regression"])
+        self.assertTrue(rows["search"]["regression"])
+        self.assertEqual(rows["search"]["ratio"], 1.4)
+        self.assertFalse(run.compare(results, baseline, tolerance=0.5)[1]["regression"])
+
+
+if __name__ == "__main__":
+    unittest.main()
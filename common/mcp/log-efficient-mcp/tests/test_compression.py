@@ -0,0 +1,103 @@
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools.reckoning import compression  # noqa: E402
+
+
+class CompressedFileTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        compression._GZIP_INDEXES.clear()
+        self.lines = [f"{i:05d} {'ERROR' if i % 11 == 0 else 'INFO'} request id={i}\n" for i in range(1, 3001)]
+        self.text = "".join(self.lines)
+        self.file_path = Path(self.tmpdir.name) / "app.log.gz"
+        self.file_path.write_bytes(gzip.compress(self.text.encode("utf-8")))
+
+    def tearDown(self):
+        compression._GZIP_INDEXES.clear()
+        self.tmpdir.cleanup()
+
+    def _explore(self, **kwargs):
+        return server.log_explore(path=str(self.file_path), **kwargs)
+
+    def test_head_range_tail(self):
+        self.assertEqual(self._explore(action="head", max_lines=3), "".join(self.lines[:3]))
+        self.assertEqual(
+            self._explore(action="range", start_line=1500, end_line=1504),
+            "".join(self.lines[1499:1504]),
+        )
+        self.assertEqual(self._explore(action="tail", max_lines=4), "".join(self.lines[-4:]))
+
+    def test_search_extract_and_stats(self):
+        result = self._explore(action="search", query="ERROR", max_matches=2, after=1)
+        expected = "".join(self.lines[10:12] + self.lines[21:23])
+        self.assertTrue(result.startswith(expected + "[more results: repeat the call with cursor="))
+
+        result = self._explore(action="extract", query=r"^(\d+) ERROR", max_matches=1)
+        self.assertTrue(result.startswith(self.lines[10] + "[more results: repeat the call with cursor="))
+
+        stats = self._explore(action="stats")["stats"]
+        self.assertEqual(stats["compression"], "gzip")
+        self.assertEqual(stats["lines"], 3000)
+        self.assertEqual(stats["bytes"], self.file_path.stat().st_size)
+        self.assertEqual(stats["last_non_empty_line"], self.lines[-1].rstrip("\n"))
+
+    def test_multi_member_gzip_without_trailing_newline(self):
+        self.file_path.write_bytes(
+            gzip.compress(b"one\ntwo\nthr") + b"\x00\x00" + gzip.compress(b"ee\nfour")
+        )
+        self.assertEqual(self._explore(action="head", max_lines=10), "one\ntwo\nthree\nfour")
+        self.assertEqual(self._explore(action="tail", max_lines=2), "three\nfour")
+        self.assertEqual(self._explore(action="stats")["stats"]["lines"], 4)
+
+    def test_range_resumes_from_checkpoints(self):
+        with (
+            mock.patch.object(compression, "STREAM_INPUT_BYTES", 256),
+            mock.patch.object(compression, "STREAM_OUTPUT_BYTES", 512),
+            mock.patch.object(compression, "GZIP_CHECKPOINT_BYTES", 8 << 10),
+        ):
+            self.assertEqual(self._explore(action="tail", max_lines=2), "".join(self.lines[-2:]))
+            index = compression._gzip_index(self.file_path)
+            self.assertTrue(index.complete)
+            self.assertEqual(index.total_lines, 3000)
+            self.assertGreater(len(index.checkpoints), 5)
+
+            checkpoint = index.locate_line(2500)
+            self.assertGreater(checkpoint.newlines, 1000)
+            with mock.patch.object(compression, "_gzip_chunks", wraps=compression._gzip_chunks) as chunks:
+                self.assertEqual(
+                    self._explore(action="range", start_line=2500, end_line=2502),
+                    "".join(self.lines[2499:2502]),
+                )
+            self.assertIsNotNone(chunks.call_args.args[1])
+            for start in (1, 700, 1999, 2999, 3000):
+                self.assertEqual(
+                    self._explore(action="range", start_line=start, end_line=start),
+                    self.lines[start - 1],
+                )
+            self.assertEqual(self._explore(action="tail", max_lines=5), "".join(self.lines[-5:]))
+
+    def test_follow_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self._explore(action="follow")
+
+    def test_zstd_without_package_raises_value_error(self):
+        self.file_path.write_bytes(compression.ZSTD_MAGIC + b"\x00" * 16)
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            with self.assertRaisesRegex(ValueError, "zstandard"):
+                self._explore(action="head")
+        else:
+            self.skipTest("zstandard is installed")
+
+
+if __name__ == "__main__":
+    unittest.main()
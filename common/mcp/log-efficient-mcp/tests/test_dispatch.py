@@ -0,0 +1,140 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools import dispatch  # noqa: E402
+from tools.reckoning import progress, source  # noqa: E402
+
+
+class DispatchTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmpdir.name) / "app.log"
+        self.file_path.write_text("".join(f"{i:05d} INFO step {i}\n" for i in range(20_000)), encoding="utf-8")
+        self.patches = [
+            mock.patch.object(source, "REGION_BYTES", 4096),
+            mock.patch.object(progress, "PROGRESS_INTERVAL_SECONDS", 0),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmpdir.cleanup()
+
+    def test_blocking_work_leaves_the_event_loop_free(self):
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            result = await dispatch.run_offloaded("test", time.sleep, (0.3,))
+            task.cancel()
+            return result, ticks
+
+        result, ticks = asyncio.run(scenario())
+        self.assertIsNone(result)
+        self.assertGreater(ticks, 5)
+
+    def test_per_tool_concurrency_limit(self):
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+
+        async def scenario():
+            await asyncio.gather(*(dispatch.run_offloaded("limited", work) for _ in range(6)))
+
+        with mock.patch.dict(dispatch.TOOL_CONCURRENCY, {"limited": 2}):
+            asyncio.run(scenario())
+        self.assertEqual(peak, 2)
+
+    def test_scans_report_progress_and_stop_when_cancelled(self):
+        reports = []
+        kwargs = {"path": str(self.file_path), "action": "search", "query": "no such line"}
+
+        async def complete():
+            return await dispatch.run_offloaded(
+                "log_explore", server.log_explore, kwargs=kwargs, on_progress=lambda *args: reports.append(args)
+            )
+
+        self.assertEqual(asyncio.run(complete()), "")
+        size = self.file_path.stat().st_size
+        self.assertGreater(len(reports), 10)
+        self.assertEqual({total for _, total in reports}, {size})
+        self.assertEqual([done for done, _ in reports], sorted(done for done, _ in reports))
+
+        cancelled_reports = []
+
+        async def cancelled():
+            loop = asyncio.get_running_loop()
+            task = None
+
+            def cancel_after_three(done, total):
+                cancelled_reports.append(done)
+                if len(cancelled_reports) == 3:
+                    loop.call_soon_threadsafe(task.cancel)
+                time.sleep(0.01)
+
+            task = asyncio.create_task(
+                dispatch.run_offloaded("log_explore", server.log_explore, kwargs=kwargs, on_progress=cancel_after_three)
+            )
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(0.2)
+
+        asyncio.run(cancelled())
+        self.assertLess(len(cancelled_reports), len(reports) // 2)
+
+    def test_cancelled_script_is_killed(self):
+        pid_file = Path(self.tmpdir.name) / "pid"
+
+        async def scenario():
+            task = asyncio.create_task(
+                dispatch.run_offloaded(
+                    "script_runna",
+                    server.script_runna,
+                    kwargs={"script": f"echo $$ > {pid_file}; sleep 30", "output_dir": self.tmpdir.name},
+                )
+            )
+            for _ in range(100):
+                if pid_file.exists() and pid_file.read_text().strip():
+                    break
+                await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(0.5)
+
+        started = time.monotonic()
+        asyncio.run(scenario())
+        self.assertLess(time.monotonic() - started, 10)
+        with self.assertRaises(ProcessLookupError):
+            os.kill(int(pid_file.read_text()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import csv
+import gzip
+import importlib.util
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+QUERY = r"id=(?P<id>\w+) code=(?P<code>\d+)(?: msg=(?P<msg>.*))?"
+
+
+class ExtractOutputTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.file_path = self.root / "app.log"
+        lines = []
+        for i in range(1, 7001):
+            if i % 2 == 0:
+                msg = ' msg=upstream "db", retrying' if i % 4 == 0 else ""
+                lines.append(f"2024-05-01 ERROR worker padding {'x' * 80} id=r{i} code={500 + i % 4}{msg}\n")
+            else:
+                lines.append(f"2024-05-01 INFO worker ok {i}\n")
+        self.file_path.write_text("".join(lines), encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _extract(self, **kwargs):
+        kwargs.setdefault("query", QUERY)
+        return server.log_explore(path=str(kwargs.pop("path", self.file_path)), action="extract", **kwargs)
+
+    def test_table_has_column_arrays_and_pages_with_a_cursor(self):
+        first = self._extract(format="table", max_matches=2)
+        self.assertEqual(first["columns"], ["line", "id", "code", "msg"])
+        self.assertEqual(first["rows"], 2)
+        self.assertEqual(
+            first["content"],
+            {"line": [2, 4], "id": ["r2", "r4"], "code": ["502", "500"], "msg": [None, 'upstream "db", retrying']},
+        )
+        second = self._extract(format="table", max_matches=2, cursor=first["cursor"])
+        self.assertEqual(second["content"]["line"], [6, 8])
+
+    def test_text_formats_round_trip(self):
+        rows = list(csv.reader(io.StringIO(self._extract(format="csv", max_matches=2)["content"])))
+        self.assertEqual(rows[0], ["line", "id", "code", "msg"])
+        self.assertEqual(rows[1:], [["2", "r2", "502", ""], ["4", "r4", "500", 'upstream "db", retrying']])
+        tsv = self._extract(format="tsv", max_matches=1)["content"]
+        self.assertEqual(tsv, "line\tid\tcode\tmsg\n2\tr2\t502\t\n")
+        records = [json.loads(line) for line in self._extract(format="ndjson", max_matches=2)["content"].splitlines()]
+        self.assertEqual(records[1], {"line": 4, "id": "r4", "code": "500", "msg": 'upstream "db", retrying'})
+
+        positional = self._extract(query=r"id=(\w+) code=(\d+)", format="csv", max_matches=1)
+        self.assertEqual(positional["columns"], ["line", "1", "2"])
+        named_line = self._extract(query=r"(?P<line>id=\w+)", format="table", max_matches=1)
+        self.assertEqual(named_line["content"], {"_line": [2], "line": ["id=r2"]})
+
+    def test_structured_output_is_smaller_and_budgeted(self):
+        lines = self._extract(max_matches=500, max_chars=1_000_000)
+        table = self._extract(format="csv", max_matches=500, max_chars=1_000_000)
+        self.assertLess(len(table["content"]) * 3, len(lines))
+
+        budgeted = self._extract(format="csv", max_matches=500, max_chars=1_000)
+        self.assertLess(budgeted["rows"], 500)
+        self.assertLessEqual(len(budgeted["content"]), 1_000)
+        rest = self._extract(format="csv", max_matches=500, max_chars=1_000, cursor=budgeted["cursor"])
+        first_rest = next(csv.reader(io.StringIO(rest["content"].splitlines()[1])))
+        self.assertEqual(int(first_rest[0]), 2 * (budgeted["rows"] + 1))
+
+    def test_spill_streams_every_match_past_the_inline_limit(self):
+        target = self.root / "out" / "errors.ndjson"
+        result = self._extract(format="ndjson", max_matches=100_000, output_file=str(target))
+        self.assertEqual(result["rows"], 3500)
+        self.assertFalse(result["truncated"])
+        self.assertEqual((result["first_line"], result["last_line"]), (2, 7000))
+        self.assertEqual(result["bytes"], target.stat().st_size)
+        records = [json.loads(line) for line in target.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(len(records), 3500)
+        self.assertEqual(records[-1], {"line": 7000, "id": "r7000", "code": "500", "msg": 'upstream "db", retrying'})
+
+        packed = self.root / "app.log.gz"
+        packed.write_bytes(gzip.compress(self.file_path.read_bytes()))
+        spilled = self._extract(path=packed, format="csv", max_matches=10, output_file=str(self.root / "e.csv"))
+        self.assertTrue(spilled["truncated"])
+        self.assertEqual(len((self.root / "e.csv").read_text(encoding="utf-8").splitlines()), 11)
+
+        raw = self._extract(max_matches=3, output_file=str(self.root / "e.log"))
+        self.assertIsNone(raw["columns"])
+        self.assertEqual((self.root / "e.log").read_text(encoding="utf-8").count("ERROR"), 3)
+
+    def test_invalid_combinations(self):
+        target = str(self.root / "x.out")
+        for kwargs in (
+            {"format": "table", "output_file": target},
+            {"format": "parquet"},
+            {"output_file": str(self.file_path)},
+            {"output_file": target, "cursor": "abc"},
+        ):
+            with self.assertRaises(ValueError, msg=kwargs):
+                self._extract(**kwargs)
+        with self.assertRaises(ValueError):
+            server.log_explore(path=str(self.file_path), action="search", query="ERROR", output_file=target)
+        existing = self.root / "notes.txt"
+        existing.write_text("keep me\n", encoding="utf-8")
+        for fmt in ("lines", "csv", "parquet"):
+            with self.assertRaisesRegex(ValueError, "already exists"):
+                self._extract(format=fmt, output_file=str(existing))
+        self.assertEqual(existing.read_text(encoding="utf-8"), "keep me\n")
+        with self.assertRaises(ValueError):
+            server.log_explore(path=str(self.root / "*.log"), action="extract", query=QUERY, format="csv")
+
+    @unittest.skipIf(importlib.util.find_spec("pyarrow") is not None, "pyarrow is installed")
+    def test_parquet_needs_pyarrow(self):
+        with self.assertRaisesRegex(ValueError, "pyarrow"):
+            self._extract(format="parquet", output_file=str(self.root / "e.parquet"))
+        self.assertFalse((self.root / "e.parquet").exists())
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow") is not None, "pyarrow is not installed")
+    def test_parquet_spill(self):
+        import pyarrow.parquet as pq
+
+        target = self.root / "e.parquet"
+        result = self._extract(format="parquet", max_matches=100_000, output_file=str(target))
+        table = pq.read_table(target)
+        self.assertEqual(table.num_rows, result["rows"])
+        self.assertEqual(table.column_names, ["line", "id", "code", "msg"])
+        self.assertEqual(table.column("id")[0].as_py(), "r2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -53,7 +53,7 @@ class FileReckoningTests(unittest.TestCase):
             max_matches=1,
         )
         self.assertEqual(
-            result,
+            result.split("[more results: repeat the call with cursor=")[0],
             "".join(
                 [
                     "WARN disk low\n",
@@ -62,6 +62,7 @@ class FileReckoningTests(unittest.TestCase):
                 ]
             ),
         )
+        self.assertTrue(result.endswith("]\n"))
 
     def test_extract_action(self):
         result = server.log_explore(
@@ -70,8 +71,13 @@ class FileReckoningTests(unittest.TestCase):
             query=r"id=(\w+)\s+code=(\d+)",
             max_matches=2,
         )
-        self.assertIn("ERROR failed to connect id=abc123 code=500", result)
-        self.assertIn("ERROR failed to connect id=def456 code=503", result)
+        self.assertTrue(
+            result.startswith(
+                "ERROR failed to connect id=abc123 code=500\n"
+                "ERROR failed to connect id=def456 code=503\n"
+                "[more results: repeat the call with cursor="
+            )
+        )
 
     def test_search_requires_query(self):
         with self.assertRaises(ValueError):
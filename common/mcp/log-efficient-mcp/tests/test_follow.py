@@ -0,0 +1,88 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+
+class FollowActionTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmpdir.name) / "service.log"
+        self.file_path.write_text("boot\nready\n", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _follow(self, cursor="", **kwargs):
+        return server.log_explore(path=str(self.file_path), action="follow", cursor=cursor, **kwargs)
+
+    def _append(self, text):
+        with self.file_path.open("a", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_returns_only_new_complete_lines(self):
+        first = self._follow(max_lines=1)
+        self.assertEqual(first["content"], "ready\n")
+        self.assertEqual(first["start_line"], 2)
+
+        self._append("req 1\nreq 2\npartial")
+        second = self._follow(first["cursor"])
+        self.assertEqual(second["content"], "req 1\nreq 2\n")
+        self.assertEqual(second["start_line"], 3)
+
+        self._append(" line\n")
+        third = self._follow(second["cursor"])
+        self.assertEqual(third["content"], "partial line\n")
+        self.assertEqual(third["start_line"], 5)
+
+        idle = self._follow(third["cursor"])
+        self.assertEqual(idle["lines"], 0)
+        self.assertEqual(idle["cursor"], third["cursor"])
+
+    def test_pages_when_more_than_max_lines_are_new(self):
+        cursor = self._follow()["cursor"]
+        self._append("".join(f"n{i}\n" for i in range(5)))
+        page = self._follow(cursor, max_lines=3)
+        self.assertTrue(page["has_more"])
+        self.assertEqual(page["content"], "n0\nn1\nn2\n")
+        rest = self._follow(page["cursor"], max_lines=3)
+        self.assertFalse(rest["has_more"])
+        self.assertEqual(rest["content"], "n3\nn4\n")
+
+    def test_detects_truncation_and_rotation(self):
+        cursor = self._follow()["cursor"]
+        self.file_path.write_text("fresh\n", encoding="utf-8")
+        truncated = self._follow(cursor)
+        self.assertTrue(truncated["truncated"])
+        self.assertEqual(truncated["content"], "fresh\n")
+
+        rotated_path = Path(self.tmpdir.name) / "service.log.1"
+        self.file_path.rename(rotated_path)
+        self.file_path.write_text("after rotate\n", encoding="utf-8")
+        rotated = self._follow(truncated["cursor"])
+        self.assertTrue(rotated["rotated"])
+        self.assertEqual(rotated["content"], "after rotate\n")
+        self.assertEqual(rotated["start_line"], 1)
+
+    def test_waits_for_new_data(self):
+        cursor = self._follow()["cursor"]
+        timer = threading.Timer(0.3, self._append, args=("late\n",))
+        timer.start()
+        started = time.monotonic()
+        result = self._follow(cursor, wait_seconds=5)
+        timer.join()
+        self.assertEqual(result["content"], "late\n")
+        self.assertLess(time.monotonic() - started, 4)
+
+    def test_rejects_foreign_cursor(self):
+        with self.assertRaises(ValueError):
+            self._follow("not-a-cursor")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools.reckoning import jsonl, source  # noqa: E402
+
+
+class JsonActionTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmpdir.name) / "service.jsonl"
+        self.records = []
+        lines = []
+        for i in range(1, 301):
+            record = {
+                "ts": f"2024-05-01T10:{i // 60:02d}:{i % 60:02d}Z",
+                "level": "error" if i % 20 == 0 else "info",
+                "latency_ms": (i * 37) % 900,
+                "request": {"id": f"r{i}", "tags": ["api", "v2" if i % 2 else "v1"]},
+                "msg": "Upstream Timeout" if i % 40 == 0 else "ok",
+            }
+            self.records.append(record)
+            lines.append(json.dumps(record) + "\n")
+            if i % 100 == 0:
+                lines.append("not json at all\n")
+                self.records.append(None)
+        self.file_path.write_text("".join(lines), encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _json(self, path=None, **kwargs):
+        return server.log_explore(path=str(path or self.file_path), action="json", **kwargs)
+
+    def _expected(self, predicate, fields):
+        rows = []
+        for line_no, record in enumerate(self.records, start=1):
+            if record is not None and predicate(record):
+                rows.append(f"{line_no}:{json.dumps(fields(record), separators=(',', ':'))}\n")
+        return "".join(rows)
+
+    def test_filter_and_project(self):
+        result = self._json(where='level == "error" and latency_ms > 500', fields="ts,request.id,latency_ms")
+        expected = self._expected(
+            lambda r: r["level"] == "error" and r["latency_ms"] > 500,
+            lambda r: {"ts": r["ts"], "request.id": r["request"]["id"], "latency_ms": r["latency_ms"]},
+        )
+        self.assertEqual(result["content"], expected)
+        self.assertEqual(result["matches"], expected.count("\n"))
+        self.assertFalse(result["truncated"])
+        # Only lines containing `"error"` are parsed.
+        self.assertEqual(result["parsed"], 15)
+
+    def test_operators_paths_and_case(self):
+        result = self._json(where="msg ~ timeout and request.tags.1 == v1", ignore_case=True, fields="msg")
+        self.assertEqual(result["matches"], 7)
+        result = self._json(where='level != info and ts >= "2024-05-01T10:04:00Z"', fields="ts")
+        expected = self._expected(
+            lambda r: r["level"] != "info" and r["ts"] >= "2024-05-01T10:04:00Z", lambda r: {"ts": r["ts"]}
+        )
+        self.assertEqual(result["content"], expected)
+        self.assertEqual(self._json(where="missing != 1")["matches"], 0)
+        result = self._json(where="", max_matches=2)
+        self.assertEqual((result["matches"], result["truncated"]), (2, True))
+        self.assertEqual(json.loads(result["content"].splitlines()[0].split(":", 1)[1]), self.records[0])
+        self.assertEqual(self._json(where="", max_matches=5000)["invalid"], 3)
+
+    def test_engines_agree(self):
+        kwargs = dict(where='level == "ERROR"', fields="request.id", ignore_case=True)
+        expected = self._json(**kwargs)
+        self.assertEqual(expected["matches"], 15)
+        with mock.patch.object(jsonl, "orjson", None):
+            self.assertEqual(self._json(**kwargs), expected)
+        slow = self._json(where="latency_ms > 800")
+        self.assertEqual(slow["matches"], 32)
+        with mock.patch.object(source, "REGION_BYTES", 256):
+            self.assertEqual(self._json(**kwargs), expected)
+            self.assertEqual(self._json(where="latency_ms > 800"), slow)
+        gz_path = Path(self.tmpdir.name) / "service.jsonl.gz"
+        gz_path.write_bytes(gzip.compress(self.file_path.read_bytes()))
+        self.assertEqual(self._json(gz_path, **kwargs), expected)
+        utf16_path = Path(self.tmpdir.name) / "service.utf16.jsonl"
+        utf16_path.write_text(self.file_path.read_text(encoding="utf-8"), encoding="utf-16")
+        self.assertEqual(self._json(utf16_path, encoding="utf-16", **kwargs), expected)
+
+    def test_escaped_values_still_match(self):
+        path = Path(self.tmpdir.name) / "escaped.jsonl"
+        path.write_text('{"msg":"caf\\u00e9"}\n{"msg":"café"}\n{"msg":"cafe"}\n{"url":"\\/api"}\n', encoding="utf-8")
+        self.assertEqual(self._json(path, where='msg == "café"')["matches"], 2)
+        self.assertEqual(self._json(path, where='msg == "CAFÉ"', ignore_case=True)["matches"], 2)
+        self.assertEqual(self._json(path, where='url == "/api"')["matches"], 1)
+
+    def test_prefilter_keeps_dotted_keys_and_casefolded_values(self):
+        path = Path(self.tmpdir.name) / "keys.jsonl"
+        path.write_text('{"a.b": 2}\n{"a": {"b": 2}}\n{"Name": "Straße"}\n', encoding="utf-8")
+        self.assertEqual(self._json(path, where="a.b >= 1")["matches"], 2)
+        self.assertEqual(self._json(path, where='Name == "strasse"', ignore_case=True)["matches"], 1)
+        self.assertEqual(self._json(path, where='Name == "strasse"')["matches"], 0)
+
+    def test_query_plan(self):
+        plan = jsonl.parse_where('level == "error" and latency_ms > 500')
+        self.assertEqual(jsonl.required_literal(plan), '"error"')
+        self.assertEqual(jsonl.required_literal(jsonl.parse_where("latency_ms > 500")), '"latency_ms"')
+        plan = jsonl.parse_where('service == "checkout-api" and latency_ms > 500')
+        self.assertEqual(jsonl.required_literal(plan), '"checkout-api"')
+        self.assertIsNone(jsonl.required_literal(jsonl.parse_where("items.0 == 3")))
+        # Values that may be written escaped fall back to their key.
+        self.assertEqual(jsonl.required_literal(jsonl.parse_where('msg == "café"')), '"msg"')
+        self.assertEqual(jsonl.required_literal(jsonl.parse_where('path == "/api/v1"')), '"path"')
+        self.assertIsNone(jsonl.required_literal(jsonl.parse_where("naïve > 1")))
+        self.assertIsNone(jsonl.required_literal(jsonl.parse_where("request.id == 3")))
+        self.assertEqual(jsonl.required_literal(jsonl.parse_where('level == "error"'), ignore_case=True), '"level"')
+        for bad in ("level", "level == error or x > 1", 'msg == "unterminated'):
+            with self.assertRaises(ValueError):
+                jsonl.parse_where(bad)
+
+
+if __name__ == "__main__":
+    unittest.main()
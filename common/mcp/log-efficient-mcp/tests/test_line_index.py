@@ -0,0 +1,121 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools import file_reckoning  # noqa: E402
+from tools.reckoning import line_index  # noqa: E402
+
+
+def _expected_offsets(data: bytes) -> dict[int, int]:
+    offsets = {1: 0}
+    line = 1
+    for pos, byte in enumerate(data):
+        if byte == 0x0A:
+            line += 1
+            offsets[line] = pos + 1
+    return offsets
+
+
+class LineIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_cache_dir = os.environ.get("LOG_EFFICIENT_MCP_CACHE_DIR")
+        os.environ["LOG_EFFICIENT_MCP_CACHE_DIR"] = str(Path(self.tmpdir.name) / "cache")
+        line_index._MEMORY_CACHE.clear()
+        self.file_path = Path(self.tmpdir.name) / "big.log"
+        self.file_path.write_text(
+            "".join(f"line-{i} {'x' * (i % 7)}\n" for i in range(1, 501)),
+            encoding="utf-8",
+        )
+
+    def tearDown(self):
+        line_index._MEMORY_CACHE.clear()
+        if self.original_cache_dir is None:
+            os.environ.pop("LOG_EFFICIENT_MCP_CACHE_DIR", None)
+        else:
+            os.environ["LOG_EFFICIENT_MCP_CACHE_DIR"] = self.original_cache_dir
+        self.tmpdir.cleanup()
+
+    def _assert_checkpoints_valid(self, index):
+        expected = _expected_offsets(self.file_path.read_bytes())
+        for line, offset in zip(index.lines, index.offsets):
+            self.assertEqual(expected[line], offset)
+
+    def test_checkpoints_point_at_line_starts(self):
+        index = line_index.load_line_index(self.file_path, stride=256)
+        self.assertGreater(len(index.offsets), 10)
+        self.assertEqual(index.total_lines, 500)
+        self._assert_checkpoints_valid(index)
+        line, offset = index.locate(321)
+        self.assertLessEqual(line, 321)
+        self.assertEqual(_expected_offsets(self.file_path.read_bytes())[line], offset)
+
+    def test_append_extends_existing_index(self):
+        index = line_index.load_line_index(self.file_path, stride=256)
+        indexed_before = index.indexed_bytes
+        with self.file_path.open("a", encoding="utf-8") as f:
+            f.write("".join(f"more-{i}\n" for i in range(100)) + "partial")
+
+        with mock.patch.object(line_index, "_extend", wraps=line_index._extend) as extend:
+            index = line_index.load_line_index(self.file_path, stride=256)
+        self.assertEqual(extend.call_args.args[0].indexed_bytes, self.file_path.stat().st_size)
+        self.assertGreater(index.indexed_bytes, indexed_before)
+        self.assertEqual(index.total_lines, 601)
+        self._assert_checkpoints_valid(index)
+
+    def test_concurrent_loads_after_an_append_extend_once(self):
+        first = line_index.load_line_index(self.file_path, stride=256)
+        with self.file_path.open("a", encoding="utf-8") as f:
+            f.write("".join(f"more-{i}\n" for i in range(20_000)))
+        barrier = threading.Barrier(4)
+        results = []
+
+        def load():
+            barrier.wait()
+            results.append(line_index.load_line_index(self.file_path, stride=256))
+
+        with mock.patch.object(line_index, "SCAN_CHUNK_BYTES", 512):
+            threads = [threading.Thread(target=load) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual([index.total_lines for index in results], [20_500] * 4)
+        self._assert_checkpoints_valid(results[0])
+        # Readers holding the old index keep a consistent view.
+        self.assertEqual(first.total_lines, 500)
+
+    def test_truncated_file_is_reindexed(self):
+        line_index.load_line_index(self.file_path, stride=256)
+        self.file_path.write_text("short\nfile\n", encoding="utf-8")
+        index = line_index.load_line_index(self.file_path, stride=256)
+        self.assertEqual(index.total_lines, 2)
+        self.assertEqual(list(index.offsets), [0])
+
+    def test_index_is_persisted_to_cache_dir(self):
+        line_index.load_line_index(self.file_path, stride=256)
+        line_index._MEMORY_CACHE.clear()
+        index = line_index.cached_line_index(self.file_path)
+        self.assertIsNotNone(index)
+        self.assertEqual(index.total_lines, 500)
+
+    def test_range_and_tail_seek_through_index(self):
+        with mock.patch.object(file_reckoning, "INDEX_MIN_FILE_BYTES", 0):
+            ranged = server.log_explore(
+                path=str(self.file_path), action="range", start_line=400, end_line=402
+            )
+            tail = server.log_explore(path=str(self.file_path), action="tail", max_lines=2)
+        self.assertEqual(ranged, "line-400 x\nline-401 xx\nline-402 xxx\n")
+        self.assertEqual(tail, "line-499 xx\nline-500 xxx\n")
+        self.assertIsNotNone(line_index.cached_line_index(self.file_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools import dispatch  # noqa: E402
+from tools.metrics import ARG_PREVIEW_CHARS, REGISTRY, SLOW_CALL_ENV_VAR, TRACE_FILE_ENV_VAR, Histogram  # noqa: E402
+from tools.reckoning import parallel, source  # noqa: E402
+
+
+class MetricsTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmpdir.name) / "app.log"
+        lines = [f"{i:05d} {'ERROR' if i % 10 == 0 else 'INFO'} step {i}\n" for i in range(1, 2001)]
+        self.file_path.write_text("".join(lines), encoding="utf-8")
+        self.size = self.file_path.stat().st_size
+        self.patches = [
+            mock.patch.object(source, "REGION_BYTES", 4096),
+            mock.patch.dict(os.environ, {source.CACHE_DIR_ENV_VAR: self.tmpdir.name}),
+        ]
+        for patch in self.patches:
+            patch.start()
+        REGISTRY.reset()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        REGISTRY.reset()
+        self.tmpdir.cleanup()
+
+    def _call(self, name, func, **kwargs):
+        return asyncio.run(dispatch.run_offloaded(name, func, kwargs=kwargs))
+
+    def _series(self, action):
+        report = server.metrics()
+        return next(row for row in report["tools"] if row["tool"] == "log_explore" and row["action"] == action)
+
+    def test_records_work_counters_per_action(self):
+        result = self._call(
+            "log_explore", server.log_explore, path=str(self.file_path), action="search", query="ERROR", max_matches=500
+        )
+        search = self._series("search")
+        self.assertEqual(search["calls"], 1)
+        self.assertEqual(search["bytes_read"]["max"], self.size)
+        self.assertEqual(search["lines_scanned"]["max"], 2000)
+        self.assertEqual(search["matches"]["max"], 200)
+        self.assertEqual(search["response_chars"]["max"], len(result))
+        self.assertGreater(search["wall_seconds"]["max"], 0)
+
+        # The first tail builds the line index; once it is cached a tail only scans the lines it returns.
+        for _ in range(2):
+            REGISTRY.reset()
+            self._call("log_explore", server.log_explore, path=str(self.file_path), action="tail", max_lines=5)
+        tail = self._series("tail")
+        self.assertEqual(tail["matches"]["max"], 5)
+        self.assertEqual(tail["lines_scanned"]["max"], 5)
+
+        self._call("log_explore", server.log_explore, path=str(self.file_path))
+        self.assertEqual(self._series("head")["calls"], 1)
+
+    def test_parallel_chunks_are_counted_by_the_parent(self):
+        with (
+            mock.patch.object(parallel, "PARALLEL_MIN_FILE_BYTES", 0),
+            mock.patch.object(parallel, "PARALLEL_MIN_CHUNK_BYTES", 4096),
+        ):
+            self._call("log_explore", server.log_explore, path=str(self.file_path), action="stats", workers=2)
+        stats = self._series("stats")
+        self.assertEqual(stats["bytes_read"]["max"], self.size)
+        self.assertEqual(stats["lines_scanned"]["max"], 2000)
+
+    def test_slow_calls_keep_clipped_arguments_and_errors_are_counted(self):
+        trace = Path(self.tmpdir.name) / "trace.jsonl"
+        env = {SLOW_CALL_ENV_VAR: "0", TRACE_FILE_ENV_VAR: str(trace)}
+        with mock.patch.dict(os.environ, env):
+            query = "x" * 1000
+            self._call("log_explore", server.log_explore, path=str(self.file_path), action="search", query=query)
+            with self.assertRaises(FileNotFoundError):
+                self._call("log_explore", server.log_explore, path=str(self.file_path) + ".missing", action="stats")
+            report = server.metrics(slow_calls=1)
+
+        self.assertEqual(len(report["slow_calls"]), 1)
+        self.assertEqual(report["slow_calls"][0]["error"], "FileNotFoundError")
+        self.assertEqual(self._series("stats")["errors"], 1)
+        records = [json.loads(line) for line in trace.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([record["action"] for record in records], ["search", "stats"])
+        clipped = records[0]["args"]["query"]
+        self.assertTrue(clipped.startswith("x" * ARG_PREVIEW_CHARS))
+        self.assertTrue(clipped.endswith("[700 chars clipped]"))
+
+    def test_prometheus_text_and_reset(self):
+        for _ in range(3):
+            self._call("log_explore", server.log_explore, path=str(self.file_path), action="head", max_lines=10)
+        text = server.metrics(format="prometheus", reset=True)
+        labels = 'tool="log_explore",action="head"'
+        self.assertIn(f'log_efficient_mcp_calls_total{{{labels},outcome="ok"}} 3', text)
+        self.assertIn(f'log_efficient_mcp_call_matches_bucket{{{labels},le="16"}} 3', text)
+        self.assertIn(f'log_efficient_mcp_call_wall_seconds_bucket{{{labels},le="+Inf"}} 3', text)
+        self.assertIn(f"log_efficient_mcp_call_matches_sum{{{labels}}} 30", text)
+        self.assertEqual(server.metrics()["tools"], [])
+
+    def test_histogram_quantiles(self):
+        histogram = Histogram((1, 2, 4, 8))
+        for value in [1, 1, 2, 3, 3, 3, 7, 20]:
+            histogram.observe(value)
+        self.assertEqual(histogram.buckets, [2, 1, 3, 1, 1])
+        self.assertEqual(histogram.quantile(0.25), 1)
+        self.assertAlmostEqual(histogram.quantile(0.5), 2 + 2 * (4 - 3) / 3)
+        self.assertEqual(histogram.quantile(1.0), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import gzip
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+
+class MultiFileSearchTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        # Rotated set: app.log is newest, app.log.10 oldest.
+        (self.root / "app.log").write_text(
+            "2024-05-03 10:00:00 INFO up\n2024-05-03 10:00:05 ERROR disk id=7\n", encoding="utf-8"
+        )
+        (self.root / "app.log.2").write_text(
+            "2024-05-02 09:00:00 ERROR net id=2\n2024-05-02 09:00:01 INFO retry\n", encoding="utf-8"
+        )
+        (self.root / "app.log.10.gz").write_bytes(
+            gzip.compress(b"2024-05-01 08:00:00 ERROR boot id=1\n2024-05-01 08:30:00 ERROR late id=3\n")
+        )
+        (self.root / "other.txt").write_text("ERROR not a log\n", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_glob_labels_matches_in_natural_file_order(self):
+        result = server.log_explore(path=str(self.root / "app.log*"), action="search", query="ERROR", after=1)
+        self.assertEqual(result["files"], 3)
+        self.assertEqual(result["matches"], 4)
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(
+            result["content"],
+            "".join(
+                [
+                    "app.log:2:2024-05-03 10:00:05 ERROR disk id=7\n",
+                    "app.log.2:1:2024-05-02 09:00:00 ERROR net id=2\n",
+                    "app.log.2-2-2024-05-02 09:00:01 INFO retry\n",
+                    "app.log.10.gz:1:2024-05-01 08:00:00 ERROR boot id=1\n",
+                    "app.log.10.gz:2:2024-05-01 08:30:00 ERROR late id=3\n",
+                ]
+            ),
+        )
+
+    def test_global_budget_in_file_order(self):
+        result = server.log_explore(
+            path=str(self.root / "app.log*"), action="search", query="ERROR", max_matches=2, workers=2
+        )
+        self.assertEqual(result["matches"], 2)
+        self.assertEqual(result["content"].count("\n"), 2)
+        self.assertTrue(result["content"].startswith("app.log:2:"))
+
+    def test_timestamp_order_merges_across_files(self):
+        result = server.log_explore(
+            path=str(self.root / "app.log*"), action="extract", query=r"id=(\d+)", max_matches=3, order="timestamp"
+        )
+        self.assertEqual(result["action"], "extract")
+        self.assertEqual(
+            [line.split(":", 2)[0] for line in result["content"].splitlines()],
+            ["app.log.10.gz", "app.log.10.gz", "app.log.2"],
+        )
+
+    def test_directory_scans_all_files_recursively(self):
+        nested = self.root / "host-b"
+        nested.mkdir()
+        (nested / "app.log").write_text("ERROR nested\n", encoding="utf-8")
+        result = server.log_explore(path=str(self.root), action="search", query="ERROR")
+        self.assertEqual(result["files"], 5)
+        self.assertIn("host-b/app.log:1:ERROR nested\n", result["content"])
+        self.assertIn("other.txt:1:ERROR not a log\n", result["content"])
+
+    def test_rejects_other_actions_and_empty_globs(self):
+        with self.assertRaises(ValueError):
+            server.log_explore(path=str(self.root / "*.log"), action="tail")
+        with self.assertRaises(FileNotFoundError):
+            server.log_explore(path=str(self.root / "*.missing"), action="search", query="x")
+
+    def test_corrupt_and_truncated_gzip_files_are_reported_per_file(self):
+        good = gzip.compress(b"ERROR one\nERROR two\n" * 50)
+        (self.root / "app.log.3.gz").write_bytes(good[: len(good) // 2])
+        (self.root / "app.log.4.gz").write_bytes(good[:10] + b"\xff" * 64)
+        result = server.log_explore(path=str(self.root / "app.log*"), action="search", query="ERROR")
+        self.assertEqual(result["files"], 5)
+        self.assertEqual(result["matches"], 4)
+        self.assertEqual([error["file"] for error in result["errors"]], ["app.log.3.gz", "app.log.4.gz"])
+        self.assertIn("truncated", result["errors"][0]["error"])
+        with self.assertRaises(ValueError):
+            server.log_explore(path=str(self.root / "app.log.3.gz"), action="search", query="ERROR")
+
+    def test_timestamp_order_detects_the_format_per_file(self):
+        web, sys_ = self.root / "web", self.root / "sys"
+        web.mkdir()
+        sys_.mkdir()
+        (web / "access.log").write_text(
+            '1.2.3.4 - - [02/May/2024:10:00:00 +0000] "GET /b" 500\n'
+            '1.2.3.4 - - [10/Apr/2024:09:00:00 +0000] "GET /a" 500\n',
+            encoding="utf-8",
+        )
+        (web / "access.log.1").write_text('1.2.3.4 - - [20/Apr/2024:08:00:00 +0000] "GET /c" 500\n', encoding="utf-8")
+        (sys_ / "messages").write_text("May  2 10:00:00 host app: GET /e 500\n", encoding="utf-8")
+        (sys_ / "messages.1").write_text("Apr 10 09:00:00 host app: GET /d 500\n", encoding="utf-8")
+        for folder, expected in ((web, ["/a", "/c", "/b"]), (sys_, ["/d", "/e"])):
+            result = server.log_explore(path=str(folder), action="search", query="GET", order="timestamp")
+            self.assertEqual(re.findall(r"GET (/\w)", result["content"]), expected)
+        with self.assertRaises(ValueError):
+            server.log_explore(path=str(web), action="search", query="GET", order="timestamp", time_format="epoch")
+        (self.root / "plain").mkdir()
+        (self.root / "plain" / "a.log").write_text("ERROR no stamp\n", encoding="utf-8")
+        with self.assertRaises(ValueError):
+            server.log_explore(path=str(self.root / "plain"), action="search", query="ERROR", order="timestamp")
+
+
+if __name__ == "__main__":
+    unittest.main()
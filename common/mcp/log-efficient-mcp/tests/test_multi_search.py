@@ -0,0 +1,89 @@
+import gzip
+import re
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools.reckoning import multi_search, source  # noqa: E402
+
+
+class MultiSearchTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmpdir.name) / "app.log"
+        self.lines = []
+        for i in range(1, 3001):
+            level = "ERROR" if i % 7 == 0 else "INFO"
+            tail = "upstream timeout" if i % 11 == 0 else "ok"
+            if i % 500 == 0:
+                tail = "Connection refused, café unreachable"
+            self.lines.append(f"{i} {level} request took {i % 1200}ms {tail}\n")
+        self.lines[-1] = self.lines[-1].rstrip("\n")
+        self.file_path.write_text("".join(self.lines), encoding="utf-8")
+        self.patch = mock.patch.object(source, "REGION_BYTES", 2048)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmpdir.cleanup()
+
+    def _multi(self, queries, path=None, **kwargs):
+        return server.log_explore(path=str(path or self.file_path), action="multi_search", queries=queries, **kwargs)
+
+    def _expected(self, predicate):
+        return [(number, line.rstrip("\n")) for number, line in enumerate(self.lines, start=1) if predicate(line)]
+
+    def test_one_pass_matches_separate_scans(self):
+        queries = ["ERROR", "timeout", "out", "refused", r"re:took \d{4}ms", "re:^(\\d+)00 ", "missing"]
+        result = self._multi(queries, max_matches=3)
+        self.assertEqual(result["lines"], 3000)
+        predicates = [
+            lambda line: "ERROR" in line,
+            lambda line: "timeout" in line,
+            lambda line: "out" in line,
+            lambda line: "refused" in line,
+            lambda line: re.search(r"took \d{4}ms", line),
+            lambda line: re.search(r"^(\d+)00 ", line),
+            lambda line: "missing" in line,
+        ]
+        for entry, predicate in zip(result["queries"], predicates):
+            expected = self._expected(predicate)
+            self.assertEqual(entry["matches"], len(expected), entry["query"])
+            if not expected:
+                self.assertIsNone(entry["first_line"])
+                self.assertEqual(entry["examples"], "")
+                continue
+            self.assertEqual(entry["first_line"], expected[0][0])
+            self.assertEqual((entry["last_line"], entry["last"]), expected[-1])
+            self.assertEqual(entry["examples"], "".join(f"{number}:{text}\n" for number, text in expected[:3]))
+        self.assertEqual([entry["regex"] for entry in result["queries"]], [False] * 4 + [True] * 2 + [False])
+
+    def test_ignore_case_and_non_ascii_regions(self):
+        result = self._multi(["error", "CAFÉ", "Connection"], ignore_case=True, max_matches=1)
+        counts = {entry["query"]: entry["matches"] for entry in result["queries"]}
+        self.assertEqual(counts, {"error": 428, "CAFÉ": 6, "Connection": 6})
+        self.assertEqual(result["queries"][1]["examples"], f"500:{self.lines[499]}")
+
+    def test_compressed_files(self):
+        packed = Path(self.tmpdir.name) / "app.log.gz"
+        packed.write_bytes(gzip.compress(self.file_path.read_bytes()))
+        queries = ["ERROR", "re:took 1\\d{3}ms"]
+        self.assertEqual(self._multi(queries, path=packed), self._multi(queries))
+
+    def test_query_validation(self):
+        self.assertEqual(
+            multi_search.parse_queries(["a", "a", "re:a", "b"], regex=False), [("a", False), ("a", True), ("b", False)]
+        )
+        self.assertEqual(multi_search.parse_queries(["a(b)"], regex=True), [("a(b)", True)])
+        for queries in ([], [""], ["re:("], [str(i) for i in range(multi_search.MULTI_SEARCH_MAX_QUERIES + 1)]):
+            with self.assertRaises(ValueError):
+                self._multi(queries)
+
+
+if __name__ == "__main__":
+    unittest.main()
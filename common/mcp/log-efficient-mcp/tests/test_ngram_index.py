@@ -0,0 +1,130 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools.reckoning import ngram_index  # noqa: E402
+
+
+class NgramIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_cache_dir = os.environ.get("LOG_EFFICIENT_MCP_CACHE_DIR")
+        os.environ["LOG_EFFICIENT_MCP_CACHE_DIR"] = str(Path(self.tmpdir.name) / "cache")
+        ngram_index._MEMORY_CACHE.clear()
+        self.file_path = Path(self.tmpdir.name) / "app.log"
+        lines = [f"{i:04d} INFO worker request ok\n" for i in range(1, 401)]
+        lines[122] = "0123 ERROR worker Timeout id=7\n"
+        lines[349] = "0350 ERROR disk full id=9\n"
+        self.lines = lines
+        self.file_path.write_text("".join(lines), encoding="utf-8")
+        self.block_patch = mock.patch.object(ngram_index, "NGRAM_BLOCK_BYTES", 512)
+        self.block_patch.start()
+
+    def tearDown(self):
+        self.block_patch.stop()
+        ngram_index._MEMORY_CACHE.clear()
+        if self.original_cache_dir is None:
+            os.environ.pop("LOG_EFFICIENT_MCP_CACHE_DIR", None)
+        else:
+            os.environ["LOG_EFFICIENT_MCP_CACHE_DIR"] = self.original_cache_dir
+        self.tmpdir.cleanup()
+
+    def _explore(self, **kwargs):
+        return server.log_explore(path=str(self.file_path), **kwargs)
+
+    def test_index_action_reports_size_and_build_time(self):
+        report = self._explore(action="index")["index"]
+        self.assertGreater(report["blocks"], 10)
+        self.assertEqual(report["indexed_bytes"], self.file_path.stat().st_size)
+        self.assertGreater(report["index_bytes"], 0)
+        self.assertGreaterEqual(report["build_seconds"], 0)
+
+    def test_search_scans_only_candidate_blocks(self):
+        expected = self._explore(action="search", query="timeout", ignore_case=True, before=2, after=1)
+        self._explore(action="index")
+        with mock.patch.object(ngram_index, "scan_chunk", wraps=ngram_index.scan_chunk) as scanned:
+            result = self._explore(action="search", query="timeout", ignore_case=True, before=2, after=1)
+        self.assertEqual(result, expected)
+        self.assertEqual(result, "".join(self.lines[120:124]))
+        self.assertEqual(scanned.call_count, 1)
+
+        with mock.patch.object(ngram_index, "scan_chunk", wraps=ngram_index.scan_chunk) as scanned:
+            self.assertEqual(self._explore(action="search", query="segfault"), "")
+        scanned.assert_not_called()
+
+        result = self._explore(action="extract", query=r"ERROR (\w+) .* id=(\d+)")
+        self.assertEqual(result, self.lines[122] + self.lines[349])
+
+    def test_folded_search_matches_non_ascii_case_forms(self):
+        self.lines[200] = "0201 job FA\u0131LED here\n"
+        self.lines[300] = "0301 \u212aILLED by the Ba\u017fh loop\n"
+        self.file_path.write_text("".join(self.lines), encoding="utf-8")
+        for query in ("failed", "killed", "bash"):
+            expected = self._explore(action="search", query=query, ignore_case=True)
+            self.assertTrue(expected)
+            self._explore(action="index")
+            self.assertEqual(self._explore(action="search", query=query, ignore_case=True), expected)
+            ngram_index._MEMORY_CACHE.clear()
+            ngram_index._sidecar_path(self.file_path).unlink()
+
+    def test_appended_bytes_extend_the_index(self):
+        self._explore(action="index")
+        blocks = self._explore(action="index")["index"]["blocks"]
+        with self.file_path.open("a", encoding="utf-8") as f:
+            f.write("0401 ERROR segfault in worker\n")
+        ngram_index._MEMORY_CACHE.clear()
+        self.assertEqual(self._explore(action="search", query="segfault"), "0401 ERROR segfault in worker\n")
+        report = ngram_index.cached_ngram_index(self.file_path).report()
+        self.assertIn(report["blocks"], (blocks, blocks + 1))
+        self.assertEqual(report["indexed_bytes"], self.file_path.stat().st_size)
+
+    def test_concurrent_lookups_after_an_append_extend_once(self):
+        first = ngram_index.build_ngram_index(self.file_path)
+        with self.file_path.open("a", encoding="utf-8") as f:
+            f.write("".join(f"{i:04d} WARN segfault retry\n" for i in range(401, 1001)))
+        barrier = threading.Barrier(4)
+        results = []
+
+        def lookup():
+            barrier.wait()
+            results.append(ngram_index.cached_ngram_index(self.file_path))
+
+        threads = [threading.Thread(target=lookup) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        size = self.file_path.stat().st_size
+        self.assertEqual([(index.indexed_bytes, index.newlines) for index in results], [(size, 1000)] * 4)
+        self.assertEqual(list(results[0].block_offsets), sorted(set(results[0].block_offsets)))
+        # Searches still holding the old index keep a consistent view.
+        self.assertEqual(first.newlines, 400)
+        self.assertEqual(first.candidate_blocks(("segfault",)), 0)
+
+    def test_rewritten_file_drops_its_index(self):
+        self._explore(action="index")
+        self.file_path.write_text("fresh segfault\n", encoding="utf-8")
+        ngram_index._MEMORY_CACHE.clear()
+        self.assertIsNone(ngram_index.cached_ngram_index(self.file_path))
+        self.assertFalse(ngram_index._sidecar_path(self.file_path).exists())
+        self.assertEqual(self._explore(action="search", query="segfault"), "fresh segfault\n")
+
+    def test_cache_eviction_keeps_newest_index_within_cap(self):
+        other = Path(self.tmpdir.name) / "other.log"
+        other.write_text("".join(self.lines), encoding="utf-8")
+        self._explore(action="index")
+        with mock.patch.object(ngram_index, "NGRAM_CACHE_MAX_BYTES", 1):
+            server.log_explore(path=str(other), action="index")
+        self.assertFalse(ngram_index._sidecar_path(self.file_path).exists())
+        self.assertTrue(ngram_index._sidecar_path(other).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
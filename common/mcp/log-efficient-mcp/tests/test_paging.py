@@ -0,0 +1,164 @@
+import gzip
+import json
+import os
+import re
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+CURSOR_MARKER = re.compile(r"\[more results: repeat the call with cursor=(\S+)\]\n\Z")
+
+from tools import file_reckoning  # noqa: E402
+from tools.reckoning import compression, ngram_index, parallel, source, time_range  # noqa: E402
+
+
+class PagingTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_cache_dir = os.environ.get("LOG_EFFICIENT_MCP_CACHE_DIR")
+        os.environ["LOG_EFFICIENT_MCP_CACHE_DIR"] = str(Path(self.tmpdir.name) / "cache")
+        ngram_index._MEMORY_CACHE.clear()
+        compression._GZIP_INDEXES.clear()
+        start = datetime(2024, 5, 1, 12, 0)
+        lines = []
+        for i in range(1, 601):
+            stamp = start + timedelta(seconds=i)
+            level = "ERROR" if i % 7 == 0 or i % 11 == 0 else "INFO"
+            lines.append(f"{stamp:%Y-%m-%dT%H:%M:%S} {level} job={i} code={500 + i % 4} ünï\n")
+        self.text = "".join(lines)
+        self.lines = lines
+        self.file_path = self._write("app.log", self.text.encode("utf-8"))
+        self.patches = [
+            mock.patch.object(source, "REGION_BYTES", 700),
+            mock.patch.object(ngram_index, "NGRAM_BLOCK_BYTES", 512),
+            mock.patch.object(time_range, "TIME_BLOCK_BYTES", 256),
+            mock.patch.object(time_range, "TIME_LINEAR_BYTES", 512),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        ngram_index._MEMORY_CACHE.clear()
+        compression._GZIP_INDEXES.clear()
+        if self.original_cache_dir is None:
+            os.environ.pop("LOG_EFFICIENT_MCP_CACHE_DIR", None)
+        else:
+            os.environ["LOG_EFFICIENT_MCP_CACHE_DIR"] = self.original_cache_dir
+        self.tmpdir.cleanup()
+
+    def _write(self, name, data):
+        path = Path(self.tmpdir.name) / name
+        path.write_bytes(data)
+        return path
+
+    def _variants(self):
+        yield "bytes", self.file_path, {}
+        yield "utf-16", self._write("app.utf16.log", self.text.encode("utf-16")), {"encoding": "utf-16"}
+        yield "gzip", self._write("app.log.gz", gzip.compress(self.text.encode("utf-8"))), {}
+
+    def _pages(self, path, **kwargs):
+        """Follow cursors to the end; return (joined content, page count)."""
+        content = []
+        pages = 0
+        cursor = ""
+        while True:
+            result = server.log_explore(path=str(path), cursor=cursor, **kwargs)
+            pages += 1
+            if isinstance(result, str):
+                marker = CURSOR_MARKER.search(result)
+                content.append(result[: marker.start()] if marker else result)
+                if marker is None:
+                    return "".join(content), pages
+                cursor = marker.group(1)
+                continue
+            content.append(result["content"])
+            if not result.get("cursor"):
+                return "".join(content), pages
+            cursor = result["cursor"]
+            self.assertLess(pages, 1000)
+
+    def test_search_pages_match_one_large_scan(self):
+        kwargs = dict(action="search", query="ERROR", before=2, after=1)
+        for name, path, extra in self._variants():
+            expected = server.log_explore(path=str(path), max_matches=5000, **kwargs, **extra)
+            content, pages = self._pages(path, max_matches=7, **kwargs, **extra)
+            self.assertEqual(content, expected, name)
+            self.assertGreater(pages, 10, name)
+
+    def test_parallel_and_indexed_pages(self):
+        kwargs = dict(action="search", query="code=502", before=1, after=1)
+        expected = server.log_explore(path=str(self.file_path), max_matches=5000, **kwargs)
+        with mock.patch.object(parallel, "PARALLEL_MIN_FILE_BYTES", 0), mock.patch.object(
+            parallel, "PARALLEL_MIN_CHUNK_BYTES", 2000
+        ):
+            self.assertEqual(self._pages(self.file_path, max_matches=9, workers=2, **kwargs)[0], expected)
+        server.log_explore(path=str(self.file_path), action="index")
+        self.assertEqual(self._pages(self.file_path, max_matches=9, **kwargs)[0], expected)
+
+    def test_extract_and_range_pages(self):
+        for name, path, extra in self._variants():
+            kwargs = dict(action="extract", query=r"job=(\d+) code=503", **extra)
+            expected = server.log_explore(path=str(path), max_matches=5000, **kwargs)
+            self.assertEqual(self._pages(path, max_matches=4, **kwargs)[0], expected, name)
+
+            content, pages = self._pages(path, action="range", start_line=95, end_line=400, max_lines=50, **extra)
+            self.assertEqual(content, "".join(self.lines[94:400]), name)
+            self.assertEqual(pages, 7, name)
+
+    def test_json_and_time_range_pages(self):
+        records = "".join(json.dumps({"i": i, "level": "error" if i % 3 == 0 else "info"}) + "\n" for i in range(400))
+        json_path = self._write("svc.jsonl", records.encode("utf-8"))
+        kwargs = dict(action="json", where='level == "error"', fields="i")
+        expected = server.log_explore(path=str(json_path), max_matches=5000, **kwargs)["content"]
+        self.assertEqual(self._pages(json_path, max_matches=10, **kwargs)[0], expected)
+
+        for name, path, extra in self._variants():
+            kwargs = dict(action="time_range", start_time="2024-05-01T12:01:30", end_time="12:07", **extra)
+            content, pages = self._pages(path, max_lines=40, **kwargs)
+            self.assertEqual(content, "".join(self.lines[89:419]), name)
+            self.assertEqual(pages, 9, name)
+
+    def test_pages_reuse_the_scan_position(self):
+        first = server.log_explore(path=str(self.file_path), action="search", query="ERROR", max_matches=3)
+        with mock.patch.object(source, "REGION_BYTES", 1 << 20), mock.patch.object(
+            file_reckoning, "advance_lines", wraps=file_reckoning.advance_lines
+        ) as advance:
+            second = server.log_explore(
+                path=str(self.file_path), action="search", query="ERROR", max_matches=3, cursor=self._cursor(first)
+            )
+        self.assertEqual(CURSOR_MARKER.split(second)[0], "".join(self.lines[i - 1] for i in (21, 22, 28)))
+        # The next cursor starts right after the last row, without counting through the page again.
+        self.assertEqual(advance.call_args.args[1:3], (sum(len(line.encode("utf-8")) for line in self.lines[:28]), 0))
+
+    def _cursor(self, result):
+        return CURSOR_MARKER.search(result).group(1)
+
+    def test_mismatched_or_stale_cursor_is_rejected(self):
+        first = server.log_explore(path=str(self.file_path), action="search", query="ERROR", max_matches=3)
+        first = {"cursor": self._cursor(first)}
+        with self.assertRaises(ValueError):
+            server.log_explore(path=str(self.file_path), action="search", query="INFO", cursor=first["cursor"])
+        with self.assertRaises(ValueError):
+            server.log_explore(path=str(self.file_path), action="extract", query="ERROR", cursor=first["cursor"])
+        with self.assertRaises(ValueError):
+            server.log_explore(path=str(self.tmpdir.name), action="search", query="ERROR", cursor=first["cursor"])
+
+        self.file_path.write_bytes(self.text.encode("utf-8")[:100])
+        with self.assertRaises(ValueError):
+            server.log_explore(path=str(self.file_path), action="search", query="ERROR", cursor=first["cursor"])
+        replacement = self._write("replacement.log", self.text.encode("utf-8"))
+        os.replace(replacement, self.file_path)
+        with self.assertRaises(ValueError):
+            server.log_explore(path=str(self.file_path), action="search", query="ERROR", cursor=first["cursor"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools.reckoning import parallel  # noqa: E402
+
+
+class ParallelScanTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmpdir.name) / "parallel.log"
+        lines = []
+        for i in range(1, 401):
+            if i % 37 == 0:
+                lines.append(f"ERROR job={i} code={500 + i % 3}")
+            elif i % 50 == 0:
+                lines.append("")
+            else:
+                lines.append(f"INFO job={i} ok")
+        self.file_path.write_text("\n".join(lines), encoding="utf-8")
+        self.patches = [
+            mock.patch.object(parallel, "PARALLEL_MIN_FILE_BYTES", 0),
+            mock.patch.object(parallel, "PARALLEL_MIN_CHUNK_BYTES", 300),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmpdir.cleanup()
+
+    def _explore(self, **kwargs):
+        return server.log_explore(path=str(self.file_path), **kwargs)
+
+    def test_chunks_are_newline_aligned(self):
+        chunks = parallel.split_chunks(self.file_path, 2)
+        data = self.file_path.read_bytes()
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(data))
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[end - 1 : end], b"\n")
+
+    def test_search_matches_sequential_scan(self):
+        for max_matches in (1, 4, 100):
+            kwargs = dict(action="search", query="ERROR", before=2, after=3, max_matches=max_matches)
+            self.assertEqual(self._explore(workers=3, **kwargs), self._explore(**kwargs))
+
+    def test_extract_uses_global_line_numbers(self):
+        rows = parallel.parallel_scan_lines(
+            self.file_path,
+            query=r"job=(\d+) code=(\d+)",
+            regex=True,
+            ignore_case=False,
+            max_matches=3,
+            encoding="utf-8",
+            extract=True,
+            workers=2,
+        )
+        self.assertEqual([row["line"] for row in rows], [37, 74, 111])
+        self.assertEqual(rows[1]["groups"], ["74", "502"])
+
+    def test_stats_matches_sequential_scan(self):
+        parallel_result = self._explore(action="stats", workers=2)
+        sequential_result = self._explore(action="stats")
+        self.assertEqual(parallel_result, sequential_result)
+        self.assertEqual(parallel_result["stats"]["lines"], 399)
+        self.assertEqual(parallel_result["stats"]["non_empty_lines"], 392)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools import file_reckoning  # noqa: E402
+from tools.reckoning import parallel, patterns, source  # noqa: E402
+
+
+class PatternsActionTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmpdir.name) / "app.log"
+        lines = []
+        for i in range(1, 301):
+            if i % 30 == 0:
+                lines.append(f"2024-05-01T10:{i % 60:02d}:00Z ERROR db timeout after {i}ms host=10.0.0.{i % 9}\n")
+            elif i % 7 == 0:
+                lines.append(f"2024-05-01T10:{i % 60:02d}:00Z INFO user u{i} logged in from /srv/app/{i}\n")
+            else:
+                lines.append(f"2024-05-01T10:{i % 60:02d}:00Z INFO request id={i} took {i * 3}ms\n")
+            if i % 100 == 0:
+                lines.append("\n")
+        self.lines = lines
+        self.file_path.write_text("".join(lines), encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _patterns(self, path=None, **kwargs):
+        return server.log_explore(path=str(path or self.file_path), action="patterns", **kwargs)
+
+    def test_templates_counts_and_examples(self):
+        result = self._patterns(top_k=3)
+        self.assertEqual(result["action"], "patterns")
+        self.assertEqual(result["lines"], 300)
+        self.assertEqual(result["clusters"], 3)
+        self.assertEqual(result["evicted_lines"], 0)
+        top, users, errors = result["patterns"]
+        self.assertEqual(top["template"], "<TS> INFO request id=<NUM> took <NUM>ms")
+        self.assertEqual((top["count"], top["first_line"], top["example"]), (249, 1, self.lines[0].rstrip("\n")))
+        self.assertEqual(users["template"], "<TS> INFO user <*> logged in from <PATH>")
+        self.assertEqual(users["count"], 41)
+        self.assertEqual(errors["template"], "<TS> ERROR db timeout after <NUM>ms host=<IP>")
+        self.assertEqual((errors["count"], errors["first_line"], errors["last_line"]), (10, 30, 302))
+
+    def test_masks(self):
+        self.assertEqual(
+            patterns.mask("2024-01-01 12:00:05,120 v2 took -3.5s id=0x1f 9f86d081884c7d65 at 192.168.1.10:443"),
+            "<TS> v2 took -<NUM>s id=<HEX> <HEX> at <IP>",
+        )
+        self.assertEqual(
+            patterns.mask("req 123e4567-e89b-12d3-a456-426614174000 read /var/log/app.log a/b"),
+            "req <UUID> read <PATH> a/b",
+        )
+
+    def test_engines_agree(self):
+        expected = self._patterns()
+        with mock.patch.object(file_reckoning, "supports_byte_engine", return_value=False):
+            self.assertEqual(self._patterns(), expected)
+        with mock.patch.object(source, "REGION_BYTES", 200):
+            self.assertEqual(self._patterns(), expected)
+        with (
+            mock.patch.object(parallel, "PARALLEL_MIN_FILE_BYTES", 0),
+            mock.patch.object(parallel, "PARALLEL_MIN_CHUNK_BYTES", 1000),
+        ):
+            self.assertEqual(self._patterns(workers=2), expected)
+
+        gz_path = Path(self.tmpdir.name) / "app.log.gz"
+        gz_path.write_bytes(gzip.compress(self.file_path.read_bytes()))
+        self.assertEqual(self._patterns(gz_path), expected)
+
+    def test_cluster_count_is_bounded(self):
+        miner = patterns.TemplateMiner(max_clusters=5)
+        text = "".join(f"event{i} alpha beta\n" for i in range(100)) + "event0 alpha beta\n" * 50
+        miner.feed_region(text, 1)
+        self.assertLessEqual(miner.clusters, 10)
+        self.assertEqual(miner.lines, 150)
+        total = sum(c.count for group in miner.groups.values() for c in group)
+        self.assertEqual(total + miner.evicted_lines, 150)
+        self.assertEqual(miner.top(1)[0].as_dict()["template"], "event0 alpha beta")
+
+
+if __name__ == "__main__":
+    unittest.main()
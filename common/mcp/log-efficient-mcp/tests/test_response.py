@@ -0,0 +1,104 @@
+import json
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools.reckoning import response  # noqa: E402
+
+
+class ResponseBudgetTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmpdir.name) / "app.log"
+        lines = [f"2024-05-01T10:00:{i % 60:02d} INFO step {i}\n" for i in range(1, 41)]
+        lines[9] = "2024-05-01T10:00:10 ERROR blob=" + "A" * 50_000 + "END\n"
+        lines[20:30] = ["2024-05-01T10:00:20 WARN retrying upstream\n"] * 10
+        lines[30:35] = [f"2024-05-01T10:00:3{i} WARN retry {i} failed\n" for i in range(5)]
+        self.lines = lines
+        self.file_path.write_text("".join(lines), encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _explore(self, **kwargs):
+        return server.log_explore(path=str(self.file_path), **kwargs)
+
+    def test_clip_line_keeps_head_and_tail(self):
+        clipped = response.clip_line("x" * 1000 + "TAIL", 200)
+        self.assertLessEqual(len(clipped), 200)
+        self.assertTrue(clipped.startswith("x" * 100))
+        self.assertTrue(clipped.endswith("TAIL"))
+        self.assertIn("[836 chars clipped]", clipped)
+        self.assertEqual(response.clip_line("short", 200), "short")
+
+    def test_long_lines_are_clipped_and_runs_collapsed(self):
+        content = self._explore(action="head", max_lines=40, max_line_chars=300)
+        lines = content.splitlines()
+        blob = lines[9]
+        self.assertLessEqual(len(blob), 300)
+        self.assertTrue(blob.startswith("2024-05-01T10:00:10 ERROR blob=AAA"))
+        self.assertTrue(blob.endswith("AAEND"))
+        self.assertEqual(lines[20:22], ["2024-05-01T10:00:20 WARN retrying upstream", "[×10 identical lines 21-30]"])
+        self.assertEqual(len(lines), 40 - 9 + 1)
+
+        similar = self._explore(action="range", start_line=21, end_line=35, collapse="similar")
+        self.assertEqual(
+            similar,
+            "2024-05-01T10:00:20 WARN retrying upstream\n[×10 similar lines 21-30]\n"
+            "2024-05-01T10:00:30 WARN retry 0 failed\n[×5 similar lines 31-35]\n",
+        )
+        plain = self._explore(action="range", start_line=21, end_line=35, collapse="none", max_line_chars=100_000)
+        self.assertEqual(plain, "".join(self.lines[20:35]))
+
+    def test_runs_collapse_only_when_the_marker_is_shorter(self):
+        short = [{"line": i, "raw": "ok\n"} for i in range(1, 6)]
+        self.assertEqual(response.render_rows(short), ("ok\n" * 5, 5))
+        long = [{"line": i, "raw": "retrying upstream\n"} for i in range(1, 6)]
+        self.assertEqual(response.render_rows(long), ("retrying upstream\n[×5 identical lines 1-5]\n", 5))
+        medium = [{"line": i, "raw": "retry 0001\n"} for i in range(1, 4)]
+        self.assertEqual(response.render_rows(medium), ("retry 0001\n" * 3, 3))
+
+    def test_budget_stops_head_and_tail_with_a_marker(self):
+        content = self._explore(action="head", max_lines=40, max_chars=1000, collapse="none")
+        self.assertLessEqual(len(content), 1000 + 100)
+        self.assertTrue(content.endswith("more lines omitted: max_chars budget reached]\n"))
+        self.assertTrue(content.startswith(self.lines[0]))
+
+        content = self._explore(action="tail", max_lines=40, max_chars=1000, collapse="none")
+        self.assertTrue(content.startswith("["))
+        self.assertTrue(content.endswith(self.lines[-1]))
+
+    def test_budget_pages_search_results(self):
+        kwargs = dict(action="search", query="2024", regex=True, after=1, collapse="none", max_line_chars=200)
+        expected = self._explore(max_matches=5000, **kwargs)
+        pages = []
+        result = self._explore(max_chars=1000, **kwargs)
+        while marker := re.search(r"\[more results: repeat the call with cursor=(\S+)\]\n\Z", result):
+            self.assertLessEqual(marker.start(), 1000)
+            pages.append(result[: marker.start()])
+            result = self._explore(max_chars=1000, cursor=marker.group(1), **kwargs)
+        pages.append(result)
+        self.assertGreater(len(pages), 1)
+        self.assertEqual("".join(pages), expected)
+
+    def test_json_and_time_range_respect_the_budget(self):
+        json_path = Path(self.tmpdir.name) / "svc.jsonl"
+        records = "".join(json.dumps({"i": i, "pad": "p" * 200}) + "\n" for i in range(50))
+        json_path.write_text(records, encoding="utf-8")
+        result = server.log_explore(path=str(json_path), action="json", max_chars=2000)
+        self.assertTrue(result["truncated"])
+        self.assertLessEqual(len(result["content"]), 2000)
+        self.assertIsNotNone(result["cursor"])
+
+        result = self._explore(action="time_range", start_time="2024-05-01T10:00:05", max_line_chars=200)
+        self.assertIn("chars clipped]", result["content"])
+        self.assertLess(len(result["content"]), 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import gzip
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools.reckoning import line_index, sample, source  # noqa: E402
+
+
+class SampleTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmpdir.name) / "app.log"
+        rng = random.Random(5)
+        self.lines = [f"{i} INFO {'x' * rng.randrange(10, 90)}\n" for i in range(1, 20001)]
+        self.file_path.write_text("".join(self.lines), encoding="utf-8")
+        self.patches = [
+            mock.patch.object(sample, "SAMPLE_WINDOW_BYTES", 1024),
+            mock.patch.dict(os.environ, {source.CACHE_DIR_ENV_VAR: self.tmpdir.name}),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        line_index._MEMORY_CACHE.clear()
+        self.tmpdir.cleanup()
+
+    def _sample(self, path=None, **kwargs):
+        return server.log_explore(path=str(path or self.file_path), action="sample", **kwargs)
+
+    def _labelled(self, result):
+        """`(label, true line number, text)` for each sampled line."""
+        rows = []
+        for line in result["content"].splitlines(keepends=True):
+            label, text = line.split(":", 1)
+            rows.append((label, int(text.split(" ", 1)[0]), text))
+        return rows
+
+    def test_stratified_samples_span_the_file_with_estimated_numbers(self):
+        result = self._sample(max_lines=20)
+        self.assertFalse(result["exact"])
+        self.assertEqual(result["samples"], 20)
+        self.assertAlmostEqual(result["estimated_lines"], len(self.lines), delta=len(self.lines) * 0.1)
+        rows = self._labelled(result)
+        true_lines = [line for _, line, _ in rows]
+        self.assertEqual(true_lines, sorted(set(true_lines)))
+        # One sample per twentieth of the file.
+        for stratum, line in enumerate(true_lines):
+            self.assertLess(abs(line - (stratum + 0.5) * 1000), 1000)
+        for label, line, text in rows:
+            self.assertTrue(label.startswith("~"))
+            self.assertAlmostEqual(int(label[1:]), line, delta=len(self.lines) * 0.1)
+            self.assertEqual(text, self.lines[line - 1])
+
+    def test_cached_line_index_gives_exact_numbers(self):
+        line_index.load_line_index(self.file_path, stride=4096)
+        result = self._sample(max_lines=30, sampling="random", seed=3)
+        self.assertTrue(result["exact"])
+        self.assertEqual(result["estimated_lines"], len(self.lines))
+        for label, line, _ in self._labelled(result):
+            self.assertEqual(int(label), line)
+
+    def test_seeded_random_sampling_is_repeatable(self):
+        first = self._sample(max_lines=10, sampling="random", seed=1)
+        self.assertEqual(first, self._sample(max_lines=10, sampling="random", seed=1))
+        self.assertNotEqual(first["content"], self._sample(max_lines=10, sampling="random", seed=2)["content"])
+
+    def test_small_files_are_counted_exactly(self):
+        small = Path(self.tmpdir.name) / "small.log"
+        small.write_text("a\nbb\nccc", encoding="utf-8")
+        result = self._sample(small, max_lines=50)
+        self.assertTrue(result["exact"])
+        self.assertEqual(result["estimated_lines"], 3)
+        self.assertEqual(result["content"], "1:a\n2:bb\n3:ccc")
+
+        empty = Path(self.tmpdir.name) / "empty.log"
+        empty.write_bytes(b"")
+        self.assertEqual(self._sample(empty)["samples"], 0)
+
+    def test_compressed_files_are_rejected(self):
+        packed = Path(self.tmpdir.name) / "app.log.gz"
+        packed.write_bytes(gzip.compress(self.file_path.read_bytes()))
+        with self.assertRaises(ValueError):
+            self._sample(packed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools.script_job import JOBS  # noqa: E402
+
+
+class ScriptJobTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log_dir = Path(self.tmpdir.name) / "logs"
+        self.started = []
+
+    def tearDown(self):
+        for job_id in self.started:
+            try:
+                server.script_job(action="cancel", job_id=job_id)
+            except ValueError:
+                pass
+        self.tmpdir.cleanup()
+
+    def _start(self, script, **kwargs):
+        result = server.script_runna(script=script, output_dir=str(self.log_dir), background=True, **kwargs)
+        self.started.append(result["job_id"])
+        return result
+
+    def _poll_until(self, job_id, done, cursor=""):
+        content = ""
+        for _ in range(100):
+            result = server.script_job(job_id=job_id, cursor=cursor, wait_seconds=2)
+            content += result["content"]
+            cursor = result["cursor"]
+            if done(result, content):
+                return result, content
+        self.fail("job did not reach the expected state")
+
+    def _poll_until_complete(self, job_id, cursor=""):
+        return self._poll_until(job_id, lambda result, content: result["complete"], cursor)
+
+    def test_start_returns_immediately_and_polls_incremental_output(self):
+        began = time.monotonic()
+        started = self._start("echo first; sleep 1; echo second; printf tail; exit 3")
+        self.assertLess(time.monotonic() - began, 0.5)
+        self.assertEqual(started["state"], "running")
+        self.assertTrue(Path(started["output_file"]).exists())
+
+        # Login shells may print their own banner first.
+        first, head = self._poll_until(started["job_id"], lambda result, content: "first" in content, started["cursor"])
+        self.assertEqual((first["state"], first["exit_code"]), ("running", None))
+        self.assertTrue(head.endswith("first\n"))
+        self.assertFalse(first["complete"])
+
+        last, rest = self._poll_until_complete(started["job_id"], first["cursor"])
+        self.assertEqual(rest, "second\ntail\n")
+        self.assertEqual((last["state"], last["exit_code"]), ("exited", 3))
+        self.assertGreaterEqual(last["elapsed_seconds"], 1)
+
+        status = server.script_job(action="status", job_id=started["job_id"])
+        self.assertNotIn("content", status)
+        self.assertEqual(status["elapsed_seconds"], last["elapsed_seconds"])
+        # Without a cursor, polling starts again from line 1.
+        self.assertEqual(server.script_job(job_id=started["job_id"])["content"], head + rest)
+
+    def test_cancel_kills_the_process_group(self):
+        marker = Path(self.tmpdir.name) / "marker"
+        started = self._start(f"(sleep 1; touch {marker}) & echo started; wait")
+        self._poll_until(started["job_id"], lambda result, content: "started" in content)
+        cancelled = server.script_job(action="cancel", job_id=started["job_id"])
+        self.assertEqual(cancelled["state"], "cancelled")
+        time.sleep(1.5)
+        self.assertFalse(marker.exists())
+        self.assertTrue(Path(cancelled["output_file"]).read_text().endswith("started\n\n[script_runna] cancelled\n"))
+
+    def test_timeout(self):
+        started = self._start("sleep 30", timeout_seconds=1)
+        last, content = self._poll_until_complete(started["job_id"])
+        self.assertEqual(last["state"], "timed_out")
+        self.assertLess(last["elapsed_seconds"], 10)
+        self.assertTrue(content.endswith("\n[script_runna] timeout after 1s\n"))
+
+    def test_registry_caps_running_jobs_and_forgets_finished_ones(self):
+        with mock.patch.multiple(JOBS, max_running=1, keep_finished=1):
+            first = self._start("sleep 30")
+            with self.assertRaises(ValueError):
+                self._start("echo no")
+            server.script_job(action="cancel", job_id=first["job_id"])
+            second = self._start("echo ok")
+            self._poll_until_complete(second["job_id"])
+            listed = server.script_job(action="list")
+            self.assertEqual([job["job_id"] for job in listed["jobs"]], [second["job_id"]])
+            with self.assertRaises(ValueError):
+                server.script_job(action="status", job_id=first["job_id"])
+        with self.assertRaises(ValueError):
+            server.script_job(action="poll")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 from _server_loader import load_server_module
 
@@ -58,6 +59,85 @@ class ScriptRunnaTests(unittest.TestCase):
         self.assertIn("output_file", result)
         self.assertNotIn("output", result)
 
+    def test_summary_is_built_while_the_log_is_written(self):
+        result = server.script_runna(
+            script="for i in $(seq 1 500); do echo step-$i; [ $((i % 100)) = 0 ] && echo \"ERROR: bad $i\"; done; "
+            "echo 'warning: last'; printf done",
+            output_dir=str(self.log_dir),
+            return_mode="path_only",
+        )
+        summary = result["summary"]
+        raw = Path(result["output_file"]).read_bytes()
+        self.assertEqual((summary["bytes"], summary["lines"]), (len(raw), raw.count(b"\n") + 1))
+        # Login shells may print warnings of their own.
+        self.assertEqual((summary["counts"]["error"], summary["counts"]["failure"]), (5, 0))
+        self.assertGreaterEqual(summary["counts"]["warning"], 1)
+        for hit in summary["hits"]:
+            self.assertTrue(raw[hit["offset"] :].startswith(hit["text"].encode()))
+        self.assertEqual(summary["hits"][-1]["text"], "warning: last")
+        self.assertTrue(summary["tail"].endswith("warning: last\ndone\n"))
+
+        small = server.script_runna(
+            script="echo hello", output_dir=str(self.log_dir), summary_patterns={"greeting": "hel+o"}
+        )
+        self.assertNotIn("summary", small)
+        silent = server.script_runna(
+            script="echo hello; seq 1 2000", output_dir=str(self.log_dir), summary_max_chars=0, inline_output_epsilon=10
+        )
+        self.assertNotIn("summary", silent)
+        with self.assertRaises(ValueError):
+            server.script_runna(script="true", output_dir=str(self.log_dir), summary_patterns={"bad": "("})
+
+    def test_auto_inline_output_does_not_read_the_log_back(self):
+        with mock.patch.object(Path, "read_text", side_effect=AssertionError("log re-read")):
+            result = server.script_runna(script="printf 'a\\r\\nb\\n'", output_dir=str(self.log_dir))
+        self.assertTrue(result["output"].endswith("a\nb\n"))
+
+    def test_timeout_kills_the_process_group(self):
+        pid_file = Path(self.tmpdir.name) / "child.pid"
+        result = server.script_runna(
+            script=f"(echo $BASHPID > {pid_file}; exec sleep 60) & wait",
+            output_dir=str(self.log_dir),
+            timeout_seconds=3,
+            return_mode="path_only",
+        )
+        self.assertTrue(result["timed_out"])
+        stat = Path(f"/proc/{pid_file.read_text().strip()}/stat")
+        # Gone, or a zombie nobody has reaped yet: either way no longer running.
+        self.assertTrue(not stat.exists() or stat.read_text().rsplit(")", 1)[1].split()[0] == "Z")
+
+    def test_batch_runs_scripts_in_parallel_with_their_own_logs(self):
+        result = server.script_runna(
+            scripts=["sleep 1; echo one", "echo 'ERROR: boom'; echo trailing; exit 2", "sleep 1; echo three"],
+            output_dir=str(self.log_dir),
+            max_parallel=3,
+        )
+        self.assertEqual(result["exit_code"], 1)
+        self.assertEqual(result["counts"], {"ok": 2, "failed": 1})
+        self.assertLess(result["wall_seconds"], result["script_seconds"] * 0.8)
+        ok, failed, _ = result["scripts"]
+        self.assertEqual((ok["status"], ok["exit_code"], ok["last_errors"]), ("ok", 0, ""))
+        self.assertTrue(Path(ok["output_file"]).read_text().endswith("one\n"))
+        self.assertEqual((failed["status"], failed["exit_code"]), ("failed", 2))
+        self.assertEqual(failed["last_errors"], "ERROR: boom\n")
+        self.assertEqual(len({entry["output_file"] for entry in result["scripts"]}), 3)
+
+    def test_batch_fail_fast_and_timeout(self):
+        result = server.script_runna(
+            scripts=["exit 3", "sleep 60", "echo never"], output_dir=str(self.log_dir), max_parallel=2, fail_fast=True
+        )
+        self.assertEqual([entry["status"] for entry in result["scripts"]], ["failed", "cancelled", "skipped"])
+        self.assertLess(result["wall_seconds"], 30)
+        self.assertNotIn("output_file", result["scripts"][2])
+
+        timed = server.script_runna(scripts=["sleep 60"], output_dir=str(self.log_dir), timeout_seconds=1)
+        self.assertEqual(timed["scripts"][0]["status"], "timed_out")
+        self.assertIn("timeout after 1s", timed["scripts"][0]["last_errors"])
+
+        for kwargs in ({"scripts": []}, {"scripts": ["echo", " "]}, {"scripts": ["echo"], "script": "echo"}):
+            with self.assertRaises(ValueError):
+                server.script_runna(output_dir=str(self.log_dir), **kwargs)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,112 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools import file_reckoning  # noqa: E402
+from tools.reckoning import search, source  # noqa: E402
+
+
+LINES = [
+    "INFO boot",
+    "ERROR café failed id=17",
+    "",
+    "WARN retry a b",
+    "ERROR 日本 timeout id=42",
+    "   ",
+    "INFO a  b done",
+    "error lower id=7",
+    "INFO tail",
+]
+
+
+class ByteSearchEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmpdir.name) / "search.log"
+        self.file_path.write_text("\n".join(LINES), encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _both_engines(self, action, **kwargs):
+        with mock.patch.object(file_reckoning, "supports_byte_engine", return_value=False):
+            expected = server.log_explore(path=str(self.file_path), action=action, **kwargs)
+        for region_bytes in (1, 7, 1 << 20):
+            with mock.patch.object(source, "REGION_BYTES", region_bytes):
+                result = server.log_explore(path=str(self.file_path), action=action, **kwargs)
+            self.assertEqual(result, expected, f"region_bytes={region_bytes}")
+        return expected
+
+    def test_literal_search_matches_text_engine(self):
+        result = self._both_engines("search", query="ERROR", before=1, after=1)
+        self.assertIn("ERROR café failed id=17\n", result)
+        self.assertTrue(result.startswith("INFO boot\n"))
+
+    def test_ignore_case_and_context_across_regions(self):
+        self._both_engines("search", query="error", ignore_case=True, before=2, after=2, max_matches=2)
+        self._both_engines("search", query="é", before=3, after=3)
+
+    def test_regex_search_and_cross_line_candidates(self):
+        self._both_engines("search", query=r"a\s*b", regex=True, after=1)
+        self._both_engines("search", query=r"^I.*[^e]$", regex=True)
+        self._both_engines("search", query=r"id=\d+$", regex=True, max_matches=1, after=5)
+
+    def test_extract_groups_match_text_engine(self):
+        rows = file_reckoning._extract_lines(
+            self.file_path, query=r"(\w+) id=(?P<id>\d+)", ignore_case=False, max_matches=10, encoding="utf-8"
+        )
+        self.assertEqual([row["groups"] for row in rows], [{"id": "17"}, {"id": "42"}, {"id": "7"}])
+        self._both_engines("extract", query=r"ERROR (\S+)")
+
+    def test_string_anchors_and_lookarounds_match_per_line(self):
+        self.file_path.write_text("xab\nab\nfooab\nab\n", encoding="utf-8")
+        self.assertEqual(self._both_engines("search", query=r"ab\Z", regex=True), "xab\nab\nfooab\nab\n")
+        self.assertEqual(self._both_engines("search", query=r"\Aab", regex=True), "ab\nab\n")
+        self.assertEqual(self._both_engines("search", query=r"(?<!\n)ab(?!\n)", regex=True), "xab\nab\nfooab\nab\n")
+        self.assertEqual(self._both_engines("search", query=r"(?<!x)(?:foo)?ab\Z", regex=True), "ab\nfooab\nab\n")
+
+    def test_crlf_lines_are_normalized(self):
+        self.file_path.write_bytes(b"INFO one\r\nERROR two\r\nINFO three\r\n")
+        result = self._both_engines("search", query=r"two$", regex=True, before=1)
+        self.assertEqual(result, "INFO one\nERROR two\n")
+
+    def test_prefiltered_regex_matches_unplanned_scan(self):
+        queries = [r"(ERROR|error) \S+ failed", r"(?i)\S+ LOWER id=(\d+)", r".*timeout id=(\d+)", r"[^ ]+ a  b done"]
+        for query in queries:
+            self.assertIsNotNone(search.compile_query(query, regex=True, ignore_case=False).prefilter, query)
+            planned = self._both_engines("extract", query=query)
+            with mock.patch.object(search, "required_literal", return_value=(None, False)):
+                search.compile_query.cache_clear()
+                self.assertEqual(self._both_engines("extract", query=query), planned, query)
+            search.compile_query.cache_clear()
+            self.assertTrue(planned, query)
+
+
+class QueryPlanTests(unittest.TestCase):
+    def test_required_literal(self):
+        self.assertEqual(search.required_literal(r"\d+ ERROR.*id=(\w+)"), (" ERROR", False))
+        self.assertEqual(search.required_literal(r"^ERROR.*id="), ("ERROR", True))
+        self.assertEqual(search.required_literal(r"(?:x|y)+ (?:timeout)+"), ("timeout", False))
+        self.assertEqual(search.required_literal(r"ab|cd"), (None, False))
+        self.assertEqual(search.required_literal(r"(?:timeout)?\s+id"), (None, False))
+        self.assertEqual(search.required_literal(r"(?i:timeout)\s+id"), (None, False))
+
+    def test_line_local(self):
+        self.assertTrue(search.line_local(r"^ERROR .*id=\d+$"))
+        for query in (r"ab\Z", r"\Aab", r"(?:x|(?<!a)b)+", r"(ab(?=c))?"):
+            self.assertFalse(search.line_local(query), query)
+
+    def test_compiled_queries_are_cached(self):
+        first = search.compile_query("x+ timeout", regex=True, ignore_case=True)
+        self.assertIs(search.compile_query("x+ timeout", regex=True, ignore_case=True), first)
+        self.assertIsNone(first.match_line("x TIME"))
+        self.assertIsNotNone(first.match_line("xx TimeOut"))
+
+
+if __name__ == "__main__":
+    unittest.main()
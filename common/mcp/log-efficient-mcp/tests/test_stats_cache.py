@@ -0,0 +1,109 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools.reckoning import stats_cache  # noqa: E402
+
+
+class StatsCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_cache_dir = os.environ.get("LOG_EFFICIENT_MCP_CACHE_DIR")
+        os.environ["LOG_EFFICIENT_MCP_CACHE_DIR"] = str(Path(self.tmpdir.name) / "cache")
+        stats_cache._MEMORY_CACHE.clear()
+        self.file_path = Path(self.tmpdir.name) / "growing.log"
+        self.file_path.write_text("INFO a\n\nWARN bb\n", encoding="utf-8")
+
+    def tearDown(self):
+        stats_cache._MEMORY_CACHE.clear()
+        if self.original_cache_dir is None:
+            os.environ.pop("LOG_EFFICIENT_MCP_CACHE_DIR", None)
+        else:
+            os.environ["LOG_EFFICIENT_MCP_CACHE_DIR"] = self.original_cache_dir
+        self.tmpdir.cleanup()
+
+    def _stats(self):
+        return server.log_explore(path=str(self.file_path), action="stats")["stats"]
+
+    def _append(self, text):
+        with self.file_path.open("a", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_append_only_scans_new_bytes(self):
+        self._stats()
+        resume = self.file_path.stat().st_size
+        self._append("ERROR ccc\nINFO partial")
+        with mock.patch.object(stats_cache, "_scan", wraps=stats_cache._scan) as scan:
+            stats = self._stats()
+        self.assertEqual(scan.call_args.kwargs["start"], resume)
+        self.assertEqual(stats["lines"], 5)
+        self.assertEqual(stats["non_empty_lines"], 4)
+        self.assertEqual(stats["first_non_empty_line"], "INFO a")
+        self.assertEqual(stats["last_non_empty_line"], "INFO partial")
+
+        # The unterminated last line keeps growing and must not be double counted.
+        self._append(" done\n")
+        stats = self._stats()
+        self.assertEqual(stats["lines"], 5)
+        self.assertEqual(stats["last_non_empty_line"], "INFO partial done")
+        self.assertEqual(stats["max_line_length"], len("INFO partial done"))
+
+    def test_concurrent_calls_after_an_append_merge_it_once(self):
+        self._stats()
+        self._append("".join(f"line {i}\n" for i in range(20_000)))
+        barrier = threading.Barrier(4)
+        results = []
+
+        def stats():
+            barrier.wait()
+            results.append(self._stats()["lines"])
+
+        threads = [threading.Thread(target=stats) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [20_003] * 4)
+        self.assertEqual(self._stats()["lines"], 20_003)
+
+    def test_truncated_file_is_rescanned(self):
+        self._stats()
+        self.file_path.write_text("x\n", encoding="utf-8")
+        stats = self._stats()
+        self.assertEqual(stats["lines"], 1)
+        self.assertEqual(stats["first_non_empty_line"], "x")
+
+    def test_rewritten_prefix_is_rescanned(self):
+        self._stats()
+        self.file_path.write_text("DEBUG zz\n\nWARN bb\nmore\n", encoding="utf-8")
+        stats = self._stats()
+        self.assertEqual(stats["lines"], 4)
+        self.assertEqual(stats["first_non_empty_line"], "DEBUG zz")
+
+    def test_entries_persist_and_vanished_files_are_evicted(self):
+        with mock.patch.object(stats_cache, "STATS_PERSIST_MIN_FILE_BYTES", 0):
+            self._stats()
+            stats_cache._MEMORY_CACHE.clear()
+            with mock.patch.object(stats_cache, "_scan", wraps=stats_cache._scan) as scan:
+                self.assertEqual(self._stats()["lines"], 3)
+            scan.assert_not_called()
+
+            cache_dir = Path(os.environ["LOG_EFFICIENT_MCP_CACHE_DIR"]) / "stats"
+            self.assertEqual(len(list(cache_dir.glob("*.json"))), 1)
+            self.file_path.unlink()
+            other = Path(self.tmpdir.name) / "other.log"
+            other.write_text("y\n", encoding="utf-8")
+            server.log_explore(path=str(other), action="stats")
+            self.assertEqual(len(list(cache_dir.glob("*.json"))), 1)
+            self.assertEqual([e.path for e in stats_cache._MEMORY_CACHE.values()], [str(other.resolve())])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import random
+import re
+import unittest
+
+from _server_loader import load_server_module
+
+load_server_module()
+
+from tools.reckoning.search import literal_alternatives  # noqa: E402
+from tools.reckoning.stream_summary import DEFAULT_PATTERNS, StreamSummary, compile_patterns  # noqa: E402
+
+WORDS = ["ok", "Error:", "errors", "terror", "FATAL", "warn", "Warnings", "forewarned", "FAILED", "failing", "café"]
+
+
+class StreamSummaryTests(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.lines = [" ".join(rng.choice(WORDS) for _ in range(rng.randrange(1, 5))) for _ in range(3000)]
+        self.data = "\n".join(self.lines).encode("utf-8")
+
+    def _feed(self, data, seed=1, **kwargs):
+        kwargs.setdefault("patterns", compile_patterns(None))
+        summary = StreamSummary(**kwargs)
+        rng = random.Random(seed)
+        pos = 0
+        while pos < len(data):
+            step = rng.randrange(1, 400)
+            summary.feed(data[pos : pos + step])
+            pos += step
+        summary.finish()
+        return summary
+
+    def _expected_hits(self):
+        compiled = {label: re.compile(pattern) for label, pattern in DEFAULT_PATTERNS.items()}
+        hits, offset = [], 0
+        for number, line in enumerate(self.lines, start=1):
+            label = next((label for label, pattern in compiled.items() if pattern.search(line)), None)
+            if label is not None:
+                hits.append((number, offset, label, line))
+            offset += len(line.encode("utf-8")) + 1
+        return hits
+
+    def test_counts_and_hits_match_a_line_by_line_scan(self):
+        summary = self._feed(self.data, max_hits=10)
+        expected = self._expected_hits()
+        self.assertEqual((summary.lines, summary.bytes), (3000, len(self.data)))
+        self.assertEqual(
+            summary.counts, {label: sum(1 for hit in expected if hit[2] == label) for label in DEFAULT_PATTERNS}
+        )
+        result = summary.summary(max_chars=100_000)
+        shown = [(hit["line"], hit["offset"], hit["label"], hit["text"]) for hit in result["hits"]]
+        self.assertEqual(shown, expected[:5] + expected[-5:])
+        self.assertEqual(result["hits_omitted"], len(expected) - 10)
+        self.assertEqual(result["head"], "".join(line + "\n" for line in self.lines[:20]))
+        self.assertEqual(result["tail_start_line"], 2961)
+        self.assertEqual(result["tail"], "".join(line + "\n" for line in self.lines[-40:]))
+
+    def test_budget_keeps_first_and_last_hits(self):
+        result = self._feed(self.data).summary(max_chars=600)
+        self.assertLess(len(repr(result)), 1200)
+        expected = self._expected_hits()
+        self.assertEqual(result["hits"][0]["line"], expected[0][0])
+        self.assertEqual(result["hits"][-1]["line"], expected[-1][0])
+        self.assertTrue(result["tail"].startswith("[") and result["tail"].endswith(self.lines[-1] + "\n"))
+
+    def test_short_output_long_lines_and_custom_patterns(self):
+        short = self._feed(b"one\ntwo\n", keep_bytes=100).summary(max_chars=1000)
+        self.assertEqual((short["head"], short["tail"], short["tail_start_line"]), ("one\ntwo\n", "", None))
+
+        long_line = b"x" * 100_000 + b" ERROR at the end\nnext ERROR\n"
+        summary = self._feed(long_line, patterns=compile_patterns({"err": "ERROR"}), keep_bytes=10)
+        hits = summary.summary(max_chars=10_000)["hits"]
+        self.assertEqual([(hit["line"], hit["offset"]) for hit in hits], [(1, 0), (2, 100_018)])
+        self.assertEqual(bytes(summary.prefix), b"x" * 10)
+
+        for patterns in ({"bad": "("}, {"empty": ""}):
+            with self.assertRaises(ValueError):
+                compile_patterns(patterns)
+
+    def test_literal_alternatives(self):
+        self.assertEqual(literal_alternatives(r"(?i)\b(?:errors?|fatal)\b"), (("error", "fatal"), True))
+        self.assertEqual(literal_alternatives(r"(?:timeout|refused) after \d+"), ((" after ",), False))
+        self.assertIsNone(literal_alternatives(r"abc|de"))
+        self.assertIsNone(literal_alternatives(r"\d+ms"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools.reckoning import line_index  # noqa: E402
+from tools.reckoning.tail import read_tail  # noqa: E402
+
+
+class ReverseTailTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_cache_dir = os.environ.get("LOG_EFFICIENT_MCP_CACHE_DIR")
+        os.environ["LOG_EFFICIENT_MCP_CACHE_DIR"] = str(Path(self.tmpdir.name) / "cache")
+        line_index._MEMORY_CACHE.clear()
+        self.file_path = Path(self.tmpdir.name) / "tail.log"
+
+    def tearDown(self):
+        line_index._MEMORY_CACHE.clear()
+        if self.original_cache_dir is None:
+            os.environ.pop("LOG_EFFICIENT_MCP_CACHE_DIR", None)
+        else:
+            os.environ["LOG_EFFICIENT_MCP_CACHE_DIR"] = self.original_cache_dir
+        self.tmpdir.cleanup()
+
+    def test_missing_trailing_newline(self):
+        self.file_path.write_bytes(b"one\ntwo\nthree")
+        result = server.log_explore(path=str(self.file_path), action="tail", max_lines=2)
+        self.assertEqual(result, "two\nthree")
+
+    def test_multibyte_characters_across_block_boundaries(self):
+        lines = [f"{i} café ☃ 日本\n" for i in range(50)]
+        self.file_path.write_text("".join(lines), encoding="utf-8")
+        _, raw_lines = read_tail(self.file_path, max_lines=7, block_size=5)
+        self.assertEqual([raw.decode("utf-8") for raw in raw_lines], lines[-7:])
+
+    def test_blank_lines_and_short_files(self):
+        self.file_path.write_bytes(b"a\n\n\nb\n\n")
+        first_line, raw_lines = read_tail(self.file_path, max_lines=3, block_size=2)
+        self.assertEqual(raw_lines, [b"\n", b"b\n", b"\n"])
+        self.assertIsNone(first_line)
+        first_line, raw_lines = read_tail(self.file_path, max_lines=50, block_size=2)
+        self.assertEqual(first_line, 1)
+        self.assertEqual(raw_lines, [b"a\n", b"\n", b"\n", b"b\n", b"\n"])
+
+    def test_line_numbers_resolved_from_cached_index(self):
+        self.file_path.write_text("".join(f"row-{i}\n" for i in range(1, 301)), encoding="utf-8")
+        first_line, _ = read_tail(self.file_path, max_lines=5, block_size=64)
+        self.assertIsNone(first_line)
+        line_index.load_line_index(self.file_path, stride=128)
+        first_line, raw_lines = read_tail(self.file_path, max_lines=5, block_size=64)
+        self.assertEqual(first_line, 296)
+        self.assertEqual(raw_lines[0], b"row-296\n")
+
+    def test_line_number_counted_when_the_read_reaches_the_start(self):
+        self.file_path.write_text("".join(f"row-{i}\n" for i in range(1, 301)), encoding="utf-8")
+        first_line, raw_lines = read_tail(self.file_path, max_lines=5)
+        self.assertEqual((first_line, raw_lines[0]), (296, b"row-296\n"))
+        self.file_path.write_bytes(b"a\n\n\nb\n\n")
+        self.assertEqual(read_tail(self.file_path, max_lines=3, block_size=4), (3, [b"\n", b"b\n", b"\n"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
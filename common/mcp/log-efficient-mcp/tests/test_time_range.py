@@ -0,0 +1,138 @@
+import gzip
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+from _server_loader import load_server_module
+
+server = load_server_module()
+
+from tools.reckoning import time_range, timestamps  # noqa: E402
+
+
+class TimeRangeTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.tmpdir.name) / "app.log"
+        start = datetime(2024, 5, 1, 23, 50)
+        self.entries = []
+        for i in range(600):
+            stamp = start + timedelta(seconds=2 * i)
+            lines = [f"{stamp:%Y-%m-%d %H:%M:%S},{i % 1000:03d} INFO step {i}\n"]
+            if i % 25 == 0:
+                lines += ["Traceback (most recent call last):\n", '  File "job.py", line 9\n']
+            self.entries.append((stamp, lines))
+        self.file_path.write_text("".join(line for _, lines in self.entries for line in lines), encoding="utf-8")
+        self.patches = [
+            mock.patch.object(time_range, "TIME_BLOCK_BYTES", 128),
+            mock.patch.object(time_range, "TIME_LINEAR_BYTES", 256),
+            mock.patch.object(time_range, "TIME_SAMPLE_LINES", 20),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmpdir.cleanup()
+
+    def _window(self, path=None, **kwargs):
+        kwargs.setdefault("max_lines", 5000)
+        return server.log_explore(path=str(path or self.file_path), action="time_range", **kwargs)
+
+    def _expected(self, start, end):
+        return "".join(
+            line
+            for stamp, lines in self.entries
+            if (start is None or stamp >= start) and (end is None or stamp < end)
+            for line in lines
+        )
+
+    def test_bisection_matches_a_full_scan(self):
+        for offset, length in ((0, 10), (3, 7), (49, 1), (400, 900), (1190, 30), (1300, 5)):
+            start = datetime(2024, 5, 1, 23, 50) + timedelta(seconds=offset)
+            end = start + timedelta(seconds=length)
+            result = self._window(start_time=start.isoformat(), end_time=end.isoformat())
+            self.assertEqual(result["content"], self._expected(start, end), (offset, length))
+        self.assertEqual(result["lines"], 0)
+        self.assertEqual(result["format"], "iso")
+
+    def test_probes_read_a_fraction_of_the_file(self):
+        result = self._window(start_time="2024-05-02T00:05:00", end_time="2024-05-02T00:05:04")
+        self.assertEqual(result["lines"], 4)
+        blocks = self.file_path.stat().st_size // time_range.TIME_BLOCK_BYTES
+        self.assertLess(result["reads"], blocks // 4)
+        raw = self.file_path.read_bytes()
+        first = raw[result["first_byte"] :].splitlines(keepends=True)[0]
+        self.assertEqual(first, b"2024-05-02 00:05:00,450 INFO step 450\n")
+
+    def test_open_bounds_bare_times_and_truncation(self):
+        midnight = datetime(2024, 5, 2)
+        second = timedelta(seconds=1)
+        result = self._window(end_time="2024-05-01T23:50:04")
+        self.assertEqual(result["content"], self._expected(None, midnight - 596 * second))
+        result = self._window(start_time="23:59:58", end_time="00:00:02")
+        self.assertEqual(result["content"], self._expected(midnight - 2 * second, midnight + 2 * second))
+        self.assertEqual(result["end_time"], "2024-05-02T00:00:02")
+        result = self._window(start_time="2024-05-02 00:09", max_lines=3)
+        self.assertTrue(result["truncated"])
+        self.assertEqual(result["lines"], 3)
+
+    def test_compressed_and_text_fallbacks_agree(self):
+        kwargs = dict(start_time="2024-05-01T23:55:00", end_time="2024-05-01T23:56:00")
+        expected = self._window(**kwargs)
+        gz_path = Path(self.tmpdir.name) / "app.log.gz"
+        gz_path.write_bytes(gzip.compress(self.file_path.read_bytes()))
+        utf16_path = Path(self.tmpdir.name) / "app.utf16.log"
+        utf16_path.write_text(self.file_path.read_text(encoding="utf-8"), encoding="utf-16")
+        for result in (self._window(gz_path, **kwargs), self._window(utf16_path, encoding="utf-16", **kwargs)):
+            self.assertEqual(result["content"], expected["content"])
+            self.assertEqual(result["first_line"], 150 + 2 * 6 + 1)
+
+    def test_other_formats(self):
+        clf = Path(self.tmpdir.name) / "access.log"
+        clf.write_text(
+            "".join(f'10.0.0.1 - - [01/May/2024:10:{m:02d}:00 +0000] "GET / HTTP/1.1" 200 5\n' for m in range(60)),
+            encoding="utf-8",
+        )
+        result = self._window(clf, start_time="2024-05-01T10:30", end_time="2024-05-01T10:32")
+        self.assertEqual((result["format"], result["lines"]), ("clf", 2))
+
+        syslog = Path(self.tmpdir.name) / "syslog"
+        syslog.write_text("".join(f"May  {d} 06:00:00 host cron[1]: run {d}\n" for d in range(1, 10)), encoding="utf-8")
+        result = self._window(syslog, start_time="May  3 00:00:00", end_time="2024-05-05")
+        self.assertEqual(result["format"], "syslog")
+        self.assertEqual(result["content"], "".join(syslog.read_text(encoding="utf-8").splitlines(keepends=True)[2:4]))
+
+        custom = Path(self.tmpdir.name) / "custom.log"
+        custom.write_text("".join(f"[{h:02d}h00 01.05.2024] tick\n" for h in range(24)), encoding="utf-8")
+        result = self._window(custom, time_format="%Hh%M %d.%m.%Y", start_time="2024-05-01 22:00")
+        self.assertEqual(result["content"], "[22h00 01.05.2024] tick\n[23h00 01.05.2024] tick\n")
+
+    def test_bare_times_with_a_single_digit_hour(self):
+        iso = timestamps.KNOWN_FORMATS[0]
+        reference = datetime(2024, 5, 1, 23, 50)
+        self.assertEqual(timestamps.parse_bound("9:05", iso, reference), datetime(2024, 5, 1, 9, 5))
+        self.assertEqual(timestamps.parse_bound("9:05:30", iso, reference), datetime(2024, 5, 1, 9, 5, 30))
+        self.assertEqual(timestamps.parse_bound("9:05:30,5", iso, reference), datetime(2024, 5, 1, 9, 5, 30, 500000))
+        for bad in ("25:00", "9:75:30"):
+            with self.assertRaisesRegex(ValueError, "Cannot parse time bound"):
+                timestamps.parse_bound(bad, iso, reference)
+        result = self._window(start_time="23:59:58", end_time="0:00:02")
+        self.assertEqual(result["end_time"], "2024-05-02T00:00:02")
+
+    def test_invalid_requests(self):
+        with self.assertRaises(ValueError):
+            self._window()
+        with self.assertRaises(ValueError):
+            self._window(start_time="soon")
+        with self.assertRaises(ValueError):
+            self._window(start_time="10:00", time_format="rfc2822")
+        with self.assertRaises(ValueError):
+            timestamps.strptime_format("%Q")
+
+
+if __name__ == "__main__":
+    unittest.main()
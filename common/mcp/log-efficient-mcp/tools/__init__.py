@@ -3,6 +3,8 @@
 from tools.file_reckoning import log_explore
 from tools.health import health
 from tools.script_runna import script_runna
+from tools.script_job import script_job
 from tools.handoff_instructions import handoff_instructions
+from tools.metrics import metrics
 
-__all__ = ["log_explore", "script_runna", "health", "handoff_instructions"]
+__all__ = ["log_explore", "script_runna", "script_job", "health", "handoff_instructions", "metrics"]
@@ -0,0 +1,101 @@
+"""Async registration for blocking tools.
+
+`@offloaded_tool(name)` registers an async FastMCP tool that runs the
+decorated synchronous function in that tool's own bounded thread pool, so a
+long scan or script never blocks the event loop (or `health`). Calls beyond
+`TOOL_CONCURRENCY[name]` queue for a free thread. The synchronous function
+is returned unchanged for direct use.
+
+When the client cancels a call, the worker is asked to stop through
+`tools.reckoning.progress`: queued calls never start, scans stop at their
+next region checkpoint, and `script_runna` kills its process. Checkpoints
+are forwarded as MCP progress notifications when the client asked for them.
+Every call that starts is timed and recorded by `tools.metrics`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from mcp_app import mcp
+from tools.metrics import measured_call
+from tools.reckoning.progress import ScanControl, scan_control
+
+TOOL_CONCURRENCY = {"log_explore": 4, "script_runna": 4, "script_job": 4}
+DEFAULT_TOOL_CONCURRENCY = 2
+
+_EXECUTORS: dict[str, ThreadPoolExecutor] = {}
+
+
+def tool_executor(name: str) -> ThreadPoolExecutor:
+    """Thread pool for tool `name`, sized by `TOOL_CONCURRENCY`."""
+    executor = _EXECUTORS.get(name)
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=TOOL_CONCURRENCY.get(name, DEFAULT_TOOL_CONCURRENCY), thread_name_prefix=f"tool-{name}"
+        )
+        _EXECUTORS[name] = executor
+    return executor
+
+
+def _progress_reporter(loop: asyncio.AbstractEventLoop) -> Callable[[float, float | None], None] | None:
+    """Forward checkpoints to the current FastMCP request's progress token, if any."""
+    try:
+        from fastmcp.server.dependencies import get_context
+
+        ctx = get_context()
+    except (ImportError, RuntimeError):
+        return None
+
+    def report(done: float, total: float | None) -> None:
+        asyncio.run_coroutine_threadsafe(ctx.report_progress(progress=done, total=total), loop)
+
+    return report
+
+
+async def run_offloaded(
+    name: str,
+    func: Callable[..., object],
+    args: tuple = (),
+    kwargs: dict[str, object] | None = None,
+    *,
+    on_progress: Callable[[float, float | None], None] | None = None,
+) -> object:
+    """Run `func(*args, **kwargs)` in the pool of tool `name`; cancel it cooperatively if the caller is cancelled."""
+    control = ScanControl(on_progress=on_progress)
+    context = contextvars.copy_context()
+    kwargs = kwargs or {}
+    queued_at = time.perf_counter()
+
+    def call() -> object:
+        with scan_control(control), measured_call(name, func, args, kwargs, queued_at=queued_at) as outcome:
+            outcome.result = func(*args, **kwargs)
+            return outcome.result
+
+    future = tool_executor(name).submit(context.run, call)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        control.cancel()
+        future.cancel()
+        raise
+
+
+def offloaded_tool(name: str):
+    """Register `func` as the async MCP tool `name`, dispatched via `run_offloaded`."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def tool(*args, **kwargs):
+            on_progress = _progress_reporter(asyncio.get_running_loop())
+            return await run_offloaded(name, func, args, kwargs, on_progress=on_progress)
+
+        mcp.tool(name=name)(tool)
+        return func
+
+    return decorator
@@ -2,12 +2,51 @@
 
 from __future__ import annotations
 
-import re
 from collections import deque
+from dataclasses import asdict
 from pathlib import Path
 from typing import Literal
 
-from mcp_app import mcp
+from tools.dispatch import offloaded_tool
+from tools.reckoning.aggregate import aggregate_matches
+from tools.reckoning.compression import (
+    compressed_tail,
+    detect_compression,
+    iter_decompressed_chunks,
+    iter_decompressed_lines,
+)
+from tools.reckoning.extract_output import (
+    SPILL_MAX_MATCHES,
+    CaptureSpill,
+    ExtractFormat,
+    capture_columns,
+    header,
+    render_captures,
+)
+from tools.reckoning.follow import follow
+from tools.reckoning.jsonl import json_scan
+from tools.reckoning.line_index import INDEX_MIN_FILE_BYTES, load_line_index
+from tools.reckoning.multi import is_multi_path, multi_scan
+from tools.reckoning.multi_search import multi_search, parse_queries
+from tools.reckoning.ngram_index import build_ngram_index, cached_ngram_index, indexed_scan_lines
+from tools.reckoning.paging import advance_lines, cursor_marker, page_cursor, parse_page_cursor
+from tools.reckoning.parallel import parallel_scan_lines, use_parallel
+from tools.reckoning.patterns import mine_patterns
+from tools.reckoning.response import LINE_MAX_CHARS, RESPONSE_MAX_CHARS, omitted_marker, render_rows
+from tools.reckoning.sample import sample_lines
+from tools.reckoning.search import compile_query, iter_line_matches, scan_lines
+from tools.reckoning.source import (
+    decode_line,
+    iter_raw_lines,
+    iter_regions,
+    regions_from_chunks,
+    supports_byte_engine,
+)
+from tools.reckoning.stats import scan_stats
+from tools.reckoning.stats_cache import cached_stats
+from tools.reckoning.telemetry import tally
+from tools.reckoning.tail import read_tail
+from tools.reckoning.time_range import time_window
 
 
 def _ensure_file(path: str) -> Path:
@@ -19,22 +58,98 @@ def _ensure_file(path: str) -> Path:
     return p
 
 
-def _head_lines(path: Path, *, max_lines: int, encoding: str) -> list[dict[str, object]]:
+def _seek_rows(
+    path: Path,
+    *,
+    start_line: int,
+    end_line: int,
+    max_lines: int,
+    encoding: str,
+    compression: str | None = None,
+    start: int = 0,
+) -> list[dict[str, object]]:
+    """Read lines `start_line`..`end_line` by seeking via the sparse line index.
+
+    A non-zero `start` is the known byte offset of `start_line` (a resumed
+    page); uncompressed rows carry the byte offset they `end` at. Compressed
+    files seek via in-memory gzip checkpoints instead.
+    """
+    offset = None
+    if compression:
+        lines = iter_decompressed_lines(path, compression, start_line=start_line)
+    else:
+        first_line, offset = 1, 0
+        if start:
+            first_line, offset = start_line, start
+        elif start_line > 1 and path.stat().st_size >= INDEX_MIN_FILE_BYTES:
+            first_line, offset = load_line_index(path).locate(start_line)
+        lines = iter_raw_lines(path, offset=offset, first_line=first_line)
+
+    rows: list[dict[str, object]] = []
+    for idx, raw_bytes in lines:
+        if offset is not None:
+            offset += len(raw_bytes)
+        if idx < start_line:
+            continue
+        if idx > end_line:
+            break
+        raw = decode_line(raw_bytes, encoding)
+        rows.append({"line": idx, "raw": raw})
+        if offset is not None:
+            rows[-1]["end"] = offset
+        if len(rows) >= max_lines:
+            break
+    return rows
+
+
+def _head_lines(
+    path: Path,
+    *,
+    max_lines: int,
+    encoding: str,
+    compression: str | None = None,
+) -> list[dict[str, object]]:
+    if compression or supports_byte_engine(encoding):
+        return _seek_rows(
+            path,
+            start_line=1,
+            end_line=max_lines,
+            max_lines=max_lines,
+            encoding=encoding,
+            compression=compression,
+        )
     rows: list[dict[str, object]] = []
     with path.open("r", encoding=encoding, errors="replace") as f:
         for idx, line in enumerate(f, start=1):
-            rows.append({"line": idx, "text": line.rstrip("\n"), "raw": line})
+            rows.append({"line": idx, "raw": line})
             if len(rows) >= max_lines:
                 break
     return rows
 
 
-def _tail_lines(path: Path, *, max_lines: int, encoding: str) -> list[dict[str, object]]:
-    lines: deque[tuple[int, str, str]] = deque(maxlen=max_lines)
+def _tail_lines(
+    path: Path,
+    *,
+    max_lines: int,
+    encoding: str,
+    compression: str | None = None,
+) -> list[dict[str, object]]:
+    if compression or supports_byte_engine(encoding):
+        if compression:
+            first_line, raw_lines = compressed_tail(path, compression, max_lines=max_lines)
+        else:
+            first_line, raw_lines = read_tail(path, max_lines=max_lines)
+        rows: list[dict[str, object]] = []
+        for offset, raw_bytes in enumerate(raw_lines):
+            raw = decode_line(raw_bytes, encoding)
+            line = first_line + offset if first_line is not None else None
+            rows.append({"line": line, "raw": raw})
+        return rows
+    lines: deque[tuple[int, str]] = deque(maxlen=max_lines)
     with path.open("r", encoding=encoding, errors="replace") as f:
         for idx, line in enumerate(f, start=1):
-            lines.append((idx, line.rstrip("\n"), line))
-    return [{"line": ln, "text": txt, "raw": raw} for ln, txt, raw in lines]
+            lines.append((idx, line))
+    return [{"line": ln, "raw": raw} for ln, raw in lines]
 
 
 def _range_lines(
@@ -44,20 +159,44 @@ def _range_lines(
     end_line: int,
     max_lines: int,
     encoding: str,
+    compression: str | None = None,
+    start: int = 0,
 ) -> list[dict[str, object]]:
+    if compression or supports_byte_engine(encoding):
+        return _seek_rows(
+            path,
+            start_line=start_line,
+            end_line=end_line,
+            max_lines=max_lines,
+            encoding=encoding,
+            compression=compression,
+            start=start,
+        )
     rows: list[dict[str, object]] = []
     with path.open("r", encoding=encoding, errors="replace") as f:
-        for idx, line in enumerate(f, start=1):
+        first_line = 1
+        if start:
+            f.seek(start)
+            first_line = start_line
+        for idx, line in enumerate(f, start=first_line):
             if idx < start_line:
                 continue
             if idx > end_line:
                 break
-            rows.append({"line": idx, "text": line.rstrip("\n"), "raw": line})
+            rows.append({"line": idx, "raw": line})
             if len(rows) >= max_lines:
                 break
     return rows
 
 
+def _compressed_regions(path: Path, compression: str, first_line: int = 1):
+    """Decompressed regions from line `first_line` on, resuming from a gzip checkpoint when possible."""
+    if first_line <= 1:
+        return regions_from_chunks(iter_decompressed_chunks(path, compression))
+    lines = iter_decompressed_lines(path, compression, start_line=first_line)
+    return regions_from_chunks(raw for line, raw in lines if line >= first_line)
+
+
 def _search_lines(
     path: Path,
     *,
@@ -68,10 +207,66 @@ def _search_lines(
     after: int,
     max_matches: int,
     encoding: str,
+    workers: int = 1,
+    compression: str | None = None,
+    start: int = 0,
+    first_line: int = 1,
 ) -> list[dict[str, object]]:
-    flags = re.IGNORECASE if ignore_case else 0
-    pattern = re.compile(query, flags) if regex else None
-    before_buffer: deque[tuple[int, str, str]] = deque(maxlen=max(0, before))
+    if compression:
+        return scan_lines(
+            path,
+            query=compile_query(query, regex=regex, ignore_case=ignore_case),
+            before=before,
+            after=after,
+            max_matches=max_matches,
+            encoding=encoding,
+            regions=_compressed_regions(path, compression, first_line),
+            first_line=first_line,
+        )
+    index = cached_ngram_index(path, workers=workers) if supports_byte_engine(encoding) else None
+    if index is not None:
+        rows = indexed_scan_lines(
+            path,
+            index,
+            query=query,
+            regex=regex,
+            ignore_case=ignore_case,
+            before=before,
+            after=after,
+            max_matches=max_matches,
+            encoding=encoding,
+            start=start,
+            first_line=first_line,
+        )
+        if rows is not None:
+            return rows
+    if supports_byte_engine(encoding) and use_parallel(path, workers, scan_bytes=path.stat().st_size - start):
+        return parallel_scan_lines(
+            path,
+            query=query,
+            regex=regex,
+            ignore_case=ignore_case,
+            before=before,
+            after=after,
+            max_matches=max_matches,
+            encoding=encoding,
+            workers=workers,
+            start=start,
+            first_line=first_line,
+        )
+    if supports_byte_engine(encoding):
+        return scan_lines(
+            path,
+            query=compile_query(query, regex=regex, ignore_case=ignore_case),
+            before=before,
+            after=after,
+            max_matches=max_matches,
+            encoding=encoding,
+            regions=iter_regions(path, start=start) if start else None,
+            first_line=first_line,
+        )
+    line_query = compile_query(query, regex=regex, ignore_case=ignore_case)
+    before_buffer: deque[tuple[int, str]] = deque(maxlen=max(0, before))
     rows: list[dict[str, object]] = []
     pending_after = 0
     seen = set()
@@ -79,35 +274,37 @@ def _search_lines(
     reached_limit = False
 
     def _matched(text: str) -> bool:
-        if pattern is not None:
-            return bool(pattern.search(text))
+        if regex:
+            return line_query.match_line(text) is not None
         if ignore_case:
             return query.lower() in text.lower()
         return query in text
 
     with path.open("r", encoding=encoding, errors="replace") as f:
-        for idx, raw in enumerate(f, start=1):
+        if start:
+            f.seek(start)
+        for idx, raw in enumerate(f, start=first_line):
             line = raw.rstrip("\n")
             is_match = _matched(line) if not reached_limit else False
 
             if is_match:
-                for ln, txt, raw_txt in before_buffer:
+                for ln, raw_txt in before_buffer:
                     if ln not in seen:
-                        rows.append({"line": ln, "text": txt, "raw": raw_txt, "kind": "before"})
+                        rows.append({"line": ln, "raw": raw_txt, "kind": "before"})
                         seen.add(ln)
                 if idx not in seen:
-                    rows.append({"line": idx, "text": line, "raw": raw, "kind": "match"})
+                    rows.append({"line": idx, "raw": raw, "kind": "match"})
                     seen.add(idx)
                     match_count += 1
                 pending_after = max(pending_after, after)
                 if match_count >= max_matches:
                     reached_limit = True
             elif pending_after > 0 and idx not in seen:
-                rows.append({"line": idx, "text": line, "raw": raw, "kind": "after"})
+                rows.append({"line": idx, "raw": raw, "kind": "after"})
                 seen.add(idx)
                 pending_after -= 1
 
-            before_buffer.append((idx, line, raw))
+            before_buffer.append((idx, raw))
             if reached_limit and pending_after == 0:
                 break
 
@@ -121,18 +318,72 @@ def _extract_lines(
     ignore_case: bool,
     max_matches: int,
     encoding: str,
+    workers: int = 1,
+    compression: str | None = None,
+    start: int = 0,
+    first_line: int = 1,
 ) -> list[dict[str, object]]:
-    flags = re.IGNORECASE if ignore_case else 0
-    pattern = re.compile(query, flags)
+    if compression:
+        return scan_lines(
+            path,
+            query=compile_query(query, regex=True, ignore_case=ignore_case),
+            max_matches=max_matches,
+            encoding=encoding,
+            extract=True,
+            regions=_compressed_regions(path, compression, first_line),
+            first_line=first_line,
+        )
+    index = cached_ngram_index(path, workers=workers) if supports_byte_engine(encoding) else None
+    if index is not None:
+        rows = indexed_scan_lines(
+            path,
+            index,
+            query=query,
+            regex=True,
+            ignore_case=ignore_case,
+            max_matches=max_matches,
+            encoding=encoding,
+            extract=True,
+            start=start,
+            first_line=first_line,
+        )
+        if rows is not None:
+            return rows
+    if supports_byte_engine(encoding) and use_parallel(path, workers, scan_bytes=path.stat().st_size - start):
+        return parallel_scan_lines(
+            path,
+            query=query,
+            regex=True,
+            ignore_case=ignore_case,
+            max_matches=max_matches,
+            encoding=encoding,
+            extract=True,
+            workers=workers,
+            start=start,
+            first_line=first_line,
+        )
+    if supports_byte_engine(encoding):
+        return scan_lines(
+            path,
+            query=compile_query(query, regex=True, ignore_case=ignore_case),
+            max_matches=max_matches,
+            encoding=encoding,
+            extract=True,
+            regions=iter_regions(path, start=start) if start else None,
+            first_line=first_line,
+        )
+    line_query = compile_query(query, regex=True, ignore_case=ignore_case)
     rows: list[dict[str, object]] = []
 
     with path.open("r", encoding=encoding, errors="replace") as f:
-        for idx, raw in enumerate(f, start=1):
+        if start:
+            f.seek(start)
+        for idx, raw in enumerate(f, start=first_line):
             line = raw.rstrip("\n")
-            m = pattern.search(line)
+            m = line_query.match_line(line)
             if not m:
                 continue
-            row: dict[str, object] = {"line": idx, "text": line, "raw": raw}
+            row: dict[str, object] = {"line": idx, "raw": raw}
             if m.groupdict():
                 row["groups"] = m.groupdict()
             else:
@@ -143,18 +394,116 @@ def _extract_lines(
     return rows
 
 
-def _rows_to_snippet(rows: list[dict[str, object]]) -> str:
-    raw_parts: list[str] = []
-    for row in rows:
-        raw = row.get("raw")
-        if isinstance(raw, str):
-            raw_parts.append(raw)
-        else:
-            raw_parts.append(f"{row.get('text', '')}\n")
-    return "".join(raw_parts)
+def _spill_extract(
+    path: Path,
+    *,
+    query: str,
+    ignore_case: bool,
+    max_matches: int,
+    encoding: str,
+    compression: str | None,
+    fmt: ExtractFormat,
+    output_file: str,
+) -> dict[str, object]:
+    """Stream up to `max_matches` `extract` rows to `output_file` in one sequential pass; return a summary."""
+    if not supports_byte_engine(encoding):
+        raise ValueError("`output_file` requires an ASCII-compatible `encoding` such as utf-8.")
+    target = Path(output_file).expanduser().resolve()
+    if target == path:
+        raise ValueError("`output_file` must not be the file being read.")
+    line_query = compile_query(query, regex=True, ignore_case=ignore_case)
+    with CaptureSpill(target, fmt, capture_columns(line_query.line_pattern)) as spill:
+        scan_lines(
+            path,
+            query=line_query,
+            max_matches=max_matches,
+            encoding=encoding,
+            extract=True,
+            regions=_compressed_regions(path, compression) if compression else None,
+            sink=spill.write,
+        )
+    return {**spill.summary(), "truncated": spill.rows >= max_matches}
 
 
-def _stats(path: Path, *, encoding: str) -> dict[str, object]:
+def _aggregate(
+    path: Path,
+    *,
+    query: str,
+    ignore_case: bool,
+    group_by: str,
+    top_k: int,
+    encoding: str,
+    compression: str | None = None,
+) -> dict[str, object]:
+    line_query = compile_query(query, regex=True, ignore_case=ignore_case)
+    if compression:
+        regions = regions_from_chunks(iter_decompressed_chunks(path, compression))
+        matches = iter_line_matches(line_query, regions, encoding=encoding)
+    elif supports_byte_engine(encoding):
+        matches = iter_line_matches(line_query, iter_regions(path), encoding=encoding)
+    else:
+
+        def _text_matches():
+            with path.open("r", encoding=encoding, errors="replace") as f:
+                for raw in f:
+                    m = line_query.match_line(raw.rstrip("\n"))
+                    if m is not None:
+                        yield m
+
+        matches = _text_matches()
+    return aggregate_matches(matches, pattern=line_query.line_pattern, group_by=group_by, top_k=top_k)
+
+
+def _patterns(
+    path: Path,
+    *,
+    top_k: int,
+    encoding: str,
+    workers: int = 1,
+    compression: str | None = None,
+) -> dict[str, object]:
+    byte_engine = supports_byte_engine(encoding)
+    regions = regions_from_chunks(iter_decompressed_chunks(path, compression)) if compression else None
+    miner = mine_patterns(
+        path,
+        encoding=encoding,
+        byte_engine=byte_engine,
+        regions=regions,
+        workers=workers,
+        parallel=byte_engine and not compression and use_parallel(path, workers),
+    )
+    return miner.summary(top_k)
+
+
+def _next_page(
+    path: Path,
+    *,
+    action: str,
+    params: dict[str, object],
+    line: int,
+    start: int,
+    first_line: int,
+    encoding: str,
+    compression: str | None,
+    sent: int = 0,
+) -> str:
+    """Cursor for a page starting at `line`, counting forward from byte `start` (line `first_line`) when needed."""
+    offset = 0
+    if not compression:
+        text_encoding = None if supports_byte_engine(encoding) else encoding
+        offset = advance_lines(path, start, line - first_line, encoding=text_encoding)
+    return page_cursor(path, action=action, params=params, offset=offset, line=line, sent=sent)
+
+
+def _stats(path: Path, *, encoding: str, workers: int = 1, compression: str | None = None) -> dict[str, object]:
+    if compression:
+        regions = regions_from_chunks(iter_decompressed_chunks(path, compression))
+        stats = scan_stats(path, encoding=encoding, regions=regions)
+        return {"path": str(path), "bytes": path.stat().st_size, "compression": compression, **asdict(stats)}
+    if supports_byte_engine(encoding):
+        stats = cached_stats(path, encoding=encoding, workers=workers)
+        return {"path": str(path), "bytes": path.stat().st_size, **asdict(stats)}
+
     line_count = 0
     non_empty = 0
     max_len = 0
@@ -183,11 +532,27 @@ def _stats(path: Path, *, encoding: str) -> dict[str, object]:
     }
 
 
-@mcp.tool(name="log_explore")
+@offloaded_tool("log_explore")
 def log_explore(
     path: str,
-    action: Literal["head", "tail", "range", "search", "extract", "stats"] = "head",
+    action: Literal[
+        "head",
+        "tail",
+        "range",
+        "time_range",
+        "search",
+        "multi_search",
+        "extract",
+        "json",
+        "aggregate",
+        "patterns",
+        "stats",
+        "sample",
+        "follow",
+        "index",
+    ] = "head",
     query: str = "",
+    queries: list[str] | None = None,
     start_line: int = 1,
     end_line: int = 200,
     max_lines: int = 200,
@@ -197,6 +562,24 @@ def log_explore(
     regex: bool = False,
     ignore_case: bool = False,
     encoding: str = "utf-8",
+    workers: int = 1,
+    cursor: str = "",
+    wait_seconds: float = 0,
+    order: Literal["file", "timestamp"] = "file",
+    group_by: str = "",
+    top_k: int = 20,
+    start_time: str = "",
+    end_time: str = "",
+    time_format: str = "",
+    where: str = "",
+    fields: str = "",
+    max_chars: int = RESPONSE_MAX_CHARS,
+    max_line_chars: int = LINE_MAX_CHARS,
+    collapse: Literal["none", "exact", "similar"] = "exact",
+    format: ExtractFormat = "lines",
+    output_file: str = "",
+    sampling: Literal["stratified", "random"] = "stratified",
+    seed: int = 0,
 ) -> str | dict[str, object]:
     """Reckon signal from large files with bounded, context-efficient reads.
 
@@ -208,39 +591,202 @@ def log_explore(
     When not to use:
     - Small files where a direct full read is simpler and sufficient.
     - Binary files or structured formats that should be parsed by specialized tools.
-    - Workflows that require mutating files (this tool is read-only).
+    - Workflows that require mutating files (this tool never modifies existing files; `extract` with
+      `output_file` only creates new ones).
 
     Agent-oriented guidance:
     - Use this tool as the default for log/text files that may be large.
     - Avoid full-file ingestion; iterate with small windows and targeted queries.
-    - Start with `stats`, then `head`/`tail`, then narrow with `search`, then structure with `extract`.
+    - Start with `sample` (constant cost on any size) or `stats` and `patterns` (full scans), then `head`/`tail`,
+      then narrow with `search`, then structure with `extract`.
     - Prefer `max_lines`/`max_matches` limits to keep responses compact and relevant.
 
     Actions:
     - head: first `max_lines` lines
     - tail: last `max_lines` lines
     - range: lines `start_line`..`end_line` (capped by `max_lines`)
+    - time_range: lines stamped in [`start_time`, `end_time`) (capped by `max_lines`), found by binary search over
+      byte offsets in timestamp-ordered logs. Bounds are ISO date-times (`2024-05-01T14:02`), bare times (`14:02`,
+      on the date of the file's first timestamp), or epoch seconds; either may be empty. `time_format` is auto-detected
+      (`iso`, `clf`, `syslog`, `epoch`) or a strptime format. Lines without a timestamp stay with the entry above.
     - search: filter by `query` (plain text or regex), optional context with `before`/`after`
-    - extract: regex capture extraction from matching lines
+    - multi_search: answer several `queries` in one pass instead of one `search` per query. Queries are literals
+      unless prefixed with `re:` (or `regex=True`). Returns per query the matching line count, `first_line`,
+      `last_line` and `last` hit, and the first `max_matches` matching lines as `examples` labelled `line:text`.
+    - extract: regex capture extraction from matching lines. `format="lines"` returns the lines; `table` (column
+      arrays), `csv`, `tsv`, and `ndjson` return only the line number and captures (named groups, else `1`..`n`).
+      With `output_file` (a path that must not exist yet), up to `max_matches` (max 10,000,000) rows are streamed
+      to that file as `lines`, `csv`, `tsv`, `ndjson`, or `parquet` (needs `pyarrow`) and only a summary is returned.
+    - json: JSON-lines records matching every `where` clause (`level == "error" and latency_ms > 500`;
+      ops `== != > >= < <= ~`, dotted paths for nested fields), projected to the comma-separated `fields`
+      (default: whole record) and labelled `line:json`. Lines that cannot match are skipped before parsing.
+    - aggregate: one streaming pass of the `query` regex over the whole file; returns match count, top `top_k`
+      keys by frequency (key = captures named in `group_by`, default all), and min/max/mean/percentiles of
+      numeric captures. Response size does not grow with the number of matches.
+    - patterns: one-pass log template mining; returns the `top_k` most frequent line templates (timestamps,
+      numbers, hex ids, UUIDs, IPs, and paths masked; differing tokens shown as `<*>`) with counts, first/last
+      line, and an example
     - stats: lightweight file summary (size, line count, shape hints)
+    - sample: `max_lines` lines from across the file, one seek each: one per equal slice (`sampling="stratified"`)
+      or at uniform random offsets (`"random"`), seeded by `seed`. Lines are labelled `line:text`, with `~line:`
+      when the number is estimated; `estimated_lines` extrapolates the line count from the sampled line lengths
+      (`exact` when a line index is cached or the file is small).
+    - follow: complete lines appended since `cursor` (or the last `max_lines` lines without one),
+      plus a new `cursor`; waits up to `wait_seconds` for new data and reports rotation/truncation
+    - index: build (or extend) a trigram block index so later `search`/`extract` calls on the same
+      file only scan blocks that can contain the query's literals; reports size and build time
+
+    Parallelism:
+    - `workers` > 1 (or 0 for one per CPU) scans `search`, `extract`, `patterns`, and `stats` in a process pool on files
+      of 64 MiB or more.
+
+    Multiple files:
+    - `path` may be a directory or glob (e.g. `/var/log/app/app.log*`, `logs/**/*.log`) for `search`/`extract`.
+    - Files are scanned concurrently; `max_matches` is a global budget and lines are labelled `file:line:text`
+      (context lines `file-line-text`). `order="timestamp"` merges hits by their leading timestamp, in
+      `time_format` or the known format detected per file; unreadable or corrupt files are listed in `errors`.
+
+    Compressed files:
+    - gzip (and zstd with the optional `zstandard` package) are detected by magic bytes and read transparently.
+    - `range`/`tail` on gzip reuse in-memory seek checkpoints after the first full pass; `follow`, `sample`, and
+      `index` are not supported.
+
+    Response size:
+    - Output is capped at `max_chars` characters; lines longer than `max_line_chars` keep a head and a tail
+      around a `…[N chars clipped]…` marker. Runs of repeated lines are shown once followed by `[×N identical
+      lines a-b]` (`collapse="similar"` also folds lines differing only in numbers; `"none"` disables it).
+    - `head`/`tail` note omitted lines; paged actions return a `cursor` when the budget cuts a page short.
+
+    Paging:
+    - When `search`, `extract`, `range`, `json`, or `time_range` stops at its `max_matches`/`max_lines` limit, it
+      returns a `cursor`: text results end with a `[more results: repeat the call with cursor=...]` line, dict
+      results (`json`, `time_range`, non-`lines` `extract` formats) have a `cursor` field. Repeat the call with the
+      same arguments and that `cursor` to get the next page without rescanning or repeating earlier lines.
+      `max_matches`/`max_lines` and `workers` may change between pages. Not available for directory/glob paths.
     """
-    p = _ensure_file(path)
     max_lines = max(1, min(max_lines, 5000))
-    max_matches = max(1, min(max_matches, 5000))
+    max_matches = max(1, min(max_matches, SPILL_MAX_MATCHES if output_file else 5000))
     before = max(0, min(before, 100))
     after = max(0, min(after, 100))
+    workers = max(0, min(workers, 64))
+    wait_seconds = max(0.0, min(wait_seconds, 60.0))
+    top_k = max(1, min(top_k, 1000))
     start_line = max(1, start_line)
     end_line = max(start_line, end_line)
+    max_chars = max(1_000, min(max_chars, 5_000_000))
+    max_line_chars = max(80, min(max_line_chars, max_chars))
+
+    if action in {"search", "extract", "aggregate"} and not query:
+        raise ValueError("`query` is required for search/extract/aggregate actions.")
+    if output_file and action != "extract":
+        raise ValueError("`output_file` is only supported for the extract action.")
+    if output_file and cursor:
+        raise ValueError("`cursor` paging is not supported with `output_file`; a spill covers every match.")
+    if format == "parquet" and not output_file:
+        raise ValueError('`format="parquet"` requires `output_file`.')
+    page_params: dict[str, object] | None = {
+        "search": {"query": query, "regex": regex, "ignore_case": ignore_case, "before": before, "after": after},
+        "extract": {"query": query, "ignore_case": ignore_case},
+        "range": {"end_line": end_line},
+        "json": {"where": where, "fields": fields, "ignore_case": ignore_case},
+        "time_range": {"start_time": start_time, "end_time": end_time, "time_format": time_format},
+    }.get(action)
+    if page_params is not None:
+        page_params["encoding"] = encoding
+    if is_multi_path(path):
+        if cursor and page_params is not None:
+            raise ValueError("`cursor` paging is not supported for directory/glob paths.")
+        if action not in {"search", "extract"}:
+            raise ValueError("Directory/glob paths are only supported for search/extract actions.")
+        if format != "lines" or output_file:
+            raise ValueError("Directory/glob paths only support `format=\"lines\"` without `output_file`.")
+        if not supports_byte_engine(encoding):
+            raise ValueError("Directory/glob paths require an ASCII-compatible `encoding` such as utf-8.")
+        return multi_scan(
+            path,
+            query=query,
+            regex=regex or action == "extract",
+            ignore_case=ignore_case,
+            before=before if action == "search" else 0,
+            after=after if action == "search" else 0,
+            max_matches=max_matches,
+            encoding=encoding,
+            extract=action == "extract",
+            workers=workers,
+            order=order,
+            time_format=time_format,
+            max_chars=max_chars,
+            max_line_chars=max_line_chars,
+        )
 
-    if action in {"search", "extract"} and not query:
-        raise ValueError("`query` is required for search/extract actions.")
+    p = _ensure_file(path)
+    if action in {"follow", "index", "sample", "multi_search"} and not supports_byte_engine(encoding):
+        raise ValueError(f"`{action}` requires an ASCII-compatible `encoding` such as utf-8.")
+    compression = detect_compression(p)
+    if compression and action in {"follow", "index", "sample"}:
+        raise ValueError(f"`{action}` is not supported for compressed files.")
+    if compression and not supports_byte_engine(encoding):
+        raise ValueError("Compressed files require an ASCII-compatible `encoding` such as utf-8.")
+    start, resume_line, sent = 0, 0, 0
+    if cursor and page_params is not None:
+        start, resume_line, sent = parse_page_cursor(cursor, p, action=action, params=page_params)
+        if action == "range":
+            start_line = resume_line
+    first_line = resume_line or 1
+
+    render = {"max_chars": max_chars, "max_line_chars": max_line_chars, "collapse": collapse}
+
+    def page_of(rows: list[dict[str, object]], full: bool, *, render_page=None, **page):
+        """Render a page as `(content, rows rendered, cursor)`; the cursor is set when it is full or over budget.
+
+        `render_page(rows)` returns `(content, rows rendered)`; it defaults to the raw lines under `max_chars`.
+        """
+        shown = [row for row in rows if int(row["line"]) > sent] if sent else rows
+        content, used = render_page(shown) if render_page is not None else render_rows(shown, **render)
+        tally(matches=sum(1 for row in shown[:used] if row.get("kind", "match") == "match"))
+        cut = shown[used] if used < len(shown) else None
+        shown = shown[:used] or rows
+        if not (full or cut) or not shown:
+            return content, used, None
+        last_row = shown[-1]
+        last = int(last_row["line"])
+        matches = [int(row["line"]) for row in rows if row.get("kind") == "match" and int(row["line"]) <= last]
+        if matches and (cut is None or cut.get("kind") == "after"):
+            # Rescan from the last real match (or just after it when its
+            # context is complete) so demoted matches keep their context.
+            line = matches[-1] + (cut is None)
+        else:
+            line = last + 1
+        # Count forward from the last row known to end before `line`, not from the start of the page.
+        known = [row for row in rows if "end" in row and int(row["line"]) < line]
+        if known:
+            page["start"], page["first_line"] = int(known[-1]["end"]), int(known[-1]["line"]) + 1
+        next_cursor = _next_page(
+            p,
+            action=action,
+            params=page_params,
+            line=line,
+            sent=last,
+            encoding=encoding,
+            compression=compression,
+            **page,
+        )
+        return content, used, next_cursor
+
+    def paged(rows: list[dict[str, object]], full: bool, **page) -> str:
+        content, _, next_cursor = page_of(rows, full, **page)
+        return content if next_cursor is None else content + cursor_marker(next_cursor)
 
     if action == "head":
-        rows = _head_lines(p, max_lines=max_lines, encoding=encoding)
-        return _rows_to_snippet(rows)
+        rows = _head_lines(p, max_lines=max_lines, encoding=encoding, compression=compression)
+        content, used = render_rows(rows, **render)
+        tally(matches=used)
+        return content + (omitted_marker(len(rows) - used) if used < len(rows) else "")
     if action == "tail":
-        rows = _tail_lines(p, max_lines=max_lines, encoding=encoding)
-        return _rows_to_snippet(rows)
+        rows = _tail_lines(p, max_lines=max_lines, encoding=encoding, compression=compression)
+        content, used = render_rows(rows, from_end=True, **render)
+        tally(matches=used)
+        return (omitted_marker(len(rows) - used) if used < len(rows) else "") + content
     if action == "range":
         rows = _range_lines(
             p,
@@ -248,8 +794,35 @@ def log_explore(
             end_line=end_line,
             max_lines=max_lines,
             encoding=encoding,
+            compression=compression,
+            start=start,
+        )
+        full = len(rows) >= max_lines and int(rows[-1]["line"]) < end_line
+        return paged(rows, full, start=start, first_line=start_line if start else 1)
+    if action == "time_range":
+        result = time_window(
+            p,
+            start_time=start_time,
+            end_time=end_time,
+            time_format=time_format,
+            max_lines=max_lines,
+            encoding=encoding,
+            compression=compression,
+            resume=(start, resume_line) if cursor else None,
+            max_chars=max_chars,
+            max_line_chars=max_line_chars,
         )
-        return _rows_to_snippet(rows)
+        next_cursor = None
+        if result["truncated"]:
+            next_cursor = page_cursor(
+                p,
+                action=action,
+                params=page_params,
+                offset=result["next_byte"] or 0,
+                line=result["next_line"] or 0,
+            )
+        tally(matches=int(result["lines"]))
+        return {"action": action, **result, "cursor": next_cursor}
     if action == "search":
         rows = _search_lines(
             p,
@@ -260,8 +833,39 @@ def log_explore(
             after=after,
             max_matches=max_matches,
             encoding=encoding,
+            workers=workers,
+            compression=compression,
+            start=start,
+            first_line=first_line,
         )
-        return _rows_to_snippet(rows)
+        full = sum(1 for row in rows if row.get("kind") == "match") >= max_matches
+        return paged(rows, full, start=start, first_line=first_line)
+    if action == "multi_search":
+        result = multi_search(
+            p,
+            queries=parse_queries(queries or [], regex=regex),
+            ignore_case=ignore_case,
+            max_examples=max_matches,
+            encoding=encoding,
+            regions=_compressed_regions(p, compression) if compression else None,
+            max_chars=max_chars,
+            max_line_chars=max_line_chars,
+        )
+        tally(matches=sum(int(entry["matches"]) for entry in result["queries"]))
+        return {"action": action, **result}
+    if action == "extract" and output_file:
+        result = _spill_extract(
+            p,
+            query=query,
+            ignore_case=ignore_case,
+            max_matches=max_matches,
+            encoding=encoding,
+            compression=compression,
+            fmt=format,
+            output_file=output_file,
+        )
+        tally(matches=int(result["rows"]))
+        return {"action": action, **result}
     if action == "extract":
         rows = _extract_lines(
             p,
@@ -269,6 +873,87 @@ def log_explore(
             ignore_case=ignore_case,
             max_matches=max_matches,
             encoding=encoding,
+            workers=workers,
+            compression=compression,
+            start=start,
+            first_line=first_line,
+        )
+        if format == "lines":
+            return paged(rows, len(rows) >= max_matches, start=start, first_line=first_line)
+        columns = capture_columns(compile_query(query, regex=True, ignore_case=ignore_case).line_pattern)
+        content, used, next_cursor = page_of(
+            rows,
+            len(rows) >= max_matches,
+            render_page=lambda shown: render_captures(
+                shown, columns, format, max_chars=max_chars, max_line_chars=max_line_chars
+            ),
+            start=start,
+            first_line=first_line,
+        )
+        return {
+            "action": action,
+            "format": format,
+            "columns": header(columns),
+            "rows": used,
+            "content": content,
+            "cursor": next_cursor,
+        }
+    if action == "json":
+        result = json_scan(
+            p,
+            where=where,
+            fields=fields,
+            ignore_case=ignore_case,
+            max_matches=max_matches,
+            encoding=encoding,
+            regions=_compressed_regions(p, compression, first_line) if compression else None,
+            start=start,
+            first_line=first_line,
+            max_chars=max_chars,
+        )
+        next_cursor = None
+        if result["next_line"] is not None:
+            next_cursor = _next_page(
+                p,
+                action=action,
+                params=page_params,
+                line=int(result["next_line"]),
+                start=start,
+                first_line=first_line,
+                encoding=encoding,
+                compression=compression,
+            )
+        tally(matches=int(result["matches"]))
+        return {"action": action, **result, "cursor": next_cursor}
+    if action == "aggregate":
+        result = _aggregate(
+            p,
+            query=query,
+            ignore_case=ignore_case,
+            group_by=group_by,
+            top_k=top_k,
+            encoding=encoding,
+            compression=compression,
+        )
+        tally(matches=int(result["matches"]))
+        return {"action": action, **result}
+    if action == "patterns":
+        result = _patterns(p, top_k=top_k, encoding=encoding, workers=workers, compression=compression)
+        return {"action": action, **result}
+    if action == "sample":
+        result = sample_lines(
+            p,
+            count=max_lines,
+            sampling=sampling,
+            seed=seed,
+            encoding=encoding,
+            max_chars=max_chars,
+            max_line_chars=max_line_chars,
         )
-        return _rows_to_snippet(rows)
-    return {"action": action, "stats": _stats(p, encoding=encoding)}
+        tally(matches=int(result["samples"]))
+        return {"action": action, **result}
+    if action == "index":
+        return {"action": action, "index": build_ngram_index(p, workers=workers).report()}
+    if action == "follow":
+        return follow(p, cursor=cursor, max_lines=max_lines, wait_seconds=wait_seconds, encoding=encoding)
+    return {"action": action, "stats": _stats(p, encoding=encoding, workers=workers, compression=compression)}
@@ -0,0 +1,389 @@
+"""Per-call performance telemetry and the `metrics` tool.
+
+Every call dispatched by `tools.dispatch` is recorded with its wall, CPU, and
+queue time, the work its engines tallied (`tools.reckoning.telemetry`), and
+its response size. Calls are aggregated into histograms per `(tool, action)`:
+per-minute windows covering the last `METRICS_WINDOW_MINUTES` back the JSON
+report, and lifetime totals back the Prometheus text. Calls slower than
+`LOG_EFFICIENT_MCP_SLOW_CALL_SECONDS` are kept with their arguments in a
+bounded slow-call log, and every call is appended to the JSONL file named by
+`LOG_EFFICIENT_MCP_TRACE_FILE` when that is set.
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterator, Literal
+
+from mcp_app import mcp
+from tools.reckoning.telemetry import call_counters
+
+SLOW_CALL_ENV_VAR = "LOG_EFFICIENT_MCP_SLOW_CALL_SECONDS"
+TRACE_FILE_ENV_VAR = "LOG_EFFICIENT_MCP_TRACE_FILE"
+DEFAULT_SLOW_CALL_SECONDS = 2.0
+METRICS_WINDOW_MINUTES = 15
+SLOW_CALL_LOG_SIZE = 100
+ARG_PREVIEW_CHARS = 300
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 1800)
+SIZE_BUCKETS = tuple(4**k for k in range(19))
+MEASURES = {
+    "wall_seconds": DURATION_BUCKETS,
+    "cpu_seconds": DURATION_BUCKETS,
+    "queue_seconds": DURATION_BUCKETS,
+    "bytes_read": SIZE_BUCKETS,
+    "lines_scanned": SIZE_BUCKETS,
+    "matches": SIZE_BUCKETS,
+    "response_chars": SIZE_BUCKETS,
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram; quantiles interpolate within a bucket."""
+
+    __slots__ = ("bounds", "buckets", "count", "total", "max")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        # One bucket per upper bound plus an overflow bucket.
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: "Histogram") -> None:
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for idx, hits in enumerate(self.buckets):
+            if hits and seen + hits >= rank:
+                lower = self.bounds[idx - 1] if idx else 0.0
+                upper = self.bounds[idx] if idx < len(self.bounds) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / hits)
+            seen += hits
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "p50": round(self.quantile(0.5), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "max": round(self.max, 6),
+        }
+
+
+@dataclass
+class CallRecord:
+    tool: str
+    action: str
+    args: dict[str, object]
+    started_at: float
+    wall_seconds: float
+    cpu_seconds: float
+    queue_seconds: float
+    bytes_read: int
+    lines_scanned: int
+    matches: int
+    response_chars: int
+    error: str | None = None
+
+
+@dataclass
+class _Series:
+    """Histograms for one `(tool, action)` pair."""
+
+    calls: int = 0
+    errors: int = 0
+    histograms: dict[str, Histogram] = field(
+        default_factory=lambda: {name: Histogram(bounds) for name, bounds in MEASURES.items()}
+    )
+
+    def add(self, record: CallRecord) -> None:
+        self.calls += 1
+        self.errors += record.error is not None
+        for name, histogram in self.histograms.items():
+            histogram.observe(getattr(record, name))
+
+    def merge(self, other: "_Series") -> None:
+        self.calls += other.calls
+        self.errors += other.errors
+        for name, histogram in self.histograms.items():
+            histogram.merge(other.histograms[name])
+
+
+def slow_call_seconds() -> float:
+    try:
+        return float(os.environ.get(SLOW_CALL_ENV_VAR, DEFAULT_SLOW_CALL_SECONDS))
+    except ValueError:
+        return DEFAULT_SLOW_CALL_SECONDS
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Thread-safe store of call records: rolling windows, lifetime totals, and the slow-call log."""
+
+    def __init__(self, *, window_minutes: int = METRICS_WINDOW_MINUTES, slow_log_size: int = SLOW_CALL_LOG_SIZE):
+        self.window_minutes = window_minutes
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.lifetime: dict[tuple[str, str], _Series] = {}
+        self.windows: deque[tuple[int, dict[tuple[str, str], _Series]]] = deque()
+        self.slow_calls: deque[CallRecord] = deque(maxlen=slow_log_size)
+        self.in_flight: dict[str, int] = {}
+        self.trace_errors = 0
+
+    def _prune(self, minute: int) -> None:
+        while self.windows and self.windows[0][0] <= minute - self.window_minutes:
+            self.windows.popleft()
+
+    def begin(self, tool: str) -> None:
+        with self.lock:
+            self.in_flight[tool] = self.in_flight.get(tool, 0) + 1
+
+    def record(self, record: CallRecord) -> None:
+        key = (record.tool, record.action)
+        minute = int(time.time() // 60)
+        trace_file = os.environ.get(TRACE_FILE_ENV_VAR, "").strip()
+        with self.lock:
+            self.in_flight[record.tool] = max(0, self.in_flight.get(record.tool, 0) - 1)
+            self.lifetime.setdefault(key, _Series()).add(record)
+            self._prune(minute)
+            if not self.windows or self.windows[-1][0] != minute:
+                self.windows.append((minute, {}))
+            self.windows[-1][1].setdefault(key, _Series()).add(record)
+            if record.wall_seconds >= slow_call_seconds():
+                self.slow_calls.append(record)
+            if trace_file:
+                try:
+                    with Path(trace_file).expanduser().open("a", encoding="utf-8") as f:
+                        f.write(json.dumps(asdict(record), default=str) + "\n")
+                except OSError:
+                    self.trace_errors += 1
+
+    def reset(self) -> None:
+        with self.lock:
+            self.lifetime.clear()
+            self.windows.clear()
+            self.slow_calls.clear()
+            self.trace_errors = 0
+            self.started_at = time.time()
+
+    def snapshot(self, *, slow_calls: int = 20) -> dict[str, object]:
+        """JSON report over the rolling window, busiest `(tool, action)` first."""
+        with self.lock:
+            self._prune(int(time.time() // 60))
+            merged: dict[tuple[str, str], _Series] = {}
+            for _, window in self.windows:
+                for key, series in window.items():
+                    merged.setdefault(key, _Series()).merge(series)
+            slow = list(self.slow_calls)[-slow_calls:] if slow_calls > 0 else []
+            lifetime_calls = sum(series.calls for series in self.lifetime.values())
+            in_flight = {tool: count for tool, count in self.in_flight.items() if count}
+            uptime = time.time() - self.started_at
+        ranked = sorted(merged.items(), key=lambda item: -item[1].histograms["wall_seconds"].total)
+        return {
+            "uptime_seconds": round(uptime, 3),
+            "window_minutes": self.window_minutes,
+            "lifetime_calls": lifetime_calls,
+            "in_flight": in_flight,
+            "tools": [
+                {
+                    "tool": tool,
+                    "action": action,
+                    "calls": series.calls,
+                    "errors": series.errors,
+                    "total_wall_seconds": round(series.histograms["wall_seconds"].total, 6),
+                    **{name: histogram.summary() for name, histogram in series.histograms.items()},
+                }
+                for (tool, action), series in ranked
+            ],
+            "slow_call_seconds": slow_call_seconds(),
+            "slow_calls": [asdict(record) for record in reversed(slow)],
+            "trace_file": os.environ.get(TRACE_FILE_ENV_VAR, "").strip() or None,
+            "trace_errors": self.trace_errors,
+        }
+
+    def prometheus(self) -> str:
+        """Lifetime totals in the Prometheus text exposition format."""
+        out = [
+            "# HELP log_efficient_mcp_calls_total Tool calls by outcome.",
+            "# TYPE log_efficient_mcp_calls_total counter",
+        ]
+        with self.lock:
+            series = sorted(self.lifetime.items())
+            for (tool, action), totals in series:
+                labels = f'tool="{_label(tool)}",action="{_label(action)}"'
+                out.append(f'log_efficient_mcp_calls_total{{{labels},outcome="ok"}} {totals.calls - totals.errors}')
+                out.append(f'log_efficient_mcp_calls_total{{{labels},outcome="error"}} {totals.errors}')
+            for name in MEASURES:
+                metric = f"log_efficient_mcp_call_{name}"
+                out.append(f"# HELP {metric} Per-call {name.replace('_', ' ')}.")
+                out.append(f"# TYPE {metric} histogram")
+                for (tool, action), totals in series:
+                    labels = f'tool="{_label(tool)}",action="{_label(action)}"'
+                    histogram = totals.histograms[name]
+                    cumulative = 0
+                    for bound, hits in zip(histogram.bounds, histogram.buckets):
+                        cumulative += hits
+                        out.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    out.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    out.append(f"{metric}_sum{{{labels}}} {histogram.total}")
+                    out.append(f"{metric}_count{{{labels}}} {histogram.count}")
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+@lru_cache(maxsize=32)
+def _signature(func: Callable[..., object]) -> inspect.Signature | None:
+    try:
+        return inspect.signature(func)
+    except (TypeError, ValueError):
+        return None
+
+
+def _arguments(func: Callable[..., object], args: tuple, kwargs: dict[str, object]) -> tuple[str, dict[str, object]]:
+    """`(action, passed arguments)` of a call; the action falls back to the `action` parameter's default."""
+    signature = _signature(func)
+    if signature is None:
+        return "", {**{f"arg{idx}": value for idx, value in enumerate(args)}, **kwargs}
+    try:
+        arguments = dict(signature.bind_partial(*args, **kwargs).arguments)
+    except TypeError:
+        arguments = dict(kwargs)
+    action_param = signature.parameters.get("action")
+    return str(arguments.get("action", action_param.default if action_param is not None else "")), arguments
+
+
+def _preview(value: object) -> object:
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) > ARG_PREVIEW_CHARS:
+        return f"{text[:ARG_PREVIEW_CHARS]}…[{len(text) - ARG_PREVIEW_CHARS} chars clipped]"
+    return text
+
+
+def _response_chars(result: object) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, str):
+        return len(result)
+    return len(json.dumps(result, default=str))
+
+
+@dataclass
+class CallOutcome:
+    result: object = None
+
+
+@contextmanager
+def measured_call(
+    tool: str,
+    func: Callable[..., object],
+    args: tuple,
+    kwargs: dict[str, object],
+    *,
+    queued_at: float,
+    registry: MetricsRegistry | None = None,
+) -> Iterator[CallOutcome]:
+    """Time the call made inside the block on this thread and record it; set `.result` on the outcome.
+
+    CPU time is this thread's; work in pool processes or script subprocesses is not included.
+    """
+    registry = registry or REGISTRY
+    action, arguments = _arguments(func, args, kwargs)
+    outcome = CallOutcome()
+    error: str | None = None
+    registry.begin(tool)
+    started_at = time.time()
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    with call_counters() as counters:
+        try:
+            yield outcome
+        except BaseException as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            registry.record(
+                CallRecord(
+                    tool=tool,
+                    action=action,
+                    args={name: _preview(value) for name, value in arguments.items()},
+                    started_at=round(started_at, 3),
+                    wall_seconds=time.perf_counter() - started,
+                    cpu_seconds=time.thread_time() - cpu_started,
+                    queue_seconds=max(0.0, started - queued_at),
+                    bytes_read=counters.bytes_read,
+                    lines_scanned=counters.lines_scanned,
+                    matches=counters.matches,
+                    response_chars=_response_chars(outcome.result),
+                    error=error,
+                )
+            )
+
+
+@mcp.tool(name="metrics")
+def metrics(
+    format: Literal["json", "prometheus"] = "json",
+    slow_calls: int = 20,
+    reset: bool = False,
+) -> dict[str, object] | str:
+    """Report per-tool performance telemetry: latency, CPU, bytes read, lines scanned, and slow calls.
+
+    When to use:
+    - The server feels slow and you need to know which tool, action, file, or query is responsible.
+    - Checking how much work recent calls did (bytes read, lines scanned, response size).
+    - Scraping Prometheus-format metrics from an MCP client or sidecar.
+
+    When not to use:
+    - Liveness checks (use `health`).
+    - Inspecting log contents (use `log_explore`).
+
+    Core behavior:
+    - Covers `log_explore`, `script_runna`, and `script_job` calls: wall, CPU (the tool's own thread), and queue
+      time, bytes read from disk, lines scanned, matching lines returned, and response size, per tool and action.
+    - `format="json"` summarizes the last 15 minutes (count, mean, p50/p95/p99, max), busiest first, plus the
+      `slow_calls` most recent calls slower than the slow-call threshold, with their arguments.
+    - `format="prometheus"` returns lifetime histograms in the Prometheus text format.
+    - `reset=True` clears all telemetry after building the report.
+    """
+    slow_calls = max(0, min(slow_calls, SLOW_CALL_LOG_SIZE))
+    report: dict[str, object] | str
+    if format == "prometheus":
+        report = REGISTRY.prometheus()
+    else:
+        report = {"service": "log-efficient-mcp", **REGISTRY.snapshot(slow_calls=slow_calls)}
+    if reset:
+        REGISTRY.reset()
+    return report
@@ -0,0 +1 @@
+"""Byte-level scan engines backing the `log_explore` tool."""
@@ -0,0 +1,188 @@
+"""Single-pass `aggregate` over regex captures in bounded memory.
+
+Keys are counted exactly until `AGGREGATE_EXACT_KEYS` distinct keys have
+been seen; beyond that the counter degrades to a Misra-Gries heavy-hitters
+summary, whose counts undercount by at most the reported `max_error`.
+Numeric captures keep exact count/min/max/mean and estimate percentiles
+from a fixed-size reservoir sample.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import re
+from typing import Iterable
+
+AGGREGATE_EXACT_KEYS = 50_000
+AGGREGATE_SKETCH_MIN_KEYS = 1_000
+NUMERIC_SAMPLE_SIZE = 10_000
+PERCENTILES = (50, 90, 95, 99)
+
+
+class HeavyHitters:
+    """Exact counter that switches to a Misra-Gries summary past `exact_limit` keys."""
+
+    def __init__(self, *, top_k: int, exact_limit: int = AGGREGATE_EXACT_KEYS):
+        self.counts: dict[object, int] = {}
+        self.exact_limit = exact_limit
+        self.capacity = max(AGGREGATE_SKETCH_MIN_KEYS, 10 * top_k)
+        self.approximate = False
+        self.max_error = 0
+        self.total = 0
+
+    def add(self, key: object) -> None:
+        self.total += 1
+        counts = self.counts
+        counts[key] = counts.get(key, 0) + 1
+        if len(counts) > self.limit:
+            self._prune()
+
+    @property
+    def limit(self) -> int:
+        return 2 * self.capacity if self.approximate else self.exact_limit
+
+    def _prune(self) -> None:
+        # Subtract the (capacity + 1)-th largest count from every key, keeping at
+        # most `capacity` keys; each key's count drops by at most that amount.
+        values = sorted(self.counts.values(), reverse=True)
+        if len(values) <= self.capacity:
+            return
+        floor = values[self.capacity]
+        self.counts = {key: count - floor for key, count in self.counts.items() if count > floor}
+        self.max_error += floor
+        self.approximate = True
+
+    def top(self, k: int) -> list[tuple[object, int]]:
+        return sorted(self.counts.items(), key=lambda item: (-item[1], str(item[0])))[:k]
+
+
+class NumericSummary:
+    """Exact count/min/max/mean plus reservoir-sampled percentiles.
+
+    The reservoir uses Algorithm L, which draws random numbers only when an
+    item is actually kept rather than once per value.
+    """
+
+    def __init__(self, sample_size: int = NUMERIC_SAMPLE_SIZE):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.sample: list[float] = []
+        self.sample_size = sample_size
+        self._rng = random.Random(0)
+        self._weight = 1.0
+        self._next = sample_size
+
+    def _skip(self) -> None:
+        rng = self._rng
+        self._weight *= math.exp(math.log(1.0 - rng.random()) / self.sample_size)
+        self._next += int(math.log(1.0 - rng.random()) / math.log1p(-self._weight)) + 1
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        if self.count <= self.sample_size:
+            self.sample.append(value)
+            if self.count == self.sample_size:
+                self._skip()
+        elif self.count == self._next:
+            self.sample[self._rng.randrange(self.sample_size)] = value
+            self._skip()
+
+    def summary(self) -> dict[str, object]:
+        ordered = sorted(self.sample)
+        result: dict[str, object] = {
+            "count": self.count,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": self.total / self.count,
+        }
+        for pct in PERCENTILES:
+            rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+            result[f"p{pct}"] = ordered[rank]
+        result["approximate_percentiles"] = self.count > self.sample_size
+        return result
+
+
+def resolve_group_by(pattern: re.Pattern[str], group_by: str) -> list[int | str]:
+    """Parse a comma-separated list of capture names or 1-based indexes; default is every capture."""
+    names = [part.strip() for part in group_by.split(",") if part.strip()]
+    if not names:
+        return list(range(1, pattern.groups + 1)) or [0]
+    groups: list[int | str] = []
+    for name in names:
+        if name.isdigit() and 0 <= int(name) <= pattern.groups:
+            groups.append(int(name))
+        elif name in pattern.groupindex:
+            groups.append(name)
+        else:
+            raise ValueError(f"`group_by` names unknown capture group: {name}")
+    return groups
+
+
+def _group_label(pattern: re.Pattern[str], group: int | str) -> str:
+    if isinstance(group, str):
+        return group
+    names = {index: name for name, index in pattern.groupindex.items()}
+    return names.get(group, str(group))
+
+
+def _number(value: str) -> float | None:
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def aggregate_matches(
+    matches: Iterable[re.Match[str]],
+    *,
+    pattern: re.Pattern[str],
+    group_by: str = "",
+    top_k: int = 20,
+) -> dict[str, object]:
+    """Fold `matches` into key counts, top-k, and numeric capture summaries."""
+    key_groups = resolve_group_by(pattern, group_by)
+    counter = HeavyHitters(top_k=top_k)
+    # Captures stay numeric until their first non-numeric value.
+    numeric: dict[int, NumericSummary | None] = {group: NumericSummary() for group in range(1, pattern.groups + 1)}
+
+    for m in matches:
+        if len(key_groups) == 1:
+            counter.add(m.group(key_groups[0]))
+        else:
+            counter.add(m.group(*key_groups))
+        for group, summary in numeric.items():
+            if summary is None:
+                continue
+            value = m.group(group)
+            if value is None:
+                continue
+            number = _number(value)
+            if number is None:
+                numeric[group] = None
+            else:
+                summary.add(number)
+
+    return {
+        "matches": counter.total,
+        "group_by": [_group_label(pattern, group) for group in key_groups],
+        "distinct": None if counter.approximate else len(counter.counts),
+        "approximate": counter.approximate,
+        "max_error": counter.max_error,
+        "top": [
+            {"key": list(key) if isinstance(key, tuple) else key, "count": count} for key, count in counter.top(top_k)
+        ],
+        "numeric": {
+            _group_label(pattern, group): summary.summary()
+            for group, summary in numeric.items()
+            if summary is not None and summary.count
+        },
+    }
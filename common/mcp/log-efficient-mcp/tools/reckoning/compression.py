@@ -0,0 +1,247 @@
+"""Transparent gzip/zstd reading with in-memory gzip seek checkpoints.
+
+Decompression is chunked: at most `STREAM_INPUT_BYTES` of compressed input and
+`STREAM_OUTPUT_BYTES` of output are held per step. While a gzip file is
+streamed from the start (or from its last checkpoint), a snapshot of the
+inflate state (`decompressobj.copy()`, i.e. the 32 KiB window plus state) is
+kept every `GZIP_CHECKPOINT_BYTES` of output, zran-style. Later `range`/`tail`
+calls restart inflation from the nearest checkpoint instead of byte 0.
+"""
+
+from __future__ import annotations
+
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from tools.reckoning.source import FileIdentity
+from tools.reckoning.tail import last_lines
+from tools.reckoning.telemetry import tally
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+STREAM_INPUT_BYTES = 64 << 10
+STREAM_OUTPUT_BYTES = 1 << 20
+GZIP_CHECKPOINT_BYTES = 32 << 20
+MAX_CHECKPOINT_CARRY_BYTES = 1 << 20
+MAX_INDEXED_FILES = 4
+TAIL_TRIM_BYTES = 8 << 20
+
+_GZIP_INDEXES: OrderedDict[str, "GzipIndex"] = OrderedDict()
+
+
+def detect_compression(path: Path) -> str | None:
+    """Return `"gzip"`, `"zstd"`, or `None` based on the file's magic bytes."""
+    with path.open("rb") as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return "gzip"
+    if magic == ZSTD_MAGIC:
+        return "zstd"
+    return None
+
+
+@dataclass
+class GzipCheckpoint:
+    comp_offset: int
+    out_offset: int
+    newlines: int
+    carry: bytes
+    state: object
+    # False when the checkpoint falls between two members.
+    in_member: bool = True
+
+
+@dataclass
+class GzipIndex:
+    identity: FileIdentity
+    checkpoints: list[GzipCheckpoint] = field(default_factory=list)
+    complete: bool = False
+    total_lines: int = 0
+
+    def locate_line(self, line: int) -> GzipCheckpoint | None:
+        """Latest checkpoint whose first (partial) line is at or before `line`."""
+        best = None
+        for cp in self.checkpoints:
+            if cp.newlines + 1 > line:
+                break
+            best = cp
+        return best
+
+
+def _gzip_index(path: Path) -> GzipIndex:
+    identity = FileIdentity.of(path)
+    key = str(path)
+    index = _GZIP_INDEXES.get(key)
+    if index is None or index.identity != identity:
+        index = GzipIndex(identity=identity)
+    _GZIP_INDEXES[key] = index
+    _GZIP_INDEXES.move_to_end(key)
+    while len(_GZIP_INDEXES) > MAX_INDEXED_FILES:
+        _GZIP_INDEXES.popitem(last=False)
+    return index
+
+
+def _gzip_chunks(path: Path, start: GzipCheckpoint | None = None) -> Iterator[bytes]:
+    """Yield decompressed chunks, from `start` if given, recording checkpoints.
+
+    Concatenated (multi-member) gzip files are decoded member after member;
+    zero padding between or after members is skipped. Corrupt data and a
+    stream that ends inside a member raise ValueError.
+    """
+    index = _gzip_index(path)
+    with path.open("rb") as f:
+        if start is None:
+            d = zlib.decompressobj(31)
+            comp = out = newlines = 0
+            carry: bytes | None = b""
+            in_member = False
+        else:
+            d = start.state.copy()
+            f.seek(start.comp_offset)
+            comp, out, newlines, carry = start.comp_offset, start.out_offset, start.newlines, start.carry
+            in_member = start.in_member
+            if carry:
+                yield carry
+        next_checkpoint = (out // GZIP_CHECKPOINT_BYTES + 1) * GZIP_CHECKPOINT_BYTES
+        last_byte_newline = True
+
+        while True:
+            data = f.read(STREAM_INPUT_BYTES)
+            if not data:
+                break
+            comp += len(data)
+            tally(bytes_read=len(data))
+            pending = data if in_member else data.lstrip(b"\x00")
+            while pending:
+                try:
+                    chunk = d.decompress(pending, STREAM_OUTPUT_BYTES)
+                except zlib.error as exc:
+                    raise ValueError(f"{path.name} is not a valid gzip file: {exc}") from exc
+                pending = d.unconsumed_tail
+                in_member = True
+                if d.eof:
+                    pending = d.unused_data.lstrip(b"\x00")
+                    d = zlib.decompressobj(31)
+                    in_member = False
+                if not chunk:
+                    continue
+                out += len(chunk)
+                count = chunk.count(b"\n")
+                newlines += count
+                last_byte_newline = chunk.endswith(b"\n")
+                if count:
+                    carry = chunk[chunk.rfind(b"\n") + 1 :]
+                elif carry is not None:
+                    carry += chunk
+                if carry is not None and len(carry) > MAX_CHECKPOINT_CARRY_BYTES:
+                    carry = None
+                yield chunk
+
+            last = index.checkpoints[-1].out_offset if index.checkpoints else 0
+            if out >= next_checkpoint and out > last and carry is not None:
+                index.checkpoints.append(GzipCheckpoint(comp, out, newlines, carry, d.copy(), in_member))
+                next_checkpoint = (out // GZIP_CHECKPOINT_BYTES + 1) * GZIP_CHECKPOINT_BYTES
+
+        if in_member:
+            raise ValueError(f"{path.name} is truncated: the gzip stream ends inside a member.")
+        index.complete = True
+        index.total_lines = newlines + (0 if last_byte_newline or out == 0 else 1)
+
+
+def _zstd_chunks(path: Path) -> Iterator[bytes]:
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ValueError(
+            "Reading zstd-compressed files requires the optional `zstandard` package "
+            "(pip install 'log-efficient-mcp[zstd]')."
+        ) from exc
+    with path.open("rb") as f, zstandard.ZstdDecompressor().stream_reader(f, read_size=STREAM_INPUT_BYTES) as reader:
+        read = 0
+        while True:
+            try:
+                chunk = reader.read(STREAM_OUTPUT_BYTES)
+            except zstandard.ZstdError as exc:
+                raise ValueError(f"{path.name} is not a valid zstd file: {exc}") from exc
+            tally(bytes_read=f.tell() - read)
+            read = f.tell()
+            if not chunk:
+                break
+            yield chunk
+
+
+def iter_decompressed_chunks(path: Path, compression: str) -> Iterator[bytes]:
+    """Yield the whole decompressed stream in bounded chunks."""
+    if compression == "gzip":
+        return _gzip_chunks(path)
+    if compression == "zstd":
+        return _zstd_chunks(path)
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def iter_decompressed_lines(path: Path, compression: str, *, start_line: int = 1) -> Iterator[tuple[int, bytes]]:
+    """Yield `(line number, raw bytes)` pairs, jumping to a gzip checkpoint when possible."""
+    first_line = 1
+    if compression == "gzip":
+        checkpoint = _gzip_index(path).locate_line(start_line)
+        chunks = _gzip_chunks(path, checkpoint)
+        if checkpoint is not None:
+            first_line = checkpoint.newlines + 1
+    else:
+        chunks = iter_decompressed_chunks(path, compression)
+
+    line = first_line
+    partial = b""
+    for chunk in chunks:
+        if partial:
+            chunk = partial + chunk
+        count = chunk.count(b"\n")
+        if line + count < start_line:
+            # Skip whole chunks that end before the requested line.
+            line += count
+            partial = chunk[chunk.rfind(b"\n") + 1 :] if count else chunk
+            continue
+        start = 0
+        while True:
+            nl = chunk.find(b"\n", start)
+            if nl < 0:
+                break
+            yield line, chunk[start : nl + 1]
+            line += 1
+            start = nl + 1
+        partial = chunk[start:]
+    if partial:
+        yield line, partial
+
+
+def compressed_tail(path: Path, compression: str, *, max_lines: int) -> tuple[int, list[bytes]]:
+    """Return `(first line number, raw lines)` for the last `max_lines` lines."""
+    index = _gzip_index(path) if compression == "gzip" else None
+    if index is not None and index.complete:
+        start_line = max(1, index.total_lines - max_lines + 1)
+        lines = [
+            raw for line, raw in iter_decompressed_lines(path, compression, start_line=start_line) if line >= start_line
+        ]
+        return start_line, lines
+
+    kept: list[bytes] = []
+    kept_bytes = 0
+    newlines = 0
+    last_byte_newline = True
+    for chunk in iter_decompressed_chunks(path, compression):
+        newlines += chunk.count(b"\n")
+        last_byte_newline = chunk.endswith(b"\n")
+        kept.append(chunk)
+        kept_bytes += len(chunk)
+        if kept_bytes > TAIL_TRIM_BYTES:
+            data = b"".join(kept)
+            start, _ = last_lines(data, max_lines)
+            kept = [data[start:]]
+            kept_bytes = len(kept[0])
+
+    _, lines = last_lines(b"".join(kept), max_lines)
+    total = newlines + (0 if last_byte_newline else 1)
+    return max(1, total - len(lines) + 1), lines
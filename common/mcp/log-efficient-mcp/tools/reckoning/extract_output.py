@@ -0,0 +1,194 @@
+"""Structured `extract` output: captures as a columnar table, CSV/TSV, or NDJSON, inline or spilled to a file.
+
+`lines` (the default) returns the matching lines themselves. The other
+formats carry only each match's line number and captures, which on wide
+log lines is a fraction of the size and needs no re-parsing. Columns are
+the pattern's named groups, or `1`..`n` for positional ones.
+
+A spill streams every row of a one-pass scan to `output_file` (NDJSON,
+CSV/TSV, raw lines, or Parquet with the optional `pyarrow` package) and
+the response only summarizes it, so result sets far beyond the inline
+limits stay out of the context window and out of server memory.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import re
+from pathlib import Path
+from typing import BinaryIO, Literal
+
+from tools.reckoning.response import clip_line
+
+ExtractFormat = Literal["lines", "table", "csv", "tsv", "ndjson", "parquet"]
+SPILL_MAX_MATCHES = 10_000_000
+PARQUET_BATCH_ROWS = 64 << 10
+
+# `json.dumps` with non-default arguments builds a new encoder per call.
+_JSON = json.JSONEncoder(ensure_ascii=False)
+
+
+def capture_columns(pattern: re.Pattern[str]) -> list[str]:
+    """Capture column names of `pattern`: its named groups in order, else `1`..`n`."""
+    if pattern.groupindex:
+        return sorted(pattern.groupindex, key=pattern.groupindex.__getitem__)
+    return [str(i) for i in range(1, pattern.groups + 1)]
+
+
+def header(columns: list[str]) -> list[str]:
+    """The line-number column followed by the capture columns (`_line` if a capture is named `line`)."""
+    return ["_line" if "line" in columns else "line", *columns]
+
+
+def _cells(row: dict[str, object], max_chars: int | None = None) -> list[object]:
+    groups = row.get("groups") or []
+    values = list(groups.values()) if isinstance(groups, dict) else list(groups)
+    if max_chars is not None:
+        values = [clip_line(value, max_chars) if isinstance(value, str) else value for value in values]
+    return [row["line"], *values]
+
+
+def _text_row(fmt: str, names: list[str], cells: list[object]) -> str:
+    if fmt == "ndjson":
+        return _JSON.encode(dict(zip(names, cells))) + "\n"
+    out = io.StringIO()
+    dialect = "excel-tab" if fmt == "tsv" else "excel"
+    csv.writer(out, dialect=dialect, lineterminator="\n").writerow(["" if cell is None else cell for cell in cells])
+    return out.getvalue()
+
+
+def render_captures(
+    rows: list[dict[str, object]],
+    columns: list[str],
+    fmt: ExtractFormat,
+    *,
+    max_chars: int,
+    max_line_chars: int,
+) -> tuple[str | dict[str, list[object]], int]:
+    """Render rows as `fmt` within `max_chars`; return `(content, rows rendered)`.
+
+    `table` is a dict of column arrays; the text formats are strings (CSV/TSV
+    with a header row). Capture values are clipped to `max_line_chars`, and
+    at least one row is always rendered.
+    """
+    names = header(columns)
+    table: dict[str, list[object]] = {name: [] for name in names}
+    parts: list[str] = [] if fmt in ("table", "ndjson") else [_text_row(fmt, names, names)]
+    used_chars = sum(len(part) for part in parts)
+    used = 0
+    for row in rows:
+        cells = _cells(row, max_line_chars)
+        piece = _JSON.encode(cells) if fmt == "table" else _text_row(fmt, names, cells)
+        if used and used_chars + len(piece) > max_chars:
+            break
+        used_chars += len(piece)
+        used += 1
+        if fmt == "table":
+            for name, cell in zip(names, cells):
+                table[name].append(cell)
+        else:
+            parts.append(piece)
+    return (table if fmt == "table" else "".join(parts)), used
+
+
+class CaptureSpill:
+    """Writes `extract` rows to a file as they are found; use as a context manager."""
+
+    def __init__(self, path: Path, fmt: ExtractFormat, columns: list[str]):
+        if fmt == "table":
+            raise ValueError("`format=\"table\"` is inline only; spill with `ndjson`, `csv`, `tsv`, or `parquet`.")
+        self.path = path
+        self.fmt = fmt
+        self.names = header(columns)
+        self.rows = 0
+        self.first_line: int | None = None
+        self.last_line: int | None = None
+        self._file = None
+        self._csv = None
+        self._parquet = None
+        self._batch: list[list[object]] = []
+
+    def __enter__(self) -> "CaptureSpill":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Only new files are written, so a spill can never clobber a log or any other existing file.
+        try:
+            if self.fmt == "parquet":
+                self._file = self.path.open("xb")
+            else:
+                self._file = self.path.open("x", encoding="utf-8", newline="")
+        except FileExistsError:
+            raise ValueError(f"`output_file` already exists: {self.path}; pass a new path.") from None
+        if self.fmt == "parquet":
+            try:
+                self._parquet = _parquet_writer(self._file, self.names)
+            except BaseException:
+                self._file.close()
+                self.path.unlink(missing_ok=True)
+                raise
+        elif self.fmt in ("csv", "tsv"):
+            dialect = "excel-tab" if self.fmt == "tsv" else "excel"
+            self._csv = csv.writer(self._file, dialect=dialect, lineterminator="\n")
+            self._csv.writerow(self.names)
+        return self
+
+    def write(self, rows: list[dict[str, object]]) -> None:
+        if self.fmt == "lines":
+            for row in rows:
+                raw = str(row["raw"])
+                self._file.write(raw if raw.endswith("\n") else raw + "\n")
+        elif self._csv is not None:
+            self._csv.writerows(["" if cell is None else cell for cell in _cells(row)] for row in rows)
+        elif self._parquet is not None:
+            self._batch.extend(_cells(row) for row in rows)
+            if len(self._batch) >= PARQUET_BATCH_ROWS:
+                self._flush()
+        else:
+            self._file.writelines(_text_row(self.fmt, self.names, _cells(row)) for row in rows)
+        if rows:
+            self.first_line = self.first_line or int(rows[0]["line"])
+            self.last_line = int(rows[-1]["line"])
+            self.rows += len(rows)
+
+    def _flush(self) -> None:
+        if not self._batch:
+            return
+        pa, writer = self._parquet
+        columns = list(zip(*self._batch))
+        arrays = [pa.array(column, type=field.type) for column, field in zip(columns, writer.schema)]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=writer.schema))
+        self._batch = []
+
+    def __exit__(self, *exc_info) -> None:
+        if self._parquet is not None:
+            try:
+                if exc_info[0] is None:
+                    self._flush()
+            finally:
+                self._parquet[1].close()
+        if self._file is not None:
+            self._file.close()
+
+    def summary(self) -> dict[str, object]:
+        return {
+            "output_file": str(self.path),
+            "format": self.fmt,
+            "columns": self.names if self.fmt != "lines" else None,
+            "rows": self.rows,
+            "bytes": self.path.stat().st_size,
+            "first_line": self.first_line,
+            "last_line": self.last_line,
+        }
+
+
+def _parquet_writer(out: BinaryIO, names: list[str]):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ValueError(
+            "Writing Parquet requires the optional `pyarrow` package (pip install 'log-efficient-mcp[parquet]')."
+        ) from exc
+    schema = pa.schema([(names[0], pa.int64()), *((name, pa.string()) for name in names[1:])])
+    return pa, pq.ParquetWriter(out, schema)
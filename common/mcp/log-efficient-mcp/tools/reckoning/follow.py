@@ -0,0 +1,141 @@
+"""Cursor-based `follow` reads that only touch bytes appended since the last call."""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+import time
+from pathlib import Path
+
+from tools.reckoning.progress import checkpoint
+from tools.reckoning.source import FileIdentity, decode_line
+from tools.reckoning.tail import read_tail
+from tools.reckoning.telemetry import tally
+
+CURSOR_VERSION = 1
+FOLLOW_POLL_SECONDS = 0.25
+
+
+def encode_cursor(payload: dict[str, object]) -> str:
+    raw = json.dumps({"v": CURSOR_VERSION, **payload}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> dict[str, object]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("`cursor` is not a valid log_explore cursor.") from exc
+    if not isinstance(payload, dict) or payload.get("v") != CURSOR_VERSION:
+        raise ValueError("`cursor` is not a valid log_explore cursor.")
+    return payload
+
+
+def _follow_cursor(identity: FileIdentity, size: int, offset: int, line: int | None) -> str:
+    return encode_cursor(
+        {"kind": "follow", "off": offset, "line": line, "dev": identity.dev, "ino": identity.ino, "size": size}
+    )
+
+
+def start_cursor(path: Path) -> str:
+    """A `follow` cursor at the top of `path`, so the next call returns the file from line 1."""
+    st = path.stat()
+    return _follow_cursor(FileIdentity(dev=st.st_dev, ino=st.st_ino, size=0, mtime_ns=st.st_mtime_ns), 0, 0, 1)
+
+
+def _parse_follow_cursor(cursor: str) -> tuple[int, int | None, int, int]:
+    state = decode_cursor(cursor)
+    if state.get("kind") != "follow":
+        raise ValueError("`cursor` was not produced by the `follow` action.")
+    try:
+        line = state.get("line")
+        return int(state["off"]), int(line) if line is not None else None, int(state["dev"]), int(state["ino"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError("`cursor` is not a valid log_explore cursor.") from exc
+
+
+def _read_complete_lines(f, offset: int, max_lines: int) -> tuple[list[bytes], int, bool]:
+    """Return up to `max_lines` newline-terminated lines from `offset`, the new offset, and has_more."""
+    lines: list[bytes] = []
+    start = offset
+    has_more = False
+    f.seek(offset)
+    for raw in f:
+        if not raw.endswith(b"\n"):
+            break
+        if len(lines) >= max_lines:
+            has_more = True
+            break
+        lines.append(raw)
+        offset += len(raw)
+    tally(bytes_read=offset - start, lines=len(lines))
+    return lines, offset, has_more
+
+
+def _initial_window(path: Path, size: int, max_lines: int) -> tuple[list[bytes], int, int | None]:
+    first_line, lines = read_tail(path, max_lines=max_lines + 1, size=size)
+    end = size
+    if lines and not lines[-1].endswith(b"\n"):
+        end -= len(lines.pop())
+    drop = max(0, len(lines) - max_lines)
+    if first_line is not None:
+        first_line += drop
+    return lines[drop:], end, first_line
+
+
+def follow(
+    path: Path,
+    *,
+    cursor: str,
+    max_lines: int,
+    wait_seconds: float,
+    encoding: str,
+) -> dict[str, object]:
+    """Return complete lines appended since `cursor` plus a cursor for the next call.
+
+    Without a cursor, the last `max_lines` complete lines are returned as a
+    starting point. A trailing line without a newline is never consumed, so
+    a line that is still being written is returned whole on a later call.
+    Rotation (new inode) and truncation (size below the cursor) restart from
+    byte 0 of the current file and are reported in the response.
+    """
+    rotated = truncated = False
+    has_more = False
+    with path.open("rb") as f:
+        st = os.fstat(f.fileno())
+        identity = FileIdentity(dev=st.st_dev, ino=st.st_ino, size=st.st_size, mtime_ns=st.st_mtime_ns)
+        size = identity.size
+        if not cursor:
+            raw_lines, offset, first_line = _initial_window(path, identity.size, max_lines)
+        else:
+            offset, first_line, dev, ino = _parse_follow_cursor(cursor)
+            rotated = (dev, ino) != (identity.dev, identity.ino)
+            truncated = not rotated and identity.size < offset
+            if rotated or truncated:
+                offset, first_line = 0, 1
+
+            # Reads stay on the open handle, so a rotation while waiting still
+            # drains the old file; the next call then reports the rotation.
+            deadline = time.monotonic() + max(0.0, wait_seconds)
+            while True:
+                raw_lines, new_offset, has_more = _read_complete_lines(f, offset, max_lines)
+                if raw_lines or time.monotonic() >= deadline:
+                    break
+                checkpoint()
+                time.sleep(FOLLOW_POLL_SECONDS)
+            offset = new_offset
+            size = os.fstat(f.fileno()).st_size
+
+    next_line = first_line + len(raw_lines) if isinstance(first_line, int) else None
+    return {
+        "action": "follow",
+        "content": "".join(decode_line(raw, encoding) for raw in raw_lines),
+        "start_line": first_line,
+        "lines": len(raw_lines),
+        "has_more": has_more,
+        "rotated": rotated,
+        "truncated": truncated,
+        "cursor": _follow_cursor(identity, size, offset, next_line),
+    }
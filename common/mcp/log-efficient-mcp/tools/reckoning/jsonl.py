@@ -0,0 +1,321 @@
+"""`json` action: field filters and projection over JSON-lines logs.
+
+Predicates are planned into one required byte literal (the JSON-encoded
+string value of an `==` clause, else a quoted key name), so lines that
+cannot match are skipped with a `bytes.find` scan and never parsed. Lines
+are parsed with `orjson` when it is installed (`log-efficient-mcp[json]`),
+else with the standard library.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from tools.reckoning.response import RESPONSE_MAX_CHARS
+from tools.reckoning.search import DENSE_HIT_LINES
+from tools.reckoning.source import iter_regions, supports_byte_engine
+from tools.reckoning.telemetry import tally
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_CLAUSE = re.compile(
+    r"\s*(?P<path>[A-Za-z_@$][\w.@$-]*)\s*(?P<op>==|!=|>=|<=|>|<|~)\s*"
+    r"(?P<value>\"(?:[^\"\\]|\\.)*\"|[^\s\"]+)\s*"
+)
+_AND = re.compile(r"and\b\s*", re.IGNORECASE)
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class Predicate:
+    path: tuple[str, ...]
+    op: str
+    value: object
+    pattern: re.Pattern[str] | None = None
+
+
+def _literal_value(text: str) -> object:
+    """JSON literal (`"a b"`, `500`, `true`, `null`), else the bare word as a string."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        if text.startswith('"'):
+            raise ValueError(f"Invalid quoted value in `where`: {text}") from None
+        return text
+
+
+def parse_where(where: str, *, ignore_case: bool = False) -> list[Predicate]:
+    """Parse `field op value [and ...]`; ops are `== != > >= < <=` and `~` (regex search)."""
+    predicates: list[Predicate] = []
+    pos = 0
+    text = where.strip()
+    while pos < len(text):
+        m = _CLAUSE.match(text, pos)
+        if m is None:
+            raise ValueError(f"Cannot parse `where` near {text[pos:pos + 30]!r}; expected `field op value`.")
+        value = _literal_value(m.group("value"))
+        pattern = None
+        if m.group("op") == "~":
+            pattern = re.compile(str(value), re.IGNORECASE if ignore_case else 0)
+        predicates.append(Predicate(tuple(m.group("path").split(".")), m.group("op"), value, pattern))
+        pos = m.end()
+        if pos < len(text):
+            joiner = _AND.match(text, pos)
+            if joiner is None:
+                raise ValueError(f"Join `where` clauses with `and`, near {text[pos:pos + 30]!r}.")
+            pos = joiner.end()
+    return predicates
+
+
+def parse_fields(fields: str) -> list[str]:
+    return [name.strip() for name in fields.split(",") if name.strip()]
+
+
+def lookup(obj: object, path: tuple[str, ...]) -> object:
+    """Resolve a dotted path (list indexes allowed); a literal dotted key wins."""
+    if isinstance(obj, dict) and len(path) > 1 and ".".join(path) in obj:
+        return obj[".".join(path)]
+    for key in path:
+        if isinstance(obj, dict):
+            obj = obj.get(key, _MISSING)
+        elif isinstance(obj, list) and key.isdigit() and int(key) < len(obj):
+            obj = obj[int(key)]
+        else:
+            return _MISSING
+        if obj is _MISSING:
+            return _MISSING
+    return obj
+
+
+def _number(value: object) -> float | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+_COMPARE = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+
+def matches(obj: object, predicate: Predicate, *, ignore_case: bool = False) -> bool:
+    """Evaluate one predicate; a missing field never matches (not even `!=`).
+
+    Numbers compare numerically (numeric strings are coerced), strings compare
+    as strings (casefolded with `ignore_case`), other values only by `==`/`!=`.
+    """
+    actual = lookup(obj, predicate.path)
+    if actual is _MISSING:
+        return False
+    expected = predicate.value
+    if predicate.pattern is not None:
+        return isinstance(actual, str) and predicate.pattern.search(actual) is not None
+    if isinstance(expected, str) and isinstance(actual, str):
+        if ignore_case:
+            actual, expected = actual.casefold(), expected.casefold()
+    elif _number(expected) is not None and not isinstance(expected, str) and _number(actual) is not None:
+        actual, expected = _number(actual), _number(expected)
+    elif predicate.op not in ("==", "!="):
+        return False
+    return _COMPARE[predicate.op](actual, expected)
+
+
+def _encoded(value: str) -> str | None:
+    """The JSON form of `value` if every writer encodes it the same way.
+
+    Non-ASCII characters may be written raw or as `\\uXXXX` escapes, and `/`
+    as `\\/`, so values containing them get no literal.
+    """
+    text = json.dumps(value)
+    return None if "\\" in text or "/" in text else text
+
+
+def required_literal(predicates: list[Predicate], *, ignore_case: bool = False) -> str | None:
+    """Literal every matching raw line must contain, or None.
+
+    Quoted `==` string values are preferred over quoted key names, which
+    usually appear on every line of a homogeneous log. Values are skipped
+    with `ignore_case`: casefolding matches `Straße` to `strasse`, which no
+    lowercased literal finds. Only single-segment paths give a key, since
+    `a.b` may also be a literal `"a.b"` key.
+    """
+    values: list[str | None] = []
+    keys: list[str | None] = []
+    for predicate in predicates:
+        if predicate.op == "==" and isinstance(predicate.value, str) and not ignore_case:
+            values.append(_encoded(predicate.value))
+        if len(predicate.path) == 1 and not predicate.path[0].isdigit():
+            keys.append(_encoded(predicate.path[0]))
+    for candidates in (values, keys):
+        usable = [c for c in candidates if c is not None]
+        if usable:
+            return max(usable, key=len)
+    return None
+
+
+def _candidate_lines(
+    regions, literal: bytes | None, *, folded: bool, first_line: int = 1
+) -> Iterator[tuple[int, bytes]]:
+    """Yield `(line number, raw line)` for lines of `regions` containing `literal`."""
+    line_no = first_line
+    for _, region in regions:
+        newlines = region.count(b"\n")
+        tally(lines=newlines)
+        hay = region.lower() if folded else region
+        if literal is None or hay.count(literal) * DENSE_HIT_LINES > newlines:
+            lines = region.split(b"\n")
+            if region.endswith(b"\n"):
+                lines.pop()
+            hay_lines = hay.split(b"\n") if folded else lines
+            for offset, line in enumerate(lines):
+                if literal is None or literal in hay_lines[offset]:
+                    yield line_no + offset, line
+            line_no += len(lines)
+            continue
+        pos = 0
+        counted = 0
+        while True:
+            hit = hay.find(literal, pos)
+            if hit == -1:
+                break
+            start = region.rfind(b"\n", 0, hit) + 1
+            end = region.find(b"\n", hit)
+            if end == -1:
+                end = len(region)
+            line_no += region.count(b"\n", counted, start)
+            counted = start
+            yield line_no, region[start:end]
+            pos = end + 1
+        line_no += region.count(b"\n", counted)
+
+
+def _text_lines(
+    path: Path, encoding: str, literal: str | None, *, folded: bool, start: int = 0, first_line: int = 1
+) -> Iterator[tuple[int, str]]:
+    with path.open("r", encoding=encoding, errors="replace") as f:
+        if start:
+            f.seek(start)
+        for idx, line in enumerate(f, start=first_line):
+            if literal is None or literal in (line.lower() if folded else line):
+                yield idx, line
+
+
+def _loads(raw: bytes | str, encoding: str) -> object:
+    if orjson is not None and (isinstance(raw, str) or codecs.lookup(encoding).name == "utf-8"):
+        return orjson.loads(raw)
+    if isinstance(raw, bytes):
+        raw = raw.decode(encoding, errors="replace")
+    return json.loads(raw)
+
+
+def _dumps(obj: object) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def project(obj: object, fields: list[str]) -> object:
+    if not fields:
+        return obj
+    projected = {}
+    for name in fields:
+        value = lookup(obj, tuple(name.split(".")))
+        if value is not _MISSING:
+            projected[name] = value
+    return projected
+
+
+def json_scan(
+    path: Path,
+    *,
+    where: str,
+    fields: str,
+    ignore_case: bool,
+    max_matches: int,
+    encoding: str,
+    regions=None,
+    start: int = 0,
+    first_line: int = 1,
+    max_chars: int = RESPONSE_MAX_CHARS,
+) -> dict[str, object]:
+    """Filter JSON-lines records by `where` and project `fields`, labelling output `line:json`.
+
+    Output stops (as `truncated`) at `max_matches` rows or `max_chars` characters.
+
+    `start`/`first_line` resume at a line boundary (a `tell()` cookie in text
+    mode); resumed `regions` must already begin at `first_line`. When the
+    result is truncated, `next_line` is the line the next page starts at.
+    """
+    predicates = parse_where(where, ignore_case=ignore_case)
+    wanted = parse_fields(fields)
+    literal = required_literal(predicates, ignore_case=ignore_case)
+    if literal is not None and ignore_case:
+        literal = literal.lower()
+
+    if regions is not None or supports_byte_engine(encoding):
+        needle = literal.encode(encoding, errors="replace") if literal is not None else None
+        if regions is None:
+            regions = iter_regions(path, start=start)
+        lines = _candidate_lines(regions, needle, folded=ignore_case, first_line=first_line)
+    else:
+        lines = _text_lines(path, encoding, literal, folded=ignore_case, start=start, first_line=first_line)
+
+    out: list[str] = []
+    parsed = 0
+    invalid = 0
+    truncated = False
+    last_line = first_line - 1
+    size = 0
+    for line_no, raw in lines:
+        if not raw.strip():
+            continue
+        parsed += 1
+        try:
+            obj = _loads(raw, encoding)
+        except ValueError:
+            invalid += 1
+            continue
+        if not isinstance(obj, dict):
+            invalid += 1
+            continue
+        if not all(matches(obj, predicate, ignore_case=ignore_case) for predicate in predicates):
+            continue
+        row = f"{line_no}:{_dumps(project(obj, wanted))}\n"
+        if len(out) >= max_matches or (out and size + len(row) > max_chars):
+            truncated = True
+            break
+        out.append(row)
+        size += len(row)
+        last_line = line_no
+
+    return {
+        "matches": len(out),
+        "parsed": parsed,
+        "invalid": invalid,
+        "truncated": truncated,
+        "next_line": last_line + 1 if truncated else None,
+        "content": "".join(out),
+    }
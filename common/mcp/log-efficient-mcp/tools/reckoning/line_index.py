@@ -0,0 +1,194 @@
+"""Persistent sparse line-offset index for seeking into large files by line number."""
+
+from __future__ import annotations
+
+import json
+import os
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+from tools.reckoning.source import (
+    FileIdentity,
+    cache_key,
+    prefix_fingerprint,
+    refresh_lock,
+    resolve_cache_dir,
+)
+from tools.reckoning.telemetry import tally
+
+INDEX_VERSION = 1
+INDEX_STRIDE_BYTES = 1 << 20
+INDEX_MIN_FILE_BYTES = 8 << 20
+SCAN_CHUNK_BYTES = 4 << 20
+
+_MEMORY_CACHE: dict[str, "LineIndex"] = {}
+
+
+@dataclass
+class LineIndex:
+    """Checkpoints of `(line number, byte offset)` roughly every `stride` bytes.
+
+    Each checkpoint is the start of a line, so a reader can seek to the nearest
+    checkpoint at or before a target line and only decode the lines it returns.
+    """
+
+    path: str
+    identity: FileIdentity
+    stride: int
+    indexed_bytes: int = 0
+    newlines: int = 0
+    last_byte_newline: bool = True
+    next_checkpoint: int = 0
+    fingerprint: str = ""
+    lines: array = field(default_factory=lambda: array("q", [1]))
+    offsets: array = field(default_factory=lambda: array("q", [0]))
+
+    @property
+    def total_lines(self) -> int:
+        if self.indexed_bytes == 0:
+            return 0
+        return self.newlines + (0 if self.last_byte_newline else 1)
+
+    def locate(self, line: int) -> tuple[int, int]:
+        """Return the `(line, offset)` checkpoint at or before `line`."""
+        pos = max(0, bisect_right(self.lines, line) - 1)
+        return self.lines[pos], self.offsets[pos]
+
+    def locate_offset(self, offset: int) -> tuple[int, int]:
+        """Return the `(line, offset)` checkpoint at or before byte `offset`."""
+        pos = max(0, bisect_right(self.offsets, offset) - 1)
+        return self.lines[pos], self.offsets[pos]
+
+
+def _extend(index: LineIndex, path: Path, size: int) -> None:
+    with path.open("rb") as f:
+        f.seek(index.indexed_bytes)
+        pos = index.indexed_bytes
+        while pos < size:
+            chunk = f.read(min(SCAN_CHUNK_BYTES, size - pos))
+            if not chunk:
+                break
+            while index.next_checkpoint < pos + len(chunk):
+                nl = chunk.find(b"\n", max(0, index.next_checkpoint - pos))
+                if nl < 0:
+                    break
+                offset = pos + nl + 1
+                index.lines.append(index.newlines + chunk.count(b"\n", 0, nl) + 2)
+                index.offsets.append(offset)
+                index.next_checkpoint = (offset // index.stride + 1) * index.stride
+            newlines = chunk.count(b"\n")
+            index.newlines += newlines
+            tally(bytes_read=len(chunk), lines=newlines)
+            index.last_byte_newline = chunk.endswith(b"\n")
+            pos += len(chunk)
+    index.indexed_bytes = pos
+    index.fingerprint = prefix_fingerprint(path, pos)
+
+
+def _sidecar_path(path: Path) -> Path:
+    return resolve_cache_dir("line-index") / f"{cache_key(path)}.idx"
+
+
+def _save(index: LineIndex) -> None:
+    header = {
+        "version": INDEX_VERSION,
+        "path": index.path,
+        "identity": [index.identity.dev, index.identity.ino, index.identity.size, index.identity.mtime_ns],
+        "stride": index.stride,
+        "indexed_bytes": index.indexed_bytes,
+        "newlines": index.newlines,
+        "last_byte_newline": index.last_byte_newline,
+        "next_checkpoint": index.next_checkpoint,
+        "fingerprint": index.fingerprint,
+        "checkpoints": len(index.offsets),
+    }
+    target = _sidecar_path(Path(index.path))
+    tmp = target.with_suffix(f".{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        f.write(index.lines.tobytes())
+        f.write(index.offsets.tobytes())
+    os.replace(tmp, target)
+
+
+def _load(path: Path) -> LineIndex | None:
+    sidecar = _sidecar_path(path)
+    try:
+        with sidecar.open("rb") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != INDEX_VERSION or header.get("path") != str(path):
+                return None
+            count = int(header["checkpoints"])
+            lines = array("q")
+            offsets = array("q")
+            lines.frombytes(f.read(count * lines.itemsize))
+            offsets.frombytes(f.read(count * offsets.itemsize))
+    except (OSError, ValueError, KeyError):
+        return None
+    if len(lines) != count or len(offsets) != count:
+        return None
+    return LineIndex(
+        path=str(path),
+        identity=FileIdentity(*header["identity"]),
+        stride=int(header["stride"]),
+        indexed_bytes=int(header["indexed_bytes"]),
+        newlines=int(header["newlines"]),
+        last_byte_newline=bool(header["last_byte_newline"]),
+        next_checkpoint=int(header["next_checkpoint"]),
+        fingerprint=str(header["fingerprint"]),
+        lines=lines,
+        offsets=offsets,
+    )
+
+
+def _is_append_of(index: LineIndex, path: Path, identity: FileIdentity) -> bool:
+    return (
+        index.identity.same_file(identity)
+        and identity.size >= index.indexed_bytes
+        and prefix_fingerprint(path, index.indexed_bytes) == index.fingerprint
+    )
+
+
+def cached_line_index(path: Path) -> LineIndex | None:
+    """Return an up-to-date index only if one exists already; never scans."""
+    identity = FileIdentity.of(path)
+    index = _MEMORY_CACHE.get(str(path)) or _load(path)
+    if index is None or index.identity != identity:
+        return None
+    _MEMORY_CACHE[str(path)] = index
+    return index
+
+
+def load_line_index(path: Path, *, stride: int = INDEX_STRIDE_BYTES) -> LineIndex:
+    """Load, extend, or build the line index for `path` and persist it.
+
+    Unchanged files reuse the cached index as-is. Files that were only appended
+    to (same device/inode, larger size, unchanged prefix fingerprint) are scanned
+    from the last indexed byte. Anything else (rotation, truncation, rewrite) is
+    rebuilt from scratch.
+    """
+    key = str(path)
+    # Concurrent calls after an append must not extend the same index twice.
+    with refresh_lock("line-index", path):
+        identity = FileIdentity.of(path)
+        index = _MEMORY_CACHE.get(key) or _load(path)
+        if index is not None and index.stride == stride and index.identity == identity:
+            _MEMORY_CACHE[key] = index
+            return index
+
+        if index is None or index.stride != stride or not _is_append_of(index, path, identity):
+            index = LineIndex(path=key, identity=identity, stride=stride, next_checkpoint=stride)
+        else:
+            # Extend a copy: other calls may still be reading the cached index.
+            index = replace(index, lines=array("q", index.lines), offsets=array("q", index.offsets))
+
+        _extend(index, path, identity.size)
+        index.identity = identity
+        _MEMORY_CACHE[key] = index
+        try:
+            _save(index)
+        except OSError:
+            pass
+        return index
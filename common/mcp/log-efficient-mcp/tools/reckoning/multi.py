@@ -0,0 +1,245 @@
+"""Multi-file `search`/`extract` over a glob or directory of (rotated) logs.
+
+Files are scanned concurrently: in the shared process pool when `workers`
+asks for more than one process, otherwise in a small thread pool, which
+still overlaps I/O and decompression. Each file is scanned with the full
+`max_matches` budget; the parent then applies the global budget either in
+file order (stopping outstanding scans once the ordered prefix is full) or
+after merging all hits by their leading timestamp. Files that cannot be
+read or decompressed are reported in `errors` and the others still count.
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from tools.reckoning.compression import detect_compression, iter_decompressed_chunks
+from tools.reckoning.parallel import resolve_workers, shared_pool
+from tools.reckoning.progress import checkpoint
+from tools.reckoning.response import LINE_MAX_CHARS, RESPONSE_MAX_CHARS, clip_line, omitted_marker
+from tools.reckoning.search import compile_query, scan_lines
+from tools.reckoning.source import regions_from_chunks
+from tools.reckoning.telemetry import CallCounters, call_counters, tally
+from tools.reckoning.timestamps import TimestampFormat, detect_format, resolve_format
+
+MULTI_MAX_FILES = 1000
+MULTI_FILE_THREADS = 4
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+_DIGITS = re.compile(r"(\d+)")
+
+
+def is_multi_path(path: str) -> bool:
+    """True when `path` is a directory, or a glob pattern that is not itself an existing file."""
+    expanded = Path(path).expanduser()
+    return expanded.is_dir() or (bool(_GLOB_CHARS.search(path)) and not expanded.is_file())
+
+
+def _natural_key(path: Path) -> list[object]:
+    # `app.log.2` sorts before `app.log.10`.
+    return [int(part) if part.isdigit() else part for part in _DIGITS.split(str(path))]
+
+
+def expand_paths(path: str) -> list[Path]:
+    """Regular files under a directory (recursively) or matching a glob (`**` allowed)."""
+    expanded = Path(path).expanduser()
+    if expanded.is_dir():
+        candidates = expanded.rglob("*")
+    else:
+        candidates = (Path(p) for p in glob.iglob(str(expanded), recursive=True))
+    files = sorted({p.resolve() for p in candidates if p.is_file()}, key=_natural_key)
+    if not files:
+        raise FileNotFoundError(f"No files match: {path}")
+    if len(files) > MULTI_MAX_FILES:
+        raise ValueError(f"{len(files)} files match {path}; narrow the pattern to at most {MULTI_MAX_FILES}.")
+    return files
+
+
+def _scan_file(
+    path_str: str,
+    query: str,
+    regex: bool,
+    ignore_case: bool,
+    before: int,
+    after: int,
+    max_matches: int,
+    encoding: str,
+    extract: bool,
+) -> tuple[list[dict[str, object]], CallCounters]:
+    """Scan one file in a pool thread or process; its work counters travel back with the rows."""
+    path = Path(path_str)
+    with call_counters() as counters:
+        compression = detect_compression(path)
+        regions = regions_from_chunks(iter_decompressed_chunks(path, compression)) if compression else None
+        rows = scan_lines(
+            path,
+            query=compile_query(query, regex=regex, ignore_case=ignore_case),
+            before=before,
+            after=after,
+            max_matches=max_matches,
+            encoding=encoding,
+            extract=extract,
+            regions=regions,
+        )
+    return rows, counters
+
+
+def _is_match(row: dict[str, object]) -> bool:
+    return row.get("kind", "match") == "match"
+
+
+def _limit_rows(rows: list[dict[str, object]], max_matches: int, after: int) -> tuple[list[dict[str, object]], int]:
+    """Cut `rows` after `max_matches` matches plus their after-context; return `(rows, matches kept)`."""
+    kept: list[dict[str, object]] = []
+    matches = 0
+    limit_line: int | None = None
+    for row in rows:
+        if limit_line is not None:
+            if int(row["line"]) > limit_line:
+                break
+            row["kind"] = "after"
+        kept.append(row)
+        if limit_line is None and _is_match(row):
+            matches += 1
+            if matches >= max_matches:
+                limit_line = int(row["line"]) + after
+    return kept, matches
+
+
+def _hits(rows: list[dict[str, object]]) -> list[list[dict[str, object]]]:
+    """Group rows into one list per match: leading before-context, the match, trailing after-context."""
+    hits: list[list[dict[str, object]]] = []
+    leading: list[dict[str, object]] = []
+    for row in rows:
+        if _is_match(row):
+            hits.append(leading + [row])
+            leading = []
+        elif row.get("kind") == "before" or not hits:
+            leading.append(row)
+        else:
+            hits[-1].append(row)
+    return hits
+
+
+def _label(row: dict[str, object], name: str, max_line_chars: int = LINE_MAX_CHARS) -> str:
+    sep = ":" if _is_match(row) else "-"
+    text = str(row.get("raw", "")).rstrip("\n")
+    return f"{name}{sep}{row['line']}{sep}{clip_line(text, max_line_chars)}\n"
+
+
+def multi_scan(
+    path: str,
+    *,
+    query: str,
+    regex: bool,
+    ignore_case: bool,
+    before: int = 0,
+    after: int = 0,
+    max_matches: int,
+    encoding: str,
+    extract: bool = False,
+    workers: int = 1,
+    order: str = "file",
+    time_format: str = "",
+    max_chars: int = RESPONSE_MAX_CHARS,
+    max_line_chars: int = LINE_MAX_CHARS,
+) -> dict[str, object]:
+    """Scan every file matched by `path`; return grep-style `file:line:text` content.
+
+    Matches are labelled `name:line:text` and context lines `name-line-text`,
+    with names relative to the deepest directory shared by all files.
+    `order="timestamp"` interleaves hits by the timestamp near the start of
+    each matching line, in `time_format` or the known format detected per file
+    from its matching lines; hits without one keep file order after those with
+    one. It raises ValueError when no matching line has a recognizable stamp.
+    Syslog stamps have no year, so they only order correctly among themselves.
+    Lines are clipped to `max_line_chars` and content stops at `max_chars`.
+    """
+    files = expand_paths(path)
+    fixed_format: TimestampFormat | None = None
+    if order == "timestamp" and time_format.strip() not in {"", "auto"}:
+        fixed_format = resolve_format(time_format, [])
+    # Compile once up front so invalid patterns fail here, not inside a worker.
+    compile_query(query, regex=regex, ignore_case=ignore_case)
+    base = Path(os.path.commonpath([str(f.parent) for f in files]))
+    names = [str(f.relative_to(base)) for f in files]
+
+    workers = resolve_workers(workers)
+    pool = shared_pool(workers) if workers > 1 else ThreadPoolExecutor(max_workers=min(MULTI_FILE_THREADS, len(files)))
+    futures: list[Future] = [
+        pool.submit(_scan_file, str(f), query, regex, ignore_case, before, after, max_matches, encoding, extract)
+        for f in files
+    ]
+
+    results: list[tuple[int, list[dict[str, object]]]] = []
+    errors: list[dict[str, str]] = []
+    match_count = 0
+    try:
+        for file_idx, future in enumerate(futures):
+            checkpoint(file_idx, len(futures))
+            try:
+                rows, counters = future.result()
+            # Corrupt or truncated compressed files raise ValueError too.
+            except (OSError, ValueError) as exc:
+                errors.append({"file": names[file_idx], "error": str(exc)})
+                continue
+            tally(bytes_read=counters.bytes_read, lines=counters.lines_scanned)
+            if order == "timestamp":
+                results.append((file_idx, rows))
+                continue
+            rows, matches = _limit_rows(rows, max_matches - match_count, after)
+            results.append((file_idx, rows))
+            match_count += matches
+            if match_count >= max_matches:
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+        if workers <= 1:
+            pool.shutdown(wait=False)
+
+    lines: list[str] = []
+    if order == "timestamp":
+        keyed = []
+        stamped = False
+        for file_idx, rows in results:
+            hits = [(next(row for row in hit if _is_match(row)), hit) for hit in _hits(rows)]
+            texts = [str(match.get("raw", "")) for match, _ in hits]
+            fmt = fixed_format or detect_format(texts)
+            for text, (match, hit) in zip(texts, hits):
+                stamp = fmt.line_time(text) if fmt is not None else None
+                stamped = stamped or stamp is not None
+                keyed.append(((stamp is None, stamp or datetime.min, file_idx, int(match["line"])), file_idx, hit))
+        if keyed and not stamped:
+            raise ValueError(
+                "`order=\"timestamp\"` found no known timestamp near the start of the matching lines; "
+                "pass `time_format` or use `order=\"file\"`."
+            )
+        keyed.sort(key=lambda item: item[0])
+        for _, file_idx, hit in keyed[:max_matches]:
+            lines.extend(_label(row, names[file_idx], max_line_chars) for row in hit)
+        match_count = min(len(keyed), max_matches)
+    else:
+        for file_idx, rows in results:
+            lines.extend(_label(row, names[file_idx], max_line_chars) for row in rows)
+
+    size = 0
+    for kept, line in enumerate(lines):
+        size += len(line)
+        if kept and size > max_chars:
+            lines[kept:] = [omitted_marker(len(lines) - kept)]
+            break
+
+    tally(matches=match_count)
+    return {
+        "action": "extract" if extract else "search",
+        "files": len(files),
+        "matches": match_count,
+        "content": "".join(lines),
+        "errors": errors,
+    }
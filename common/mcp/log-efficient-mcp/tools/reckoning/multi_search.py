@@ -0,0 +1,170 @@
+"""`multi_search`: many queries answered in one pass over a file.
+
+Each region is read once and every query is located in it while it is
+hot: plain literals with `bytes.find` (case-insensitive ones against a
+single lowercased copy of the region), regexes through their planned
+required-literal prefilter as in `search`. On ASCII logs a handful of
+C-level `find` passes per region is faster than one combined alternation
+regex, let alone an Aho-Corasick automaton stepping through every byte in
+Python, and finding each literal separately also counts overlapping
+queries (`timeout` and `out`) on the same line.
+
+Per query the result keeps the number of matching lines, the first and
+last hit, and up to `max_examples` example lines; memory does not grow
+with the number of matches.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from tools.reckoning.response import LINE_MAX_CHARS, RESPONSE_MAX_CHARS, clip_raw, omitted_marker, render_rows
+from tools.reckoning.search import LineQuery, compile_query, iter_hit_spans
+from tools.reckoning.source import iter_regions
+from tools.reckoning.telemetry import tally
+
+MULTI_SEARCH_MAX_QUERIES = 64
+# Queries starting with this prefix are regexes; all others are literals.
+REGEX_PREFIX = "re:"
+
+
+def parse_queries(queries: list[str], *, regex: bool = False) -> list[tuple[str, bool]]:
+    """Return distinct `(query, is_regex)` pairs; `re:`-prefixed queries (or all, with `regex`) are regexes."""
+    parsed: list[tuple[str, bool]] = []
+    for query in queries:
+        is_regex = regex or query.startswith(REGEX_PREFIX)
+        if query.startswith(REGEX_PREFIX):
+            query = query[len(REGEX_PREFIX) :]
+        if not query:
+            raise ValueError("`queries` must not contain empty queries.")
+        if is_regex:
+            try:
+                re.compile(query)
+            except re.error as exc:
+                raise ValueError(f"Invalid regex in `queries`: {query!r}: {exc}") from exc
+        if (query, is_regex) not in parsed:
+            parsed.append((query, is_regex))
+    if not parsed:
+        raise ValueError("`queries` is required for the multi_search action.")
+    if len(parsed) > MULTI_SEARCH_MAX_QUERIES:
+        raise ValueError(f"`queries` accepts at most {MULTI_SEARCH_MAX_QUERIES} queries.")
+    return parsed
+
+
+@dataclass
+class QueryHits:
+    """Bounded per-query summary of the lines matching one query."""
+
+    query: str
+    regex: bool
+    matches: int = 0
+    last: tuple[int, str] | None = None
+    examples: list[tuple[int, str]] = field(default_factory=list)
+
+
+class _Matcher:
+    """One query and how to find the lines it hits in a prepared region."""
+
+    def __init__(self, query: LineQuery, hits: QueryHits, *, ignore_case: bool):
+        self.query = query
+        self.hits = hits
+        # Case-insensitive literals are found in a lowercased copy of ASCII regions.
+        folds = ignore_case and not hits.regex and hits.query.isascii()
+        self.folded_literal = hits.query.lower().encode("ascii") if folds else None
+
+    def spans(self, buf, nl, lowered: bytes | None):
+        if self.folded_literal is not None and lowered is not None:
+            needle, n, pos = self.folded_literal, len(buf), 0
+            while True:
+                idx = lowered.find(needle, pos)
+                if idx < 0:
+                    return
+                ls = buf.rfind(nl, 0, idx) + 1
+                le = buf.find(nl, idx)
+                le = n if le < 0 else le
+                yield ls, le
+                pos = le + 1
+        else:
+            yield from iter_hit_spans(buf, nl, self.query)
+
+
+def _decode(buf, ls: int, le: int, encoding: str) -> str:
+    text = buf[ls:le]
+    return text.decode(encoding, errors="replace") if isinstance(text, bytes) else text
+
+
+def multi_search(
+    path: Path,
+    *,
+    queries: list[tuple[str, bool]],
+    ignore_case: bool = False,
+    max_examples: int = 10,
+    encoding: str = "utf-8",
+    regions=None,
+    max_chars: int = RESPONSE_MAX_CHARS,
+    max_line_chars: int = LINE_MAX_CHARS,
+) -> dict[str, object]:
+    """Count the lines matching each of `queries` in one pass, keeping the last hit and the first `max_examples`.
+
+    `regions` overrides the memory-mapped regions of `path`, e.g. with a
+    decompressed stream.
+    """
+    hits = [QueryHits(query, is_regex) for query, is_regex in queries]
+    matchers = [
+        _Matcher(compile_query(query, regex=is_regex, ignore_case=ignore_case), entry, ignore_case=ignore_case)
+        for (query, is_regex), entry in zip(queries, hits)
+    ]
+    as_bytes = all(matcher.query.bytes_supported for matcher in matchers)
+    fold = any(matcher.folded_literal is not None for matcher in matchers)
+    line = 1
+    unterminated = False
+    for _, region in regions if regions is not None else iter_regions(path):
+        if b"\r" in region:
+            region = region.replace(b"\r\n", b"\n")
+        if as_bytes and region.isascii():
+            buf, nl = region, b"\n"
+        else:
+            buf, nl = region.decode(encoding, errors="replace"), "\n"
+        lowered = buf.lower() if fold and isinstance(buf, bytes) else None
+        for matcher in matchers:
+            entry = matcher.hits
+            counted, counted_line = 0, line
+            last_span = None
+            for ls, le in matcher.spans(buf, nl, lowered):
+                if entry.regex and matcher.query.match_line(_decode(buf, ls, le, encoding)) is None:
+                    continue
+                entry.matches += 1
+                last_span = ls, le
+                if len(entry.examples) < max_examples:
+                    counted_line += buf.count(nl, counted, ls)
+                    counted = ls
+                    entry.examples.append((counted_line, _decode(buf, ls, le, encoding)))
+            if last_span is not None:
+                ls, le = last_span
+                entry.last = counted_line + buf.count(nl, counted, ls), _decode(buf, ls, le, encoding)
+        newlines = buf.count(nl)
+        tally(lines=newlines)
+        line += newlines
+        unterminated = bool(buf) and not buf.endswith(nl)
+
+    budget = max(1, max_chars // len(hits))
+    results: list[dict[str, object]] = []
+    for entry in hits:
+        rows = [{"line": number, "raw": f"{number}:{text}\n"} for number, text in entry.examples]
+        content, used = render_rows(rows, max_chars=budget, max_line_chars=max_line_chars, collapse="none")
+        if used < len(rows):
+            content += omitted_marker(len(rows) - used)
+        results.append(
+            {
+                "query": entry.query,
+                "regex": entry.regex,
+                "matches": entry.matches,
+                "first_line": entry.examples[0][0] if entry.examples else None,
+                "last_line": entry.last[0] if entry.last else None,
+                "last": clip_raw(entry.last[1], max_line_chars) if entry.last else None,
+                "examples": content,
+            }
+        )
+    return {"lines": line - 1 + unterminated, "queries": results}
@@ -0,0 +1,389 @@
+"""Persistent trigram block index that lets repeated searches skip whole blocks.
+
+The file is cut into newline-aligned blocks of roughly `NGRAM_BLOCK_BYTES`.
+For each block, the lower-cased ASCII letter runs (`[a-z_]{3,}`) are split
+into trigrams, and each trigram maps to a bitmap of the blocks containing it.
+A query's required literals are tokenized the same way; only blocks whose
+bitmaps contain every query trigram (plus any bytes appended since the last
+build) are scanned. Digits and punctuation are not indexed, so queries made
+only of those scan the whole file as before.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import re
+import time
+from array import array
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+from tools.reckoning.parallel import merge_chunk_rows, resolve_workers, scan_chunk, shared_pool
+from tools.reckoning.progress import checkpoint
+from tools.reckoning.search import compile_query
+from tools.reckoning.source import (
+    FileIdentity,
+    cache_key,
+    prefix_fingerprint,
+    refresh_lock,
+    resolve_cache_dir,
+)
+from tools.reckoning.telemetry import tally
+
+NGRAM_INDEX_VERSION = 1
+NGRAM_BLOCK_BYTES = 4 << 20
+NGRAM_CACHE_MAX_BYTES = 1 << 30
+NGRAM_PARALLEL_MIN_BYTES = 64 << 20
+
+_TOKEN = re.compile(rb"[a-z_]{3,}")
+# Case-insensitive matches of these letters include non-ASCII forms (DOTLESS I, KELVIN SIGN, LONG S).
+_FOLD_AMBIGUOUS = re.compile(r"[iIkKsS]")
+_MEMORY_CACHE: dict[str, "NgramIndex"] = {}
+
+
+def trigrams(data: bytes) -> set[bytes]:
+    """Distinct indexed trigrams of `data` (ASCII letters and `_`, case-folded)."""
+    grams: set[bytes] = set()
+    for token in set(_TOKEN.findall(data.lower())):
+        grams.update(token[i : i + 3] for i in range(len(token) - 2))
+    return grams
+
+
+@dataclass
+class NgramIndex:
+    path: str
+    identity: FileIdentity
+    block_bytes: int
+    indexed_bytes: int = 0
+    newlines: int = 0
+    fingerprint: str = ""
+    build_seconds: float = 0.0
+    block_offsets: array = field(default_factory=lambda: array("q"))
+    block_lines: array = field(default_factory=lambda: array("q"))
+    postings: dict[bytes, int] = field(default_factory=dict)
+
+    @property
+    def blocks(self) -> int:
+        return len(self.block_offsets)
+
+    def candidate_blocks(self, literals: tuple[str, ...], *, folded: bool = False) -> int | None:
+        """Bitmap of blocks that may contain every literal, or `None` if no trigram applies."""
+        grams: set[bytes] = set()
+        for literal in literals:
+            if folded:
+                literal = _FOLD_AMBIGUOUS.sub(" ", literal)
+            grams |= trigrams(literal.encode("utf-8", errors="replace"))
+        if not grams:
+            return None
+        bits = (1 << self.blocks) - 1
+        for gram in grams:
+            bits &= self.postings.get(gram, 0)
+            if not bits:
+                break
+        return bits
+
+    def report(self) -> dict[str, object]:
+        sidecar = _sidecar_path(Path(self.path))
+        return {
+            "blocks": self.blocks,
+            "block_bytes": self.block_bytes,
+            "indexed_bytes": self.indexed_bytes,
+            "trigrams": len(self.postings),
+            "index_bytes": sidecar.stat().st_size if sidecar.exists() else 0,
+            "build_seconds": round(self.build_seconds, 3),
+        }
+
+
+def _block_bounds(path: Path, start: int, end: int, block_bytes: int) -> list[tuple[int, int]]:
+    """Newline-aligned blocks covering `path[start:end]` up to its last newline."""
+    bounds: list[tuple[int, int]] = []
+    if end <= start:
+        return bounds
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        while start < end:
+            nl = mm.find(b"\n", min(start + block_bytes, end) - 1, end)
+            if nl < 0:
+                nl = mm.rfind(b"\n", start, end)
+                if nl < 0:
+                    break
+            bounds.append((start, nl + 1))
+            start = nl + 1
+    return bounds
+
+
+def _block_trigrams(path_str: str, start: int, end: int) -> tuple[list[bytes], int]:
+    with open(path_str, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return list(trigrams(data)), data.count(b"\n")
+
+
+def _extend(index: NgramIndex, path: Path, size: int, workers: int) -> None:
+    started = time.perf_counter()
+    # A short last block is re-indexed together with the appended bytes.
+    if index.blocks and index.indexed_bytes - index.block_offsets[-1] < index.block_bytes:
+        last = index.blocks - 1
+        mask = ~(1 << last)
+        index.postings = {gram: bits & mask for gram, bits in index.postings.items() if bits & mask}
+        index.indexed_bytes = index.block_offsets.pop()
+        index.newlines = index.block_lines.pop() - 1
+
+    bounds = _block_bounds(path, index.indexed_bytes, size, index.block_bytes)
+    workers = resolve_workers(workers)
+    if workers > 1 and size - index.indexed_bytes >= NGRAM_PARALLEL_MIN_BYTES:
+        pool = shared_pool(workers)
+        results = pool.map(_block_trigrams, [str(path)] * len(bounds), *zip(*bounds)) if bounds else []
+    else:
+        results = (_block_trigrams(str(path), start, end) for start, end in bounds)
+
+    for (start, end), (grams, newlines) in zip(bounds, results):
+        checkpoint(start, size)
+        bit = 1 << index.blocks
+        index.block_offsets.append(start)
+        index.block_lines.append(index.newlines + 1)
+        for gram in grams:
+            index.postings[gram] = index.postings.get(gram, 0) | bit
+        index.newlines += newlines
+        index.indexed_bytes = end
+        tally(bytes_read=end - start, lines=newlines)
+    index.fingerprint = prefix_fingerprint(path, index.indexed_bytes)
+    index.build_seconds += time.perf_counter() - started
+
+
+def _sidecar_path(path: Path) -> Path:
+    return resolve_cache_dir("ngram-index") / f"{cache_key(path)}.tri"
+
+
+def _prune_disk(cache_dir: Path, keep: Path) -> None:
+    """Drop indexes of vanished files, then least recently used ones beyond the size cap."""
+    entries: list[tuple[float, int, Path]] = []
+    for sidecar in cache_dir.glob("*.tri"):
+        try:
+            with sidecar.open("rb") as f:
+                target = json.loads(f.readline()).get("path", "")
+            st = sidecar.stat()
+        except (OSError, ValueError):
+            target, st = "", None
+        if st is None or not target or not Path(target).exists():
+            sidecar.unlink(missing_ok=True)
+            continue
+        entries.append((st.st_mtime, st.st_size, sidecar))
+    total = sum(size for _, size, _ in entries)
+    for _, size, sidecar in sorted(entries):
+        if total <= NGRAM_CACHE_MAX_BYTES:
+            break
+        if sidecar != keep:
+            sidecar.unlink(missing_ok=True)
+            total -= size
+
+
+def _save(index: NgramIndex) -> None:
+    width = (index.blocks + 7) // 8
+    header = {
+        "version": NGRAM_INDEX_VERSION,
+        "path": index.path,
+        "identity": [index.identity.dev, index.identity.ino, index.identity.size, index.identity.mtime_ns],
+        "block_bytes": index.block_bytes,
+        "indexed_bytes": index.indexed_bytes,
+        "newlines": index.newlines,
+        "fingerprint": index.fingerprint,
+        "build_seconds": index.build_seconds,
+        "blocks": index.blocks,
+        "trigrams": len(index.postings),
+    }
+    target = _sidecar_path(Path(index.path))
+    tmp = target.with_suffix(f".{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        f.write(index.block_offsets.tobytes())
+        f.write(index.block_lines.tobytes())
+        for gram in sorted(index.postings):
+            f.write(gram + index.postings[gram].to_bytes(width, "little"))
+    os.replace(tmp, target)
+    _prune_disk(target.parent, target)
+
+
+def _load(path: Path) -> NgramIndex | None:
+    sidecar = _sidecar_path(path)
+    try:
+        with sidecar.open("rb") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != NGRAM_INDEX_VERSION or header.get("path") != str(path):
+                return None
+            blocks = int(header["blocks"])
+            block_offsets = array("q")
+            block_lines = array("q")
+            block_offsets.frombytes(f.read(blocks * block_offsets.itemsize))
+            block_lines.frombytes(f.read(blocks * block_lines.itemsize))
+            width = (blocks + 7) // 8
+            body = f.read()
+        os.utime(sidecar)
+    except (OSError, ValueError, KeyError):
+        return None
+    count = int(header["trigrams"])
+    step = 3 + width
+    if len(block_offsets) != blocks or len(block_lines) != blocks or len(body) != count * step:
+        return None
+    postings = {
+        body[pos : pos + 3]: int.from_bytes(body[pos + 3 : pos + step], "little") for pos in range(0, len(body), step)
+    }
+    return NgramIndex(
+        path=str(path),
+        identity=FileIdentity(*header["identity"]),
+        block_bytes=int(header["block_bytes"]),
+        indexed_bytes=int(header["indexed_bytes"]),
+        newlines=int(header["newlines"]),
+        fingerprint=str(header["fingerprint"]),
+        build_seconds=float(header["build_seconds"]),
+        block_offsets=block_offsets,
+        block_lines=block_lines,
+        postings=postings,
+    )
+
+
+def _forget(path: Path) -> None:
+    _MEMORY_CACHE.pop(str(path), None)
+    try:
+        _sidecar_path(path).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _refresh(index: NgramIndex, path: Path, identity: FileIdentity, workers: int) -> NgramIndex | None:
+    """Bring `index` up to date with `path`, or return `None` if it no longer applies."""
+    if index.identity == identity:
+        return index
+    if not (
+        index.identity.same_file(identity)
+        and identity.size >= index.indexed_bytes
+        and prefix_fingerprint(path, index.indexed_bytes) == index.fingerprint
+    ):
+        return None
+    # Extend a copy: other calls may still be searching with the cached index.
+    index = replace(
+        index,
+        block_offsets=array("q", index.block_offsets),
+        block_lines=array("q", index.block_lines),
+        postings=dict(index.postings),
+    )
+    _extend(index, path, identity.size, workers)
+    index.identity = identity
+    try:
+        _save(index)
+    except OSError:
+        pass
+    return index
+
+
+def cached_ngram_index(path: Path, *, workers: int = 1) -> NgramIndex | None:
+    """Return the index for `path` if one was built, extending it over appended bytes.
+
+    Indexes of rotated, truncated, or rewritten files are deleted.
+    """
+    with refresh_lock("ngram-index", path):
+        return _cached(path, workers)
+
+
+def _cached(path: Path, workers: int) -> NgramIndex | None:
+    key = str(path)
+    index = _MEMORY_CACHE.get(key) or _load(path)
+    if index is None:
+        return None
+    index = _refresh(index, path, FileIdentity.of(path), workers)
+    if index is None:
+        _forget(path)
+        return None
+    _MEMORY_CACHE[key] = index
+    return index
+
+
+def build_ngram_index(path: Path, *, workers: int = 1, block_bytes: int | None = None) -> NgramIndex:
+    """Load, extend, or build the trigram index for `path` and persist it."""
+    block_bytes = block_bytes or NGRAM_BLOCK_BYTES
+    # Concurrent calls after an append must not extend the same index twice.
+    with refresh_lock("ngram-index", path):
+        index = _cached(path, workers)
+        if index is not None and index.block_bytes == block_bytes:
+            return index
+        index = NgramIndex(path=str(path), identity=FileIdentity.of(path), block_bytes=block_bytes)
+        _extend(index, path, index.identity.size, workers)
+        _MEMORY_CACHE[str(path)] = index
+        try:
+            _save(index)
+        except OSError:
+            pass
+        return index
+
+
+def indexed_scan_lines(
+    path: Path,
+    index: NgramIndex,
+    *,
+    query: str,
+    regex: bool,
+    ignore_case: bool,
+    before: int = 0,
+    after: int = 0,
+    max_matches: int,
+    encoding: str,
+    extract: bool = False,
+    start: int = 0,
+    first_line: int = 1,
+) -> list[dict[str, object]] | None:
+    """`scan_lines` over candidate blocks only; `None` when the query cannot use the index.
+
+    `start`/`first_line` resume at a line boundary; earlier blocks are skipped.
+    """
+    line_query = compile_query(query, regex=regex, ignore_case=ignore_case)
+    bits = index.candidate_blocks(line_query.literals, folded=line_query.folded)
+    if bits is None:
+        return None
+
+    # Contiguous candidate blocks form one run; bytes past the index always qualify.
+    runs: list[tuple[int, int, int]] = []
+    for block in range(index.blocks):
+        if not bits >> block & 1:
+            continue
+        block_start = index.block_offsets[block]
+        block_end = index.block_offsets[block + 1] if block + 1 < index.blocks else index.indexed_bytes
+        if runs and runs[-1][1] == block_start:
+            runs[-1] = (runs[-1][0], block_end, runs[-1][2])
+        else:
+            runs.append((block_start, block_end, index.block_lines[block]))
+    size = path.stat().st_size
+    if size > index.indexed_bytes:
+        if runs and runs[-1][1] == index.indexed_bytes:
+            runs[-1] = (runs[-1][0], size, runs[-1][2])
+        else:
+            runs.append((index.indexed_bytes, size, index.newlines + 1))
+    if start:
+        runs = [run for run in runs if run[1] > start]
+        if runs and runs[0][0] <= start:
+            runs[0] = (start, runs[0][1], first_line)
+
+    def scanned():
+        remaining = max_matches
+        for run_start, run_end, run_line in runs:
+            rows, _, match_count = scan_chunk(
+                str(path),
+                run_start,
+                run_end,
+                query,
+                regex,
+                ignore_case,
+                before,
+                after,
+                remaining,
+                encoding,
+                extract,
+                start,
+            )
+            yield run_line - 1, rows, match_count
+            remaining -= match_count
+            if remaining <= 0:
+                return
+
+    return merge_chunk_rows(scanned(), max_matches=max_matches, after=after)
+
@@ -0,0 +1,101 @@
+"""Continuation cursors for bounded actions (`search`, `extract`, `range`, `json`, `time_range`).
+
+A page cursor records where the next page starts (byte offset and line
+number), the identity of the file, and a fingerprint of the arguments that
+shaped the page, so a follow-up call resumes the same scan without
+rescanning or re-sending earlier lines. Text pages end with a
+`cursor_marker` line holding it. Offsets are text-mode `tell()`
+cookies for non-ASCII-compatible encodings and unused for compressed
+files, which resume by line number via the gzip checkpoints.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+from tools.reckoning.follow import decode_cursor, encode_cursor
+from tools.reckoning.source import FileIdentity, iter_regions
+
+
+def query_fingerprint(action: str, params: dict[str, object]) -> str:
+    raw = json.dumps([action, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def page_cursor(
+    path: Path, *, action: str, params: dict[str, object], offset: int, line: int, sent: int = 0
+) -> str:
+    """Cursor resuming at `line` (byte `offset`); rows up to line `sent` were already returned.
+
+    `sent` lets a search resume right after its last match, so a match that
+    was only shown as after-context is scanned again and keeps its own context.
+    """
+    identity = FileIdentity.of(path)
+    return encode_cursor(
+        {
+            "kind": "page",
+            "act": action,
+            "q": query_fingerprint(action, params),
+            "off": offset,
+            "line": line,
+            "sent": sent,
+            "dev": identity.dev,
+            "ino": identity.ino,
+            "size": identity.size,
+        }
+    )
+
+
+def cursor_marker(cursor: str) -> str:
+    """Last line of a text page cut short, carrying the cursor for the next page."""
+    return f"[more results: repeat the call with cursor={cursor}]\n"
+
+
+def parse_page_cursor(
+    cursor: str, path: Path, *, action: str, params: dict[str, object]
+) -> tuple[int, int, int]:
+    """Validate `cursor` against `path` and the call's arguments; return `(offset, line, sent)`."""
+    state = decode_cursor(cursor)
+    if state.get("kind") != "page":
+        raise ValueError("`cursor` was not produced by a paged action (search/extract/range/json/time_range).")
+    if state.get("act") != action or state.get("q") != query_fingerprint(action, params):
+        raise ValueError(f"`cursor` was issued for a different query; repeat the original `{state.get('act')}` call.")
+    try:
+        offset, line, sent, dev, ino, size = (int(state[key]) for key in ("off", "line", "sent", "dev", "ino", "size"))
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError("`cursor` is not a valid log_explore cursor.") from exc
+    identity = FileIdentity.of(path)
+    if (dev, ino) != (identity.dev, identity.ino):
+        raise ValueError("The file was rotated or replaced since `cursor` was issued; start a new scan.")
+    if identity.size < size:
+        raise ValueError("The file was truncated since `cursor` was issued; start a new scan.")
+    return offset, line, sent
+
+
+def advance_lines(path: Path, offset: int, count: int, *, encoding: str | None = None) -> int:
+    """Return the position `count` lines past `offset`.
+
+    Byte offsets are advanced with `bytes.count`/`find` over memory-mapped
+    regions; with a text `encoding`, `offset` is a `tell()` cookie.
+    """
+    if count <= 0:
+        return offset
+    if encoding is not None:
+        with path.open("r", encoding=encoding, errors="replace") as f:
+            f.seek(offset)
+            for _ in range(count):
+                if not f.readline():
+                    break
+            return f.tell()
+    for region_offset, region in iter_regions(path, start=offset):
+        newlines = region.count(b"\n")
+        if newlines < count:
+            count -= newlines
+            continue
+        pos = -1
+        for _ in range(count):
+            pos = region.find(b"\n", pos + 1)
+        return region_offset + pos + 1
+    return path.stat().st_size
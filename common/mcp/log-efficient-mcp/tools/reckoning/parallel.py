@@ -0,0 +1,274 @@
+"""Multi-process scan mode: newline-aligned chunks scanned in a process pool.
+
+Chunk results carry chunk-relative line numbers and the chunk's line count,
+so the parent can merge them in order into global line numbers. Futures are
+consumed in chunk order, which lets `max_matches` stop the scan as soon as
+the ordered prefix of chunks has produced enough matches.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+from tools.reckoning.progress import checkpoint
+from tools.reckoning.search import LineScan, compile_query
+from tools.reckoning.source import iter_regions
+from tools.reckoning.stats import ScanStats, region_stats
+from tools.reckoning.telemetry import tally
+
+PARALLEL_MIN_FILE_BYTES = 64 << 20
+PARALLEL_MIN_CHUNK_BYTES = 16 << 20
+CHUNKS_PER_WORKER = 4
+
+_KIND_RANK = {"match": 3, "after": 2, "before": 1}
+_POOLS: dict[int, ProcessPoolExecutor] = {}
+
+
+def resolve_workers(workers: int) -> int:
+    """`0` means one worker per CPU; negative values are treated as `1`."""
+    if workers == 0:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+def use_parallel(path: Path, workers: int, *, scan_bytes: int | None = None) -> bool:
+    if scan_bytes is None:
+        scan_bytes = path.stat().st_size
+    return resolve_workers(workers) > 1 and scan_bytes >= PARALLEL_MIN_FILE_BYTES
+
+
+def split_chunks(path: Path, workers: int, *, start: int = 0, end: int | None = None) -> list[tuple[int, int]]:
+    """Split `path[start:end]` into newline-aligned `(start, end)` byte ranges."""
+    size = path.stat().st_size if end is None else end
+    if size <= start:
+        return []
+    target = max(PARALLEL_MIN_CHUNK_BYTES, -(-(size - start) // (workers * CHUNKS_PER_WORKER)))
+    chunks: list[tuple[int, int]] = []
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        while start < size:
+            end = min(start + target, size)
+            if end < size:
+                nl = mm.find(b"\n", end - 1, size)
+                end = size if nl < 0 else nl + 1
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def shared_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool reused across calls, one per worker count."""
+    pool = _POOLS.get(workers)
+    if pool is None:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        _POOLS[workers] = pool
+    return pool
+
+
+def _lines_before(path: Path, start: int, count: int, encoding: str, floor: int = 0) -> list[tuple[str, int]]:
+    """Decode up to `count` whole lines that end right before byte `start`, none before `floor`, with their ends."""
+    lines: list[tuple[str, int]] = []
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = start
+        while len(lines) < count and end > floor:
+            line_start = mm.rfind(b"\n", floor, end - 1) + 1 or floor
+            raw = mm[line_start:end]
+            if raw.endswith(b"\r\n"):
+                raw = raw[:-2] + b"\n"
+            lines.append((raw.decode(encoding, errors="replace"), end))
+            end = line_start
+    lines.reverse()
+    return lines
+
+
+def scan_chunk(
+    path_str: str,
+    start: int,
+    end: int,
+    query: str,
+    regex: bool,
+    ignore_case: bool,
+    before: int,
+    after: int,
+    max_matches: int,
+    encoding: str,
+    extract: bool,
+    floor: int = 0,
+) -> tuple[list[dict[str, object]], int | None, int]:
+    """Scan one chunk; return `(rows, chunk line count, match count)`.
+
+    The line count is `None` when the chunk hit `max_matches` on its own, in
+    which case no later chunk can contribute and the count is not needed.
+    Before-context is read back across the chunk start, but not past `floor`.
+    """
+    path = Path(path_str)
+    scan = LineScan(
+        compile_query(query, regex=regex, ignore_case=ignore_case),
+        before=before,
+        after=after,
+        max_matches=max_matches,
+        encoding=encoding,
+        extract=extract,
+    )
+    if before and start > floor:
+        preceding = _lines_before(path, start, before, encoding, floor)
+        scan.carry.extend(
+            (line - len(preceding), raw, end) for line, (raw, end) in enumerate(preceding, start=1)
+        )
+        scan.last_emitted = -len(preceding)
+
+    line = 1
+    for offset, region in iter_regions(path, start=start, end=end):
+        line = scan.scan_region(region, line, offset)
+        if scan.done:
+            break
+    capped = scan.match_count >= max_matches
+    chunk_lines = None if capped else line - 1
+
+    # Finish the after-context of the chunk's last match past its end;
+    # matches there belong to the next chunk.
+    scan.max_matches = scan.match_count
+    if scan.pending_after:
+        for offset, region in iter_regions(path, start=end):
+            line = scan.scan_region(region, line, offset)
+            if scan.done:
+                break
+    return scan.rows, chunk_lines, scan.match_count
+
+
+def _row_rank(row: dict[str, object]) -> int:
+    return _KIND_RANK.get(str(row.get("kind", "match")), 3)
+
+
+def parallel_scan_lines(
+    path: Path,
+    *,
+    query: str,
+    regex: bool,
+    ignore_case: bool,
+    before: int = 0,
+    after: int = 0,
+    max_matches: int,
+    encoding: str,
+    extract: bool = False,
+    workers: int,
+    start: int = 0,
+    first_line: int = 1,
+) -> list[dict[str, object]]:
+    """Parallel equivalent of `scan_lines` with identical rows and ordering.
+
+    `start`/`first_line` resume the scan at a line boundary, as `scan_lines`
+    does with resumed regions.
+    """
+    # Compile once up front so invalid patterns fail here, not inside a worker.
+    compile_query(query, regex=regex, ignore_case=ignore_case)
+    workers = resolve_workers(workers)
+    pool = shared_pool(workers)
+    chunks = split_chunks(path, workers, start=start)
+    futures: list[Future] = [
+        pool.submit(
+            scan_chunk,
+            str(path),
+            chunk_start,
+            chunk_end,
+            query,
+            regex,
+            ignore_case,
+            before,
+            after,
+            max_matches,
+            encoding,
+            extract,
+            start,
+        )
+        for chunk_start, chunk_end in chunks
+    ]
+
+    def ordered_chunks():
+        line_offset = first_line - 1
+        for done, future in enumerate(futures):
+            checkpoint(done, len(futures))
+            rows, chunk_lines, match_count = future.result()
+            tally(bytes_read=chunks[done][1] - chunks[done][0], lines=chunk_lines or 0)
+            yield line_offset, rows, match_count
+            if chunk_lines is None:
+                return
+            line_offset += chunk_lines
+
+    try:
+        return merge_chunk_rows(ordered_chunks(), max_matches=max_matches, after=after)
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def merge_chunk_rows(chunks, *, max_matches: int, after: int) -> list[dict[str, object]]:
+    """Merge ordered `(line offset, rows, match count)` chunk results into `scan_lines` rows.
+
+    Rows for the same line keep the strongest kind (match > after > before);
+    chunks stop being consumed once `max_matches` matches have been seen.
+    """
+    merged: dict[int, dict[str, object]] = {}
+    total_matches = 0
+    for line_offset, chunk_rows, match_count in chunks:
+        for row in chunk_rows:
+            row["line"] = int(row["line"]) + line_offset
+            existing = merged.get(row["line"])
+            if existing is None or _row_rank(row) > _row_rank(existing):
+                merged[row["line"]] = row
+        total_matches += match_count
+        if total_matches >= max_matches:
+            break
+
+    rows: list[dict[str, object]] = []
+    match_count = 0
+    limit_line: int | None = None
+    for line in sorted(merged):
+        row = merged[line]
+        if limit_line is not None:
+            if line > limit_line:
+                break
+            row["kind"] = "after"
+        rows.append(row)
+        if limit_line is None and _row_rank(row) == 3:
+            match_count += 1
+            if match_count >= max_matches:
+                limit_line = line + after
+    return rows
+
+
+def _stats_chunk(path_str: str, start: int, end: int, encoding: str) -> ScanStats:
+    stats = ScanStats()
+    for _, region in iter_regions(Path(path_str), start=start, end=end):
+        stats = stats.merge(region_stats(region, encoding=encoding))
+    return stats
+
+
+def parallel_stats(
+    path: Path,
+    *,
+    encoding: str,
+    workers: int,
+    start: int = 0,
+    end: int | None = None,
+) -> ScanStats:
+    """Compute `ScanStats` for `path[start:end]` with one task per chunk."""
+    workers = resolve_workers(workers)
+    pool = shared_pool(workers)
+    chunks = split_chunks(path, workers, start=start, end=end)
+    futures = [
+        pool.submit(_stats_chunk, str(path), chunk_start, chunk_end, encoding) for chunk_start, chunk_end in chunks
+    ]
+    stats = ScanStats()
+    try:
+        for done, future in enumerate(futures):
+            checkpoint(done, len(futures))
+            chunk_stats = future.result()
+            tally(bytes_read=chunks[done][1] - chunks[done][0], lines=chunk_stats.lines)
+            stats = stats.merge(chunk_stats)
+    finally:
+        for future in futures:
+            future.cancel()
+    return stats
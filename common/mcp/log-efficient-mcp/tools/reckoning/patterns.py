@@ -0,0 +1,269 @@
+"""Online Drain-style log template mining for the `patterns` action.
+
+Variable fields (UUIDs, IPs, hex ids, paths, numbers) are masked over whole
+regions with a few C-level substitutions before lines are tokenized on
+whitespace. Lines are then clustered Drain-style: candidate templates are
+bucketed by token count and log level (or first token), a line joins the most similar
+template when at least `PATTERNS_SIMILARITY` of its tokens agree, and
+positions that disagree become `<*>`. Identical masked lines skip the
+similarity search via a bounded lookup table. Cluster count is capped; when
+it overflows, the smallest clusters are dropped and their lines reported as
+`evicted_lines`.
+"""
+
+from __future__ import annotations
+
+import re
+from concurrent.futures import Future
+from pathlib import Path
+
+from tools.reckoning.parallel import resolve_workers, shared_pool, split_chunks
+from tools.reckoning.progress import checkpoint
+from tools.reckoning.source import iter_regions
+from tools.reckoning.telemetry import tally
+
+PATTERNS_SIMILARITY = 0.5
+PATTERNS_MAX_CLUSTERS = 2_000
+PATTERNS_LOOKUP_ENTRIES = 100_000
+PATTERNS_EXAMPLE_CHARS = 300
+TEXT_REGION_HINT = 8 << 20
+WILDCARD = "<*>"
+
+# (gate, pattern, placeholder): a region is only substituted when the cheap
+# gate finds something, which skips most of the cost for absent field kinds.
+# Lookbehinds sit after the first character so the engine can still skip
+# ahead to candidate start characters.
+_MASKS = [
+    (
+        None,
+        re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2}\b)?"),
+        "<TS>",
+    ),
+    (
+        re.compile(r"-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-"),
+        re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"),
+        "<UUID>",
+    ),
+    (
+        re.compile(r"\.\d{1,3}\.\d{1,3}\."),
+        re.compile(r"\d(?<![\d.]\d)\d{0,2}\.\d{1,3}\.\d{1,3}\.\d{1,3}(?::\d+)?(?![\d.])"),
+        "<IP>",
+    ),
+    (
+        re.compile(r"0x|[0-9a-fA-F]{8}"),
+        re.compile(
+            r"\b0x[0-9a-fA-F]+\b"
+            r"|[0-9a-fA-F](?<!\w[0-9a-fA-F])(?=[0-9a-fA-F]*[a-fA-F])(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{7,}\b"
+        ),
+        "<HEX>",
+    ),
+    (None, re.compile(r"/(?<![\w./]/)[\w.@%+-]+(?:/[\w.@%+-]+)+/?"), "<PATH>"),
+    (None, re.compile(r"\d(?<![A-Za-z_\d]\d)\d*(?:\.\d+)?"), "<NUM>"),
+]
+LEVELS = frozenset({"TRACE", "DEBUG", "INFO", "NOTICE", "WARN", "WARNING", "ERROR", "SEVERE", "FATAL", "CRITICAL"})
+LEVEL_SEARCH_TOKENS = 4
+
+
+def mask(text: str) -> str:
+    """Replace variable fields in `text` (one line or a whole region) with placeholders."""
+    for gate, pattern, placeholder in _MASKS:
+        if gate is None or gate.search(text):
+            text = pattern.sub(placeholder, text)
+    return text
+
+
+def _bucket(tokens: list[str]) -> str:
+    """Log level among the first tokens, else the first token unless it is variable."""
+    for token in tokens[:LEVEL_SEARCH_TOKENS]:
+        if token.strip("[]():|").upper() in LEVELS:
+            return token
+    return tokens[0] if tokens and "<" not in tokens[0] else WILDCARD
+
+
+class Cluster:
+    __slots__ = ("tokens", "count", "first_line", "last_line", "example")
+
+    def __init__(self, tokens: list[str], count: int, first_line: int, last_line: int, example: str):
+        self.tokens = tokens
+        self.count = count
+        self.first_line = first_line
+        self.last_line = last_line
+        self.example = example
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "template": " ".join(self.tokens),
+            "count": self.count,
+            "first_line": self.first_line,
+            "last_line": self.last_line,
+            "example": self.example,
+        }
+
+
+class TemplateMiner:
+    """Bounded-memory Drain-style clusterer fed one masked line (or template) at a time."""
+
+    def __init__(self, *, max_clusters: int = PATTERNS_MAX_CLUSTERS):
+        self.groups: dict[tuple[int, str], list[Cluster]] = {}
+        self.lookup: dict[str, Cluster] = {}
+        self.max_clusters = max_clusters
+        self.clusters = 0
+        self.lines = 0
+        self.evicted_lines = 0
+
+    def add(self, masked: str, *, count: int, first_line: int, last_line: int, example: str) -> None:
+        self.lines += count
+        cluster = self.lookup.get(masked)
+        if cluster is None or cluster.count == 0:
+            cluster = self._match(masked, count, first_line, example)
+            if len(self.lookup) >= PATTERNS_LOOKUP_ENTRIES:
+                self.lookup.clear()
+            self.lookup[masked] = cluster
+        else:
+            cluster.count += count
+        cluster.first_line = min(cluster.first_line, first_line)
+        cluster.last_line = max(cluster.last_line, last_line)
+
+    def _match(self, masked: str, count: int, first_line: int, example: str) -> Cluster:
+        tokens = masked.split()
+        group = self.groups.setdefault((len(tokens), _bucket(tokens)), [])
+
+        best: Cluster | None = None
+        best_score = -1.0
+        for cluster in group:
+            same = sum(1 for a, b in zip(cluster.tokens, tokens) if a == b or a == WILDCARD)
+            score = same / len(tokens) if tokens else 1.0
+            if score > best_score:
+                best, best_score = cluster, score
+        if best is not None and best_score >= PATTERNS_SIMILARITY:
+            best.tokens = [a if a == b else WILDCARD for a, b in zip(best.tokens, tokens)]
+            best.count += count
+            return best
+
+        cluster = Cluster(tokens, count, first_line, first_line, example[:PATTERNS_EXAMPLE_CHARS])
+        group.append(cluster)
+        self.clusters += 1
+        if self.clusters > 2 * self.max_clusters:
+            self._evict()
+        return cluster
+
+    def _evict(self) -> None:
+        ranked = sorted((c for group in self.groups.values() for c in group), key=lambda c: c.count, reverse=True)
+        keep = {id(c) for c in ranked[: self.max_clusters]}
+        for key, group in list(self.groups.items()):
+            kept = []
+            for cluster in group:
+                if id(cluster) in keep:
+                    kept.append(cluster)
+                else:
+                    self.evicted_lines += cluster.count
+                    # Zeroed clusters are ignored if still referenced by the lookup table.
+                    cluster.count = 0
+            if kept:
+                self.groups[key] = kept
+            else:
+                del self.groups[key]
+        self.clusters = len(keep)
+        self.lookup.clear()
+
+    def feed_region(self, text: str, first_line: int) -> int:
+        """Add every non-blank line of a newline-aligned text region; return the next line number."""
+        masked_lines = mask(text).split("\n")
+        raw_lines = text.split("\n")
+        if text.endswith("\n"):
+            masked_lines.pop()
+            raw_lines.pop()
+        line = first_line
+        for masked, raw in zip(masked_lines, raw_lines):
+            if masked and not masked.isspace():
+                self.add(masked, count=1, first_line=line, last_line=line, example=raw.rstrip("\r"))
+            line += 1
+        return line
+
+    def top(self, k: int) -> list[Cluster]:
+        ranked = sorted(
+            (c for group in self.groups.values() for c in group), key=lambda c: (-c.count, c.first_line)
+        )
+        return ranked[:k]
+
+    def summary(self, top_k: int) -> dict[str, object]:
+        return {
+            "lines": self.lines,
+            "clusters": self.clusters,
+            "evicted_lines": self.evicted_lines,
+            "patterns": [cluster.as_dict() for cluster in self.top(top_k)],
+        }
+
+
+def _decode(region: bytes, encoding: str) -> str:
+    if b"\r" in region:
+        region = region.replace(b"\r\n", b"\n")
+    return region.decode(encoding, errors="replace")
+
+
+def _mine_chunk(path_str: str, start: int, end: int, encoding: str) -> tuple[list[tuple], int, int, int]:
+    """Mine one chunk; return `(clusters, chunk line count, mined lines, evicted lines)`."""
+    miner = TemplateMiner()
+    line = 1
+    for _, region in iter_regions(Path(path_str), start=start, end=end):
+        line = miner.feed_region(_decode(region, encoding), line)
+    clusters = [
+        (" ".join(c.tokens), c.count, c.first_line, c.last_line, c.example)
+        for group in miner.groups.values()
+        for c in group
+    ]
+    return clusters, line - 1, miner.lines, miner.evicted_lines
+
+
+def mine_patterns(
+    path: Path,
+    *,
+    encoding: str,
+    byte_engine: bool = True,
+    regions=None,
+    workers: int = 1,
+    parallel: bool = False,
+) -> TemplateMiner:
+    """Mine templates from `path` (or `regions`) in one pass.
+
+    With `parallel`, newline-aligned chunks are mined in the shared process
+    pool and their templates are merged, in file order, into one miner.
+    """
+    miner = TemplateMiner()
+    if parallel:
+        workers = resolve_workers(workers)
+        pool = shared_pool(workers)
+        chunks = split_chunks(path, workers)
+        futures: list[Future] = [pool.submit(_mine_chunk, str(path), start, end, encoding) for start, end in chunks]
+        line_offset = 0
+        for done, future in enumerate(futures):
+            checkpoint(done, len(futures))
+            clusters, chunk_lines, _, evicted = future.result()
+            tally(bytes_read=chunks[done][1] - chunks[done][0], lines=chunk_lines)
+            for template, count, first_line, last_line, example in clusters:
+                miner.add(
+                    template,
+                    count=count,
+                    first_line=first_line + line_offset,
+                    last_line=last_line + line_offset,
+                    example=example,
+                )
+            miner.lines += evicted
+            miner.evicted_lines += evicted
+            line_offset += chunk_lines
+        return miner
+
+    line = 1
+    if not byte_engine:
+        with path.open("r", encoding=encoding, errors="replace") as f:
+            while True:
+                lines = f.readlines(TEXT_REGION_HINT)
+                if not lines:
+                    break
+                line = miner.feed_region("".join(lines), line)
+        return miner
+    for _, region in regions if regions is not None else iter_regions(path):
+        next_line = miner.feed_region(_decode(region, encoding), line)
+        tally(lines=next_line - line)
+        line = next_line
+    return miner
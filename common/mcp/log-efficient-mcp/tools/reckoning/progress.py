@@ -0,0 +1,65 @@
+"""Cooperative cancellation and progress reporting for long-running tool calls.
+
+A tool call dispatched off the event loop (see `tools.dispatch`) runs with a
+`ScanControl` in a context variable. Scan loops call `checkpoint()` once per
+region; it raises `ScanCancelled` once the client cancelled the call and
+forwards progress at most every `PROGRESS_INTERVAL_SECONDS`. Outside a
+dispatched call (direct calls, tests, pool worker processes) it is a no-op.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+PROGRESS_INTERVAL_SECONDS = 0.5
+
+
+class ScanCancelled(Exception):
+    """Raised inside a tool call after its client cancelled it."""
+
+
+@dataclass
+class ScanControl:
+    on_progress: Callable[[float, float | None], None] | None = None
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    last_report: float = 0.0
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+
+_CONTROL: ContextVar[ScanControl | None] = ContextVar("scan_control", default=None)
+
+
+@contextmanager
+def scan_control(control: ScanControl) -> Iterator[ScanControl]:
+    token = _CONTROL.set(control)
+    try:
+        yield control
+    finally:
+        _CONTROL.reset(token)
+
+
+def is_cancelled() -> bool:
+    control = _CONTROL.get()
+    return control is not None and control.cancelled.is_set()
+
+
+def checkpoint(done: float = 0, total: float | None = None) -> None:
+    """Raise `ScanCancelled` if the current call was cancelled; report `done` of `total` (None: unknown)."""
+    control = _CONTROL.get()
+    if control is None:
+        return
+    if control.cancelled.is_set():
+        raise ScanCancelled("The tool call was cancelled by the client.")
+    if control.on_progress is None:
+        return
+    now = time.monotonic()
+    if now - control.last_report >= PROGRESS_INTERVAL_SECONDS:
+        control.last_report = now
+        control.on_progress(done, total)
@@ -0,0 +1,112 @@
+"""Response building for line-oriented actions: character budget, long-line clipping, run collapsing.
+
+Limits elsewhere are counted in lines, but one minified-JSON or base64 line
+can be megabytes. Rows are rendered here under a character budget: lines
+longer than `max_line_chars` keep a head and a tail window around a length
+marker, and runs of identical (or, with `collapse="similar"`, digit-only
+differing) lines are shown once followed by a `[×N ...]` marker when that
+is shorter than the lines themselves.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Literal
+
+RESPONSE_MAX_CHARS = 200_000
+LINE_MAX_CHARS = 2_000
+# Runs shorter than this are cheaper to show than to describe.
+COLLAPSE_MIN_RUN = 3
+
+Collapse = Literal["none", "exact", "similar"]
+
+_DIGITS = re.compile(r"\d+")
+
+
+def clip_line(text: str, max_chars: int) -> str:
+    """Keep the head and tail of a line longer than `max_chars`, marking how much was cut."""
+    if len(text) <= max_chars:
+        return text
+    keep = max(0, max_chars - 32)
+    head = keep * 2 // 3
+    tail = keep - head
+    cut = len(text) - head - tail
+    return f"{text[:head]}…[{cut} chars clipped]…{text[len(text) - tail:] if tail else ''}"
+
+
+def clip_raw(raw: str, max_line_chars: int) -> str:
+    """`clip_line` for a line that may end with its newline."""
+    text = raw[:-1] if raw.endswith("\n") else raw
+    if len(text) <= max_line_chars:
+        return raw
+    return clip_line(text, max_line_chars) + ("\n" if raw.endswith("\n") else "")
+
+
+def _run_key(row: dict[str, object], collapse: Collapse) -> object:
+    raw = str(row.get("raw", "")).rstrip("\n")
+    key = _DIGITS.sub("0", raw) if collapse == "similar" else raw
+    return row.get("kind", "match"), key
+
+
+def _marker(run: list[dict[str, object]], collapse: Collapse) -> str:
+    label = "similar" if collapse == "similar" else "identical"
+    first, last = run[0].get("line"), run[-1].get("line")
+    span = f" {first}-{last}" if first is not None and last is not None else ""
+    return f"[×{len(run)} {label} lines{span}]\n"
+
+
+def _runs(rows: list[dict[str, object]], collapse: Collapse) -> list[list[dict[str, object]]]:
+    if collapse == "none":
+        return [[row] for row in rows]
+    runs: list[list[dict[str, object]]] = []
+    last_key = None
+    for row in rows:
+        key = _run_key(row, collapse)
+        if runs and key == last_key:
+            runs[-1].append(row)
+        else:
+            runs.append([row])
+            last_key = key
+    return runs
+
+
+def render_rows(
+    rows: list[dict[str, object]],
+    *,
+    max_chars: int = RESPONSE_MAX_CHARS,
+    max_line_chars: int = LINE_MAX_CHARS,
+    collapse: Collapse = "exact",
+    from_end: bool = False,
+) -> tuple[str, int]:
+    """Render rows' `raw` text within `max_chars`; return `(content, rows rendered)`.
+
+    Rows are taken from the front (from the back with `from_end`) until the
+    next line or collapsed run would exceed the budget; at least one is
+    always rendered. A collapsed run is rendered as a whole or not at all;
+    runs whose marker would not save space are shown line by line.
+    """
+    runs = _runs(rows, collapse)
+    if from_end:
+        runs.reverse()
+    parts: list[str] = []
+    used_chars = 0
+    used_rows = 0
+    for run in runs:
+        piece = [clip_raw(str(row.get("raw", "")), max_line_chars) for row in run]
+        size = sum(len(part) for part in piece)
+        if len(run) >= COLLAPSE_MIN_RUN:
+            collapsed = [piece[0], _marker(run, collapse)]
+            if len(collapsed[0]) + len(collapsed[1]) < size:
+                piece, size = collapsed, len(collapsed[0]) + len(collapsed[1])
+        if used_rows and used_chars + size > max_chars:
+            break
+        parts.append("".join(piece))
+        used_chars += size
+        used_rows += len(run)
+    if from_end:
+        parts.reverse()
+    return "".join(parts), used_rows
+
+
+def omitted_marker(count: int) -> str:
+    return f"[{count} more lines omitted: max_chars budget reached]\n"
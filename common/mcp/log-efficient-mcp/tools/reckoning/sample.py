@@ -0,0 +1,137 @@
+"""`sample`: lines from across a file at a fixed cost, with a line count estimate.
+
+Each sample point is a byte offset: one per equal slice of the file
+(`stratified`, the default) or drawn uniformly (`random`), both seeded. The
+partial line at the offset is skipped and the next whole line is returned;
+the `SAMPLE_WINDOW_BYTES` from its start are counted to estimate the mean
+bytes per line and, from it, the file's line count and each sample's line
+number. The cost is one mapped window per point, whatever the file size.
+
+Line numbers and the total are exact when a line index is already cached
+(see `tools.reckoning.line_index`) or when the windows cover the whole file;
+otherwise both are estimates and sampled lines are labelled `~line:`.
+"""
+
+from __future__ import annotations
+
+import mmap
+import random
+from pathlib import Path
+from typing import Literal
+
+from tools.reckoning.line_index import cached_line_index
+from tools.reckoning.progress import checkpoint
+from tools.reckoning.response import LINE_MAX_CHARS, RESPONSE_MAX_CHARS, omitted_marker, render_rows
+from tools.reckoning.source import decode_line
+from tools.reckoning.tail import line_number_at
+from tools.reckoning.telemetry import tally
+
+SAMPLE_WINDOW_BYTES = 16 << 10
+# How far past a sample point to look for the next line start, and for that line's end.
+SAMPLE_LINE_MAX_BYTES = 1 << 20
+
+Sampling = Literal["stratified", "random"]
+
+
+def sample_offsets(size: int, count: int, *, sampling: Sampling = "stratified", seed: int = 0) -> list[int]:
+    """`count` sorted byte offsets in `[0, size)`: one per equal slice, or uniformly drawn."""
+    rng = random.Random(seed)
+    if sampling == "random":
+        return sorted(rng.randrange(size) for _ in range(count))
+    return [size * i // count + rng.randrange(max(1, size // count)) for i in range(count)]
+
+
+def _line_at(mm: mmap.mmap, offset: int) -> tuple[int, int] | None:
+    """`(start, end)` of the first line starting at or after `offset`, or None past the last one."""
+    size = len(mm)
+    start = 0
+    if offset > 0:
+        nl = mm.find(b"\n", offset - 1, min(size, offset - 1 + SAMPLE_LINE_MAX_BYTES))
+        if nl < 0 or nl + 1 >= size:
+            return None
+        start = nl + 1
+    end = mm.find(b"\n", start, min(size, start + SAMPLE_LINE_MAX_BYTES))
+    return start, size if end < 0 else end + 1
+
+
+def sample_lines(
+    path: Path,
+    *,
+    count: int,
+    sampling: Sampling = "stratified",
+    seed: int = 0,
+    encoding: str = "utf-8",
+    max_chars: int = RESPONSE_MAX_CHARS,
+    max_line_chars: int = LINE_MAX_CHARS,
+) -> dict[str, object]:
+    """Return up to `count` distinct lines sampled across `path`, labelled by line number, and a line estimate."""
+    size = path.stat().st_size
+    result: dict[str, object] = {
+        "bytes": size,
+        "sampling": sampling,
+        "samples": 0,
+        "estimated_lines": 0,
+        "exact": True,
+        "mean_line_bytes": None,
+        "content": "",
+    }
+    if size == 0:
+        return result
+
+    spans: list[tuple[int, int]] = []
+    raws: list[bytes] = []
+    window_bytes = window_newlines = 0
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Small files are counted outright: the windows would cover them anyway.
+        whole_file = size <= count * SAMPLE_WINDOW_BYTES
+        for i, offset in enumerate(sample_offsets(size, count, sampling=sampling, seed=seed)):
+            checkpoint(i, count)
+            span = _line_at(mm, offset)
+            if span is None or (spans and span[0] <= spans[-1][0]):
+                continue
+            spans.append(span)
+            raws.append(mm[span[0] : span[1]])
+            if not whole_file:
+                window = mm[span[0] : span[0] + SAMPLE_WINDOW_BYTES]
+                newlines = window.count(b"\n")
+                window_bytes += len(window)
+                window_newlines += newlines
+                tally(bytes_read=max(len(window), span[1] - offset), lines=newlines)
+        if whole_file:
+            data = mm[:]
+            newlines = data.count(b"\n")
+            tally(bytes_read=size, lines=newlines)
+            total = newlines + (0 if data.endswith(b"\n") else 1)
+            numbers, seen, last = [], 0, 0
+            for start, _ in spans:
+                seen += data.count(b"\n", last, start)
+                numbers.append(1 + seen)
+                last = start
+
+    index = None if whole_file else cached_line_index(path)
+    exact = whole_file or index is not None
+    if index is not None:
+        total = index.total_lines
+        numbers = [line_number_at(path, start) or 1 for start, _ in spans]
+    elif not whole_file:
+        mean = window_bytes / max(1, window_newlines)
+        total = max(len(spans), round(size / mean))
+        numbers = [min(total, 1 + round(start / mean)) for start, _ in spans]
+
+    label = "" if exact else "~"
+    rows = [
+        {"line": number, "raw": f"{label}{number}:{decode_line(raw, encoding)}"}
+        for number, raw in zip(numbers, raws)
+    ]
+    content, used = render_rows(rows, max_chars=max_chars, max_line_chars=max_line_chars, collapse="none")
+    if used < len(rows):
+        content += omitted_marker(len(rows) - used)
+    result.update(
+        samples=len(rows),
+        estimated_lines=total,
+        exact=exact,
+        mean_line_bytes=round(size / total, 1) if total else None,
+        content=content,
+    )
+    return result
+
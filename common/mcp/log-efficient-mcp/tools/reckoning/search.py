@@ -0,0 +1,529 @@
+"""Buffer-level search/extract engine over memory-mapped regions.
+
+Regions that are pure ASCII are scanned as `bytes` with `bytes.find` or a
+compiled `bytes` regex; other regions are decoded once and scanned as `str`.
+Line boundaries are only located around hits, and only returned lines are
+decoded, so the cost per non-matching line is a few C-level byte compares.
+
+Regex queries are planned once: the longest literal every match must
+contain is located with a plain substring scan, and the full regex only
+runs on the lines around those candidates. Patterns whose meaning depends
+on what surrounds a line (string anchors, lookarounds) are matched one line
+at a time instead of over the whole buffer. Compiled queries are cached
+across calls by `compile_query`.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from tools.reckoning.source import iter_regions
+from tools.reckoning.telemetry import tally
+
+QUERY_CACHE_SIZE = 256
+PREFILTER_MIN_LITERAL = 3
+# Regions where more than one line in this many holds a candidate are split
+# into lines instead of hopping from hit to hit.
+DENSE_HIT_LINES = 8
+
+
+def _literal_runs(items) -> list[str]:
+    """Literal runs that every match of the parsed sequence `items` must contain."""
+    runs: list[str] = []
+    current: list[str] = []
+
+    def flush() -> None:
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            current.append(chr(av))
+        elif op is sre_parse.AT:
+            # Anchors are zero-width and do not break a run.
+            continue
+        elif op is sre_parse.SUBPATTERN and not av[1] and not av[2]:
+            flush()
+            runs.extend(_literal_runs(av[3]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            flush()
+            runs.extend(_literal_runs(av[2]))
+        else:
+            flush()
+    flush()
+    return runs
+
+
+def _sees_past_line(items) -> bool:
+    """Whether the parsed sequence `items` has string anchors or lookarounds, which match differently in a buffer."""
+    for op, av in items:
+        if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            return True
+        if op is sre_parse.AT and av in (sre_parse.AT_BEGINNING_STRING, sre_parse.AT_END_STRING):
+            return True
+        for value in av if isinstance(av, (tuple, list)) else ():
+            branches = value if isinstance(value, list) else [value]
+            if any(isinstance(branch, sre_parse.SubPattern) and _sees_past_line(branch) for branch in branches):
+                return True
+    return False
+
+
+def line_local(query: str, flags: int = 0) -> bool:
+    """Whether `query` matches a line the same inside a multi-line buffer as on its own."""
+    try:
+        return not _sees_past_line(sre_parse.parse(query, flags))
+    except (re.error, OverflowError, RecursionError):
+        return False
+
+
+def required_literals(query: str, flags: int = 0) -> tuple[str, ...]:
+    """Every literal run that all matches of `query` must contain (possibly none)."""
+    try:
+        return tuple(_literal_runs(sre_parse.parse(query, flags)))
+    except (re.error, OverflowError, RecursionError):
+        return ()
+
+
+def _alternatives(items) -> list[str] | None:
+    """Literals at least one of which every match of the parsed sequence `items` contains, preferring long ones."""
+    best: list[str] | None = None
+
+    def consider(options: list[str] | None) -> None:
+        nonlocal best
+        if not options or min(map(len, options)) < PREFILTER_MIN_LITERAL:
+            return
+        if best is None or min(map(len, options)) > min(map(len, best)):
+            best = options
+
+    for run in _literal_runs(items):
+        consider([run])
+    for op, av in items:
+        if op is sre_parse.BRANCH:
+            options: list[str] | None = []
+            for branch in av[1]:
+                found = _alternatives(branch)
+                if found is None:
+                    options = None
+                    break
+                options.extend(found)
+            consider(options)
+        elif op is sre_parse.SUBPATTERN and not av[1] and not av[2]:
+            consider(_alternatives(av[3]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            consider(_alternatives(av[2]))
+    return best
+
+
+def literal_alternatives(query: str, flags: int = 0) -> tuple[tuple[str, ...], bool] | None:
+    """Return `(literals, ignore_case)` such that every match of `query` contains one of the literals.
+
+    `ignore_case` reports whether the pattern (or its inline flags) folds
+    case. `None` means no such set of literals at least
+    `PREFILTER_MIN_LITERAL` characters long was found.
+    """
+    try:
+        parsed = sre_parse.parse(query, flags)
+    except (re.error, OverflowError, RecursionError):
+        return None
+    found = _alternatives(parsed)
+    if found is None:
+        return None
+    return tuple(dict.fromkeys(found)), bool(parsed.state.flags & re.IGNORECASE)
+
+
+def required_literal(query: str, flags: int = 0) -> tuple[str | None, bool]:
+    """Return `(longest literal every match contains, whether the pattern starts with it)`.
+
+    The literal is `None` when no run of at least `PREFILTER_MIN_LITERAL`
+    characters is required.
+    """
+    try:
+        parsed = sre_parse.parse(query, flags)
+    except (re.error, OverflowError, RecursionError):
+        return None, False
+    items = [(op, av) for op, av in parsed if op is not sre_parse.AT]
+    runs = _literal_runs(parsed)
+    if not runs:
+        return None, False
+    literal = max(runs, key=len)
+    if len(literal) < PREFILTER_MIN_LITERAL:
+        return None, False
+    leading = "".join(chr(av) for op, av in items[: len(literal)] if op is sre_parse.LITERAL)
+    return literal, leading == literal
+
+
+class LineQuery:
+    """A `search`/`extract` query compiled for both `bytes` and `str` buffers."""
+
+    def __init__(self, query: str, *, regex: bool, ignore_case: bool):
+        flags = re.IGNORECASE if ignore_case else 0
+        self.regex = regex
+        # Authoritative per-line pattern, identical to the text-mode engine.
+        self.line_pattern = re.compile(query, flags) if regex else None
+
+        self.literal: str | None = None
+        self.str_pattern: re.Pattern[str] | None = None
+        # Otherwise `search` runs the regex on each line sliced out of the buffer.
+        self.line_local = not regex or line_local(query, flags)
+        if regex:
+            self.str_pattern = re.compile(query, flags | re.MULTILINE)
+        elif ignore_case:
+            self.str_pattern = re.compile(re.escape(query), flags)
+        else:
+            self.literal = query
+
+        self.bytes_literal: bytes | None = None
+        self.bytes_pattern: re.Pattern[bytes] | None = None
+        self.bytes_supported = query.isascii()
+        if self.bytes_supported:
+            encoded = query.encode("ascii")
+            try:
+                if regex:
+                    self.bytes_pattern = re.compile(encoded, flags | re.MULTILINE)
+                elif ignore_case:
+                    self.bytes_pattern = re.compile(re.escape(encoded), flags)
+                else:
+                    self.bytes_literal = encoded
+            except re.error:
+                self.bytes_supported = False
+
+        self.folded = ignore_case or bool(self.line_pattern is not None and self.line_pattern.flags & re.IGNORECASE)
+        self.literals: tuple[str, ...] = required_literals(query, flags) if regex else (query,)
+        # Case-sensitive literal every matching line contains, used to gauge hit density.
+        self.probe: str | None = None
+        if not self.folded:
+            longest = max(self.literals, key=len, default="")
+            self.probe = longest if len(longest) >= PREFILTER_MIN_LITERAL else None
+
+        # A leading literal is already used by the regex engine itself, so a
+        # prefilter only pays off for literals further into the pattern.
+        self.prefilter: str | None = None
+        self.str_prefilter: str | re.Pattern[str] | None = None
+        self.bytes_prefilter: bytes | re.Pattern[bytes] | None = None
+        if regex:
+            literal, leading = required_literal(query, flags)
+            if literal is not None and not leading:
+                self.prefilter = literal
+                folded = self.folded
+                self.str_prefilter = re.compile(re.escape(literal), re.IGNORECASE) if folded else literal
+                if literal.isascii():
+                    encoded = literal.encode("ascii")
+                    self.bytes_prefilter = re.compile(re.escape(encoded), re.IGNORECASE) if folded else encoded
+
+    def candidate(self, buf, pos: int, endpos: int | None = None) -> int:
+        """Offset of the next prefilter literal in `buf[pos:endpos]`, or `-1`."""
+        endpos = len(buf) if endpos is None else endpos
+        prefilter = self.bytes_prefilter if isinstance(buf, bytes) else self.str_prefilter
+        if prefilter is None:
+            return pos
+        if isinstance(prefilter, (bytes, str)):
+            return buf.find(prefilter, pos, endpos)
+        m = prefilter.search(buf, pos, endpos)
+        return m.start() if m else -1
+
+    def search(self, buf, pos: int, endpos: int | None = None) -> tuple[int, int] | None:
+        """Return the `(start, end)` span of the next hit in `buf[pos:endpos]`."""
+        endpos = len(buf) if endpos is None else endpos
+        if isinstance(buf, bytes):
+            literal, pattern = self.bytes_literal, self.bytes_pattern
+        else:
+            literal, pattern = self.literal, self.str_pattern
+        if literal is not None:
+            idx = buf.find(literal, pos, endpos)
+            return (idx, idx + len(literal)) if idx >= 0 else None
+        if not self.line_local:
+            nl = b"\n" if isinstance(buf, bytes) else "\n"
+            while pos < endpos:
+                le = buf.find(nl, pos, endpos)
+                le = endpos if le < 0 else le
+                m = pattern.search(buf[pos:le])
+                if m:
+                    return pos + m.start(), pos + m.end()
+                pos = le + 1
+            return None
+        m = pattern.search(buf, pos, endpos)
+        return m.span() if m else None
+
+    def match_line(self, text: str) -> re.Match[str] | None:
+        if self.line_pattern is None:
+            return None
+        if self.str_prefilter is not None and self.candidate(text, 0) < 0:
+            return None
+        return self.line_pattern.search(text)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def compile_query(query: str, *, regex: bool, ignore_case: bool) -> LineQuery:
+    """Return a cached `LineQuery`; queries are immutable once built."""
+    return LineQuery(query, regex=regex, ignore_case=ignore_case)
+
+
+def _prepare(region: bytes, query: LineQuery, encoding: str):
+    if b"\r" in region:
+        region = region.replace(b"\r\n", b"\n")
+    if query.bytes_supported and region.isascii():
+        return region, b"\n"
+    return region.decode(encoding, errors="replace"), "\n"
+
+
+def _find_hit(buf, nl, pos: int, query: LineQuery) -> tuple[int, int] | None:
+    """Return `(line start, line end)` of the next line at or after `pos` with a hit."""
+    n = len(buf)
+    prefilter = query.bytes_prefilter if isinstance(buf, bytes) else query.str_prefilter
+    if prefilter is not None:
+        while pos < n:
+            idx = query.candidate(buf, pos)
+            if idx < 0:
+                return None
+            ls = buf.rfind(nl, 0, idx) + 1
+            le = buf.find(nl, idx)
+            if le < 0:
+                le = n
+            if query.search(buf, ls, le) is not None:
+                return ls, le
+            pos = le + 1
+        return None
+    while pos <= n:
+        span = query.search(buf, pos)
+        if span is None:
+            return None
+        start, end = span
+        if start >= n and buf.endswith(nl):
+            return None
+        ls = buf.rfind(nl, 0, start) + 1
+        le = buf.find(nl, start)
+        if le < 0:
+            le = n
+        if end <= le or query.search(buf, ls, le) is not None:
+            return ls, le
+        pos = le + 1
+    return None
+
+
+def iter_hit_spans(buf, nl, query: LineQuery):
+    """Yield `(line start, line end)` of every line of a prepared buffer with a hit.
+
+    Regex hits are candidates: callers confirm them with `match_line`.
+    """
+    n = len(buf)
+    pos = 0
+    while pos < n:
+        hit = _find_hit(buf, nl, pos, query)
+        if hit is None:
+            return
+        yield hit
+        pos = hit[1] + 1
+
+
+class LineScan:
+    """Streaming `search`/`extract` state carried across consecutive regions.
+
+    When regions come with their file offset, every row carries the byte
+    offset its line `end`s at, so a page cursor can resume right after it.
+    """
+
+    def __init__(self, query: LineQuery, *, before: int, after: int, max_matches: int, encoding: str, extract: bool):
+        self.query = query
+        self.before = before
+        self.after = after
+        self.max_matches = max_matches
+        self.encoding = encoding
+        self.extract = extract
+        self.rows: list[dict[str, object]] = []
+        self.match_count = 0
+        self.pending_after = 0
+        self.last_emitted = 0
+        self.carry: deque[tuple[int, str, int | None]] = deque(maxlen=max(0, before))
+        self._region = b""
+        self._offset: int | None = None
+        # A line start in the prepared buffer and the same line's start in the raw region.
+        self._mapped = (0, 0)
+
+    @property
+    def done(self) -> bool:
+        return self.match_count >= self.max_matches and self.pending_after == 0
+
+    def _raw(self, buf, nl, ls: int, le: int) -> str:
+        text = buf[ls:le]
+        if isinstance(text, bytes):
+            text = text.decode(self.encoding, errors="replace")
+        return text + "\n" if le < len(buf) else text
+
+    def _end(self, buf, le: int) -> int | None:
+        """File offset just past the line of `buf` ending at `le`; lines must be asked for in order."""
+        if self._offset is None:
+            return None
+        region = self._region
+        if buf is region:
+            return self._offset + min(le + 1, len(buf))
+        # CRLF folding and decoding shift offsets, but lines map one to one onto the raw region.
+        buf_pos, region_pos = self._mapped
+        for _ in range(buf.count("\n" if isinstance(buf, str) else b"\n", buf_pos, le)):
+            region_pos = region.find(b"\n", region_pos) + 1
+        end = region.find(b"\n", region_pos) + 1 or len(region)
+        self._mapped = (le + 1, end)
+        return self._offset + end
+
+    def _emit(self, line: int, raw: str, kind: str, end: int | None) -> None:
+        row: dict[str, object] = {"line": line, "raw": raw, "kind": kind}
+        if end is not None:
+            row["end"] = end
+        self.rows.append(row)
+        self.last_emitted = line
+
+    def _emit_before(self, buf, nl, ls: int, hit_line: int) -> None:
+        wanted = min(self.before, hit_line - self.last_emitted - 1)
+        found: list[tuple[int, str, int]] = []
+        cur = ls
+        while len(found) < wanted and cur > 0:
+            prev = buf.rfind(nl, 0, cur - 1) + 1
+            found.append((hit_line - len(found) - 1, self._raw(buf, nl, prev, cur - 1), cur - 1))
+            cur = prev
+        missing = wanted - len(found)
+        for line, raw, end in list(self.carry)[-missing:] if missing > 0 else []:
+            self._emit(line, raw, "before", end)
+        for line, raw, le in reversed(found):
+            self._emit(line, raw, "before", self._end(buf, le))
+
+    def scan_region(self, region: bytes, first_line: int, offset: int | None = None) -> int:
+        """Scan one newline-aligned region starting at file `offset`; return the line number after it."""
+        buf, nl = _prepare(region, self.query, self.encoding)
+        self._region, self._offset, self._mapped = region, offset, (0, 0)
+        n = len(buf)
+        pos = 0
+        line_at_pos = first_line
+        while pos < n and not self.done:
+            hit = None if self.match_count >= self.max_matches else _find_hit(buf, nl, pos, self.query)
+            stop = hit[0] if hit else n
+            while self.pending_after and pos < stop:
+                le = buf.find(nl, pos)
+                le = n if le < 0 else le
+                self._emit(line_at_pos, self._raw(buf, nl, pos, le), "after", self._end(buf, le))
+                pos = le + 1
+                line_at_pos += 1
+                self.pending_after -= 1
+            if hit is None:
+                break
+
+            ls, le = hit
+            hit_line = line_at_pos + buf.count(nl, pos, ls)
+            raw = self._raw(buf, nl, ls, le)
+            pos = le + 1
+            line_at_pos = hit_line + 1
+            m = None
+            if self.query.regex:
+                m = self.query.match_line(raw.rstrip("\n"))
+                if m is None:
+                    if self.pending_after:
+                        self._emit(hit_line, raw, "after", self._end(buf, le))
+                        self.pending_after -= 1
+                    continue
+            self._emit_before(buf, nl, ls, hit_line)
+            end = self._end(buf, le)
+            if self.extract:
+                row = {"line": hit_line, "raw": raw, "groups": m.groupdict() if m.groupdict() else list(m.groups())}
+                if end is not None:
+                    row["end"] = end
+                self.rows.append(row)
+                self.last_emitted = hit_line
+            else:
+                self._emit(hit_line, raw, "match", end)
+            self.match_count += 1
+            self.pending_after = self.after
+
+        next_line = first_line + buf.count(nl)
+        tally(lines=next_line - first_line)
+        if self.before:
+            tail: list[tuple[int, str, int | None]] = []
+            cur = n if not buf.endswith(nl) else n - 1
+            region_cur = len(region) if not region.endswith(b"\n") else len(region) - 1
+            line = next_line - 1 if buf.endswith(nl) else next_line
+            while len(tail) < self.before and cur >= 0:
+                prev = buf.rfind(nl, 0, cur) + 1
+                end = None if offset is None else offset + min(region_cur + 1, len(region))
+                tail.append((line, self._raw(buf, nl, prev, cur), end))
+                line -= 1
+                cur = prev - 1
+                region_cur = region.rfind(b"\n", 0, region_cur)
+            self.carry.extend(reversed(tail))
+        return next_line
+
+
+def iter_line_matches(query: LineQuery, regions, *, encoding: str):
+    """Yield the `match_line` result of every matching line in `regions`, in order.
+
+    Unlike `scan_lines`, nothing is accumulated, so callers can fold
+    arbitrarily many matches in bounded memory.
+    """
+    for _, region in regions:
+        buf, nl = _prepare(region, query, encoding)
+        probe = query.probe
+        if probe is not None and isinstance(buf, bytes):
+            probe = probe.encode(encoding, errors="replace")
+        if probe is not None and buf.count(probe) * DENSE_HIT_LINES > buf.count(nl):
+            lines = buf.split(nl)
+            if buf.endswith(nl):
+                lines.pop()
+            for line in lines:
+                if probe in line:
+                    m = query.match_line(line.decode(encoding, errors="replace") if isinstance(line, bytes) else line)
+                    if m is not None:
+                        yield m
+            continue
+
+        for ls, le in iter_hit_spans(buf, nl, query):
+            text = buf[ls:le]
+            if isinstance(text, bytes):
+                text = text.decode(encoding, errors="replace")
+            m = query.match_line(text)
+            if m is not None:
+                yield m
+
+
+def scan_lines(
+    path: Path,
+    *,
+    query: LineQuery,
+    before: int = 0,
+    after: int = 0,
+    max_matches: int,
+    encoding: str,
+    extract: bool = False,
+    regions=None,
+    first_line: int = 1,
+    sink=None,
+) -> list[dict[str, object]]:
+    """Run a `search` (or `extract`) scan over `path` with text-mode-compatible rows.
+
+    `regions` overrides the memory-mapped regions of `path`, e.g. with a
+    decompressed stream or a resumed page; `first_line` is the number of its
+    first line. Context never reaches back before the first region. A `sink`
+    is handed each region's rows instead, so they are not accumulated.
+    """
+    scan = LineScan(
+        query,
+        before=before,
+        after=after,
+        max_matches=max_matches,
+        encoding=encoding,
+        extract=extract,
+    )
+    scan.last_emitted = first_line - 1
+    line = first_line
+    for offset, region in regions if regions is not None else iter_regions(path):
+        line = scan.scan_region(region, line, offset)
+        if sink is not None and scan.rows:
+            sink(scan.rows)
+            scan.rows = []
+        if scan.done:
+            break
+    return scan.rows
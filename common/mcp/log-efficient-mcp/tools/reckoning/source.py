@@ -0,0 +1,168 @@
+"""Shared byte-level file access helpers for the reckoning engines."""
+
+from __future__ import annotations
+
+import codecs
+import hashlib
+import mmap
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from tools.reckoning.progress import checkpoint
+from tools.reckoning.telemetry import tally
+
+CACHE_DIR_ENV_VAR = "LOG_EFFICIENT_MCP_CACHE_DIR"
+DEFAULT_CACHE_DIR = "~/.cache/log-efficient-mcp"
+FALLBACK_CACHE_DIR = "/tmp/log-efficient-mcp/cache"
+FINGERPRINT_WINDOW_BYTES = 4096
+REGION_BYTES = 8 << 20
+
+_REFRESH_LOCKS: dict[tuple[str, str], threading.Lock] = {}
+_REFRESH_LOCKS_GUARD = threading.Lock()
+
+
+@dataclass(frozen=True)
+class FileIdentity:
+    """Cheap identity of a file on disk, used to validate cached scan state."""
+
+    dev: int
+    ino: int
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def of(cls, path: Path) -> "FileIdentity":
+        st = path.stat()
+        return cls(dev=st.st_dev, ino=st.st_ino, size=st.st_size, mtime_ns=st.st_mtime_ns)
+
+    def same_file(self, other: "FileIdentity") -> bool:
+        return self.dev == other.dev and self.ino == other.ino
+
+
+def resolve_cache_dir(name: str) -> Path:
+    """Return (and create) the cache subdirectory `name`, falling back to /tmp."""
+    env_root = os.environ.get(CACHE_DIR_ENV_VAR, "").strip()
+    root = Path(env_root or DEFAULT_CACHE_DIR).expanduser()
+    target = root / name
+    try:
+        target.mkdir(parents=True, exist_ok=True)
+        return target.resolve()
+    except OSError:
+        fallback = Path(FALLBACK_CACHE_DIR) / name
+        fallback.mkdir(parents=True, exist_ok=True)
+        return fallback.resolve()
+
+
+def refresh_lock(kind: str, path: Path) -> threading.Lock:
+    """Lock serializing refreshes of the `kind` cache entry for `path` across concurrent tool calls."""
+    with _REFRESH_LOCKS_GUARD:
+        return _REFRESH_LOCKS.setdefault((kind, str(path)), threading.Lock())
+
+
+def cache_key(path: Path) -> str:
+    return hashlib.sha1(str(path).encode("utf-8", errors="surrogateescape")).hexdigest()
+
+
+def prefix_fingerprint(path: Path, end: int) -> str:
+    """Hash the first and last window of `path[:end]` to detect rewritten prefixes."""
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as f:
+        digest.update(f.read(min(end, FINGERPRINT_WINDOW_BYTES)))
+        tail_start = max(0, end - FINGERPRINT_WINDOW_BYTES)
+        f.seek(tail_start)
+        digest.update(f.read(end - tail_start))
+    digest.update(str(end).encode("ascii"))
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=64)
+def supports_byte_engine(encoding: str) -> bool:
+    """True when `encoding` is ASCII-compatible, so b"\\n" splits lines safely."""
+    try:
+        codecs.lookup(encoding)
+        sample = bytes(range(128))
+        return sample.decode(encoding) == sample.decode("ascii") and "\n".encode(encoding) == b"\n"
+    except (LookupError, UnicodeError):
+        return False
+
+
+def decode_line(raw: bytes, encoding: str) -> str:
+    """Decode one raw line the way text-mode reads would (``\\r\\n`` -> ``\\n``)."""
+    if raw.endswith(b"\r\n"):
+        raw = raw[:-2] + b"\n"
+    return raw.decode(encoding, errors="replace")
+
+
+def iter_raw_lines(path: Path, *, offset: int = 0, first_line: int = 1):
+    """Yield `(line number, raw bytes)` starting at a line-aligned byte `offset`."""
+    read = lines = 0
+    try:
+        with path.open("rb") as f:
+            f.seek(offset)
+            for lines, raw in enumerate(f, start=1):
+                read += len(raw)
+                yield first_line + lines - 1, raw
+    finally:
+        tally(bytes_read=read, lines=lines)
+
+
+def iter_regions(
+    path: Path,
+    *,
+    start: int = 0,
+    end: int | None = None,
+    region_bytes: int | None = None,
+):
+    """Yield `(offset, bytes)` regions of a memory-mapped file, each ending on a newline.
+
+    Only the final region may end without a newline (when the file does).
+    Lines longer than `region_bytes` extend their region to the next newline.
+    Each region is a cancellation/progress `checkpoint` of the current tool call
+    and is counted as read.
+    """
+    if path.stat().st_size == 0:
+        return
+    region_bytes = region_bytes or REGION_BYTES
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = len(mm) if end is None else min(end, len(mm))
+        pos = start
+        while pos < end:
+            stop = min(pos + region_bytes, end)
+            if stop < end:
+                nl = mm.rfind(b"\n", pos, stop)
+                if nl < 0:
+                    nl = mm.find(b"\n", stop, end)
+                stop = end if nl < 0 else nl + 1
+            checkpoint(pos - start, end - start)
+            tally(bytes_read=stop - pos)
+            yield pos, mm[pos:stop]
+            pos = stop
+
+
+def regions_from_chunks(chunks, *, region_bytes: int | None = None):
+    """Regroup a stream of byte chunks into newline-aligned `(offset, bytes)` regions."""
+    region_bytes = region_bytes or REGION_BYTES
+    pending: list[bytes] = []
+    pending_size = 0
+    offset = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size < region_bytes:
+            continue
+        data = b"".join(pending)
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            pending = [data]
+            continue
+        checkpoint(offset)
+        yield offset, data[:cut]
+        offset += cut
+        rest = data[cut:]
+        pending = [rest] if rest else []
+        pending_size = len(rest)
+    if pending_size:
+        yield offset, b"".join(pending)
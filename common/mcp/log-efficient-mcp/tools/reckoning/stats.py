@@ -0,0 +1,76 @@
+"""Mergeable line statistics computed over newline-aligned byte regions."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+from tools.reckoning.source import iter_regions
+from tools.reckoning.telemetry import tally
+
+
+@dataclass
+class ScanStats:
+    """Line shape summary for a contiguous run of whole lines."""
+
+    lines: int = 0
+    non_empty_lines: int = 0
+    max_line_length: int = 0
+    first_non_empty_line: str = ""
+    last_non_empty_line: str = ""
+
+    def merge(self, later: "ScanStats") -> "ScanStats":
+        """Combine with the stats of the lines that directly follow these."""
+        return ScanStats(
+            lines=self.lines + later.lines,
+            non_empty_lines=self.non_empty_lines + later.non_empty_lines,
+            max_line_length=max(self.max_line_length, later.max_line_length),
+            first_non_empty_line=self.first_non_empty_line or later.first_non_empty_line,
+            last_non_empty_line=later.last_non_empty_line or self.last_non_empty_line,
+        )
+
+
+def region_stats(region: bytes, *, encoding: str) -> ScanStats:
+    """Stats for one newline-aligned region, using C-level splits instead of a line loop."""
+    if b"\r" in region:
+        region = region.replace(b"\r\n", b"\n")
+    buf = region if region.isascii() else region.decode(encoding, errors="replace")
+    nl = b"\n" if isinstance(buf, bytes) else "\n"
+    parts = buf.split(nl)
+    if buf.endswith(nl) or not buf:
+        parts.pop()
+    if not parts:
+        return ScanStats()
+
+    empty = parts[0][:0]
+    blank = parts.count(empty) + sum(map(type(buf).isspace, parts))
+    first = next((p for p in parts if p and not p.isspace()), empty)
+    last = next((p for p in reversed(parts) if p and not p.isspace()), empty)
+    if isinstance(buf, bytes):
+        first, last = first.decode(encoding), last.decode(encoding)
+    return ScanStats(
+        lines=len(parts),
+        non_empty_lines=len(parts) - blank,
+        max_line_length=max(map(len, parts)),
+        first_non_empty_line=first,
+        last_non_empty_line=last,
+    )
+
+
+def scan_stats(
+    path: Path,
+    *,
+    encoding: str,
+    start: int = 0,
+    end: int | None = None,
+    regions=None,
+) -> ScanStats:
+    """Sequentially compute stats for the lines in `path[start:end]` (or `regions`)."""
+    stats = ScanStats()
+    if regions is None:
+        regions = iter_regions(path, start=start, end=end)
+    for _, region in regions:
+        region_result = region_stats(region, encoding=encoding)
+        tally(lines=region_result.lines)
+        stats = stats.merge(region_result)
+    return stats
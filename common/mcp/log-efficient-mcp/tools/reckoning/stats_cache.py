@@ -0,0 +1,191 @@
+"""Incremental `stats` cache for append-only files.
+
+Entries hold the stats of every complete line up to a resume offset. When a
+file has only grown (same device/inode, unchanged prefix fingerprint), only
+the bytes after that offset are scanned and merged in. Rotated, truncated,
+or rewritten files evict their entry and are rescanned from byte 0.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+
+from tools.reckoning.parallel import parallel_stats, use_parallel
+from tools.reckoning.source import FileIdentity, cache_key, prefix_fingerprint, refresh_lock, resolve_cache_dir
+from tools.reckoning.stats import ScanStats, scan_stats
+
+STATS_CACHE_VERSION = 1
+STATS_CACHE_MAX_ENTRIES = 256
+STATS_PERSIST_MIN_FILE_BYTES = 8 << 20
+
+_MEMORY_CACHE: OrderedDict[str, "StatsEntry"] = OrderedDict()
+_MEMORY_LOCK = threading.Lock()
+
+
+@dataclass
+class StatsEntry:
+    path: str
+    encoding: str
+    identity: FileIdentity
+    resume_offset: int
+    fingerprint: str
+    stats: ScanStats
+
+
+def _entry_key(path: Path, encoding: str) -> str:
+    return f"{cache_key(path)}-{codecs.lookup(encoding).name}"
+
+
+def _entry_file(key: str) -> Path:
+    return resolve_cache_dir("stats") / f"{key}.json"
+
+
+def _load(key: str) -> StatsEntry | None:
+    try:
+        payload = json.loads(_entry_file(key).read_text(encoding="utf-8"))
+        if payload.get("version") != STATS_CACHE_VERSION:
+            return None
+        return StatsEntry(
+            path=payload["path"],
+            encoding=payload["encoding"],
+            identity=FileIdentity(*payload["identity"]),
+            resume_offset=int(payload["resume_offset"]),
+            fingerprint=payload["fingerprint"],
+            stats=ScanStats(**payload["stats"]),
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _prune_disk(cache_dir: Path) -> None:
+    """Drop entries for vanished files, then the oldest beyond the size cap."""
+    entries = sorted(cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    kept: list[Path] = []
+    for entry_file in entries:
+        try:
+            target = json.loads(entry_file.read_text(encoding="utf-8")).get("path", "")
+        except (OSError, ValueError):
+            target = ""
+        if target and Path(target).exists():
+            kept.append(entry_file)
+        else:
+            entry_file.unlink(missing_ok=True)
+    for entry_file in kept[: max(0, len(kept) - STATS_CACHE_MAX_ENTRIES)]:
+        entry_file.unlink(missing_ok=True)
+
+
+def _save(key: str, entry: StatsEntry, *, is_new: bool) -> None:
+    payload = {
+        "version": STATS_CACHE_VERSION,
+        "path": entry.path,
+        "encoding": entry.encoding,
+        "identity": [entry.identity.dev, entry.identity.ino, entry.identity.size, entry.identity.mtime_ns],
+        "resume_offset": entry.resume_offset,
+        "fingerprint": entry.fingerprint,
+        "stats": asdict(entry.stats),
+    }
+    target = _entry_file(key)
+    tmp = target.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(payload), encoding="utf-8")
+    os.replace(tmp, target)
+    if is_new:
+        _prune_disk(target.parent)
+
+
+def _remember(key: str, entry: StatsEntry, *, is_new: bool) -> None:
+    with _MEMORY_LOCK:
+        _MEMORY_CACHE[key] = entry
+        _MEMORY_CACHE.move_to_end(key)
+        if is_new:
+            for stale_key in [k for k, e in _MEMORY_CACHE.items() if not Path(e.path).exists()]:
+                _MEMORY_CACHE.pop(stale_key, None)
+        while len(_MEMORY_CACHE) > STATS_CACHE_MAX_ENTRIES:
+            _MEMORY_CACHE.popitem(last=False)
+
+
+def _forget(key: str) -> None:
+    with _MEMORY_LOCK:
+        _MEMORY_CACHE.pop(key, None)
+    try:
+        _entry_file(key).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _complete_end(path: Path, start: int, size: int) -> int:
+    """Offset just past the last newline in `path[start:size]` (or `start`)."""
+    if size <= start:
+        return start
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        nl = mm.rfind(b"\n", start, min(size, len(mm)))
+    return start if nl < 0 else nl + 1
+
+
+def _scan(path: Path, *, encoding: str, workers: int, start: int, end: int) -> ScanStats:
+    if use_parallel(path, workers, scan_bytes=end - start):
+        return parallel_stats(path, encoding=encoding, workers=workers, start=start, end=end)
+    return scan_stats(path, encoding=encoding, start=start, end=end)
+
+
+def _is_append_of(entry: StatsEntry, path: Path, identity: FileIdentity) -> bool:
+    if entry.identity == identity:
+        return True
+    return (
+        entry.identity.same_file(identity)
+        and identity.size >= entry.resume_offset
+        and prefix_fingerprint(path, entry.resume_offset) == entry.fingerprint
+    )
+
+
+def cached_stats(path: Path, *, encoding: str, workers: int = 1) -> ScanStats:
+    """Return whole-file `ScanStats`, scanning only bytes not seen by earlier calls."""
+    key = _entry_key(path, encoding)
+    # Concurrent calls after an append must merge the new bytes once; entries are replaced, never changed in place.
+    with refresh_lock(f"stats-{encoding}", path):
+        identity = FileIdentity.of(path)
+        entry = _MEMORY_CACHE.get(key) or _load(key)
+        if entry is not None and not _is_append_of(entry, path, identity):
+            _forget(key)
+            entry = None
+
+        is_new = entry is None
+        if entry is None:
+            entry = StatsEntry(
+                path=str(path),
+                encoding=encoding,
+                identity=identity,
+                resume_offset=0,
+                fingerprint=prefix_fingerprint(path, 0),
+                stats=ScanStats(),
+            )
+
+        size = identity.size
+        complete_end = _complete_end(path, entry.resume_offset, size)
+        if complete_end > entry.resume_offset or is_new:
+            delta = _scan(path, encoding=encoding, workers=workers, start=entry.resume_offset, end=complete_end)
+            entry = replace(
+                entry,
+                identity=identity,
+                resume_offset=complete_end,
+                fingerprint=prefix_fingerprint(path, complete_end),
+                stats=entry.stats.merge(delta),
+            )
+            if size >= STATS_PERSIST_MIN_FILE_BYTES:
+                try:
+                    _save(key, entry, is_new=is_new)
+                except OSError:
+                    pass
+        elif entry.identity != identity:
+            entry = replace(entry, identity=identity)
+        _remember(key, entry, is_new=is_new)
+
+    # A trailing line without a newline may still be growing, so it is never cached.
+    partial = scan_stats(path, encoding=encoding, start=complete_end, end=size)
+    return entry.stats.merge(partial)
@@ -0,0 +1,233 @@
+"""Streaming summary of script output: counts, head and tail, and an index of notable lines.
+
+`script_runna` feeds every chunk its child writes through a
+`StreamSummary` on the way to the log file, so the usual follow-ups
+(`stats`, `tail`, `search ERROR` on `output_file`) come back with the
+result instead of re-reading a file that was just written.
+
+Chunks are handled a block of complete lines at a time: newlines are
+counted with `bytes.count`, and each pattern is planned like a `search`
+regex: the literals one of which every match must contain (`error`,
+`fatal`, ... for the default error pattern) are located with `bytes.find`,
+in a lowercased copy of the block for case-insensitive patterns, and the
+regex only runs on those lines. Only the lines it hits are sliced out. Memory is bounded by the head,
+tail, and hit limits (lines are kept up to `SUMMARY_LINE_KEEP_BYTES`),
+plus the output's first `keep_bytes`, which lets small outputs be returned
+inline without reading the log back.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import deque
+from collections.abc import Iterator
+
+from tools.reckoning.response import clip_line, omitted_marker, render_rows
+from tools.reckoning.search import literal_alternatives
+
+SUMMARY_HEAD_LINES = 20
+SUMMARY_TAIL_LINES = 40
+SUMMARY_MAX_HITS = 40
+SUMMARY_LINE_KEEP_BYTES = 4096
+SUMMARY_LINE_MAX_CHARS = 300
+# An unterminated line (e.g. `\r` progress output) longer than this keeps only its ends.
+SUMMARY_PARTIAL_MAX_BYTES = 4 * SUMMARY_LINE_KEEP_BYTES
+
+# Labels in priority order: a line is indexed under the first label whose pattern it matches.
+DEFAULT_PATTERNS = {
+    "error": r"(?i)\b(?:errors?|fatal|exception|traceback|panic)\b",
+    "failure": r"(?i)\b(?:fail|failed|failure|failures|failing)\b",
+    "warning": r"(?i)\bwarn(?:ing|ings)?\b",
+}
+
+
+class LinePattern:
+    """A summary regex over raw output bytes, with the literals that pick its candidate lines."""
+
+    def __init__(self, pattern: str):
+        self.regex = re.compile(pattern.encode("utf-8"), re.MULTILINE)
+        plan = literal_alternatives(pattern)
+        self.folded = False
+        self.literals: tuple[bytes, ...] | None = None
+        if plan is not None and all(literal.isascii() for literal in plan[0]):
+            literals, self.folded = plan
+            self.literals = tuple((literal.lower() if self.folded else literal).encode("ascii") for literal in literals)
+
+    def line_starts(self, block: bytes, lowered: bytes | None) -> Iterator[int]:
+        """Yield the start offset of every line of `block` the regex hits (not in order)."""
+        if self.literals is None:
+            pos = 0
+            while (match := self.regex.search(block, pos)) is not None:
+                yield block.rfind(b"\n", 0, match.start()) + 1
+                pos = block.find(b"\n", match.start()) + 1
+                if not pos:
+                    return
+            return
+        haystack = lowered if self.folded and lowered is not None else block
+        seen: set[int] = set()
+        for literal in self.literals:
+            pos = 0
+            while (idx := haystack.find(literal, pos)) >= 0:
+                ls = block.rfind(b"\n", 0, idx) + 1
+                le = block.find(b"\n", idx)
+                le = len(block) if le < 0 else le
+                if ls not in seen:
+                    seen.add(ls)
+                    if self.regex.search(block, ls, le) is not None:
+                        yield ls
+                pos = le + 1
+
+
+def compile_patterns(patterns: dict[str, str] | None) -> dict[str, LinePattern]:
+    """Compile `label -> regex` patterns (default: `DEFAULT_PATTERNS`) for matching raw output bytes."""
+    compiled: dict[str, LinePattern] = {}
+    for label, pattern in (DEFAULT_PATTERNS if patterns is None else patterns).items():
+        if not pattern:
+            raise ValueError(f"Pattern {label!r} in `summary_patterns` is empty.")
+        try:
+            compiled[label] = LinePattern(pattern)
+        except re.error as exc:
+            raise ValueError(f"Invalid regex for {label!r} in `summary_patterns`: {exc}") from exc
+    return compiled
+
+
+def _text(raw: bytes) -> str:
+    return raw.decode("utf-8", errors="replace").rstrip("\r")
+
+
+class StreamSummary:
+    """Incremental line/byte counts, head, tail, and pattern hits of a byte stream."""
+
+    def __init__(
+        self,
+        *,
+        patterns: dict[str, LinePattern],
+        head_lines: int = SUMMARY_HEAD_LINES,
+        tail_lines: int = SUMMARY_TAIL_LINES,
+        max_hits: int = SUMMARY_MAX_HITS,
+        keep_bytes: int = 0,
+    ):
+        self.patterns = patterns
+        self._fold = any(pattern.folded for pattern in patterns.values())
+        self.head_lines = head_lines
+        self.keep_bytes = keep_bytes
+        self.bytes = 0
+        self.lines = 0
+        self.prefix = bytearray()
+        self.counts = {label: 0 for label in patterns}
+        self._scanned = 0
+        self._partial = b""
+        # Bytes cut from the middle of the first line of the next block.
+        self._dropped = 0
+        self._head: list[bytes] = []
+        self._tail: deque[bytes] = deque(maxlen=tail_lines)
+        # The first and the last hits are kept; those in between are only counted.
+        self._first_hits: list[tuple[int, int, str, bytes]] = []
+        self._last_hits: deque[tuple[int, int, str, bytes]] = deque(maxlen=max_hits - max_hits // 2)
+        self._first_hits_max = max_hits // 2
+
+    def feed(self, data: bytes) -> None:
+        self.bytes += len(data)
+        if len(self.prefix) < self.keep_bytes:
+            self.prefix += data[: self.keep_bytes - len(self.prefix)]
+        block = self._partial + data if self._partial else data
+        cut = block.rfind(b"\n") + 1
+        self._partial = block[cut:]
+        if cut:
+            self._scan(block[:cut] if cut < len(block) else block)
+        if len(self._partial) > SUMMARY_PARTIAL_MAX_BYTES:
+            keep = SUMMARY_LINE_KEEP_BYTES
+            self._dropped += len(self._partial) - 2 * keep
+            self._partial = self._partial[:keep] + self._partial[-keep:]
+
+    def finish(self) -> None:
+        """Count a final line that has no newline."""
+        if self._partial:
+            partial, self._partial = self._partial, b""
+            self._scan(partial + b"\n")
+            self._scanned -= 1
+
+    def _scan(self, block: bytes) -> None:
+        """Account for a block of complete lines."""
+        first_line = self.lines + 1
+        newlines = block.count(b"\n")
+        if len(self._head) < self.head_lines:
+            need = min(self.head_lines - len(self._head), newlines)
+            self._head.extend(line[:SUMMARY_LINE_KEEP_BYTES] for line in block.split(b"\n", need)[:need])
+        take = min(self._tail.maxlen or 0, newlines)
+        start = len(block) - 1
+        for _ in range(take):
+            start = block.rfind(b"\n", 0, start)
+        if take:
+            self._tail.extend(line[:SUMMARY_LINE_KEEP_BYTES] for line in block[start + 1 : -1].split(b"\n"))
+
+        found: dict[int, str] = {}
+        lowered = block.lower() if self._fold else None
+        for label, pattern in self.patterns.items():
+            for ls in pattern.line_starts(block, lowered):
+                found.setdefault(ls, label)
+        line, counted = first_line, 0
+        for ls in sorted(found):
+            label = found[ls]
+            line += block.count(b"\n", counted, ls)
+            counted = ls
+            self.counts[label] += 1
+            le = block.find(b"\n", ls)
+            offset = self._scanned + ls + (self._dropped if ls else 0)
+            hit = (line, offset, label, block[ls : min(le, ls + SUMMARY_LINE_KEEP_BYTES)])
+            if len(self._first_hits) < self._first_hits_max:
+                self._first_hits.append(hit)
+            else:
+                self._last_hits.append(hit)
+        self.lines += newlines
+        self._scanned += len(block) + self._dropped
+        self._dropped = 0
+
+    def summary(self, *, max_chars: int, max_line_chars: int = SUMMARY_LINE_MAX_CHARS) -> dict[str, object]:
+        """Counts plus head, tail, and hits, rendered within about `max_chars` characters.
+
+        Hits get half of the budget, then head and tail split what is left.
+        Tail lines already shown in the head are left out.
+        """
+        # Hits are picked from both ends inwards, so a tight budget still shows the first and the last.
+        kept = [*self._first_hits, *self._last_hits]
+        order = [kept[i // 2] if i % 2 == 0 else kept[-1 - i // 2] for i in range(len(kept))]
+        hits: list[dict[str, object]] = []
+        used_chars = 0
+        for line, offset, label, raw in order:
+            hit = {"line": line, "offset": offset, "label": label, "text": clip_line(_text(raw), max_line_chars)}
+            size = len(json.dumps(hit))
+            if hits and used_chars + size > max_chars // 2:
+                break
+            hits.append(hit)
+            used_chars += size
+        hits.sort(key=lambda hit: hit["line"])
+
+        head_rows = [{"line": number, "raw": _text(raw) + "\n"} for number, raw in enumerate(self._head, start=1)]
+        tail_start = self.lines - len(self._tail) + 1
+        tail_rows = [
+            {"line": number, "raw": _text(raw) + "\n"}
+            for number, raw in enumerate(self._tail, start=tail_start)
+            if number > len(head_rows)
+        ]
+        budget = max(0, max_chars - used_chars) // (2 if tail_rows else 1)
+        head, head_used = render_rows(head_rows, max_chars=budget, max_line_chars=max_line_chars)
+        if head_used < len(head_rows):
+            head += omitted_marker(len(head_rows) - head_used)
+        tail, tail_used = "", 0
+        if tail_rows:
+            budget = max(0, max_chars - used_chars - len(head))
+            tail, tail_used = render_rows(tail_rows, max_chars=budget, max_line_chars=max_line_chars, from_end=True)
+            if tail_used < len(tail_rows):
+                tail = omitted_marker(len(tail_rows) - tail_used) + tail
+        return {
+            "lines": self.lines,
+            "bytes": self.bytes,
+            "counts": self.counts,
+            "hits": hits,
+            "hits_omitted": sum(self.counts.values()) - len(hits),
+            "head": head,
+            "tail_start_line": tail_rows[-tail_used]["line"] if tail_used else None,
+            "tail": tail,
+        }
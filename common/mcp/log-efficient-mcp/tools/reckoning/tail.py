@@ -0,0 +1,99 @@
+"""Reverse block reader that answers `tail` without touching the front of a file."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from tools.reckoning.line_index import cached_line_index
+from tools.reckoning.telemetry import tally
+
+TAIL_BLOCK_BYTES = 64 << 10
+
+
+def _count_newlines(path: Path, start: int, end: int) -> int:
+    count = 0
+    with path.open("rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(TAIL_BLOCK_BYTES, remaining))
+            if not chunk:
+                break
+            count += chunk.count(b"\n")
+            remaining -= len(chunk)
+    return count
+
+
+def line_number_at(path: Path, offset: int) -> int | None:
+    """Line number of the line starting at `offset`, if cheaply knowable."""
+    if offset == 0:
+        return 1
+    index = cached_line_index(path)
+    if index is None:
+        return None
+    cp_line, cp_offset = index.locate_offset(offset)
+    return cp_line + _count_newlines(path, cp_offset, offset)
+
+
+def read_tail(
+    path: Path,
+    *,
+    max_lines: int,
+    block_size: int = TAIL_BLOCK_BYTES,
+    size: int | None = None,
+) -> tuple[int | None, list[bytes]]:
+    """Return `(first line number or None, raw lines)` for the last `max_lines` lines.
+
+    Blocks are read backwards from EOF until enough newlines have been seen;
+    only the final window is returned. A missing trailing newline is handled
+    like text-mode reads: the last line is returned without a terminator.
+    The first line number is only reported when the read reached the start of
+    the file or a cached line index can resolve it without a forward scan.
+    `size` pins the logical end of file for callers that already stat'ed it.
+    """
+    if size is None:
+        size = path.stat().st_size
+    if size == 0 or max_lines <= 0:
+        return 1, []
+
+    blocks: list[bytes] = []
+    pos = size
+    newlines = 0
+    with path.open("rb") as f:
+        # A trailing newline terminates the last line; it does not start a new one.
+        f.seek(size - 1)
+        skip_final = 1 if f.read(1) == b"\n" else 0
+        while pos > 0 and newlines - skip_final < max_lines:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            block = f.read(read_size)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+
+    data = b"".join(reversed(blocks))
+    start, lines = last_lines(data, max_lines)
+    tally(bytes_read=len(data), lines=len(lines))
+    if pos == 0:
+        # The read covers the whole front of the file, so the line number is counted here.
+        return data.count(b"\n", 0, start) + 1, lines
+    return line_number_at(path, pos + start), lines
+
+
+def last_lines(data: bytes, max_lines: int) -> tuple[int, list[bytes]]:
+    """Split the last `max_lines` lines off `data`; return `(start offset, raw lines)`."""
+    cut = len(data) - (1 if data.endswith(b"\n") else 0)
+    for _ in range(max_lines):
+        cut = data.rfind(b"\n", 0, cut)
+        if cut < 0:
+            break
+    start = cut + 1 if cut >= 0 else 0
+    window = data[start:]
+    if not window:
+        return start, []
+
+    lines = [line + b"\n" for line in window.split(b"\n")]
+    lines[-1] = lines[-1][:-1]
+    if not lines[-1]:
+        lines.pop()
+    return start, lines
@@ -0,0 +1,45 @@
+"""Per-call work counters filled in by the scan engines.
+
+A dispatched tool call (see `tools.dispatch`) runs with a `CallCounters` in
+a context variable; engines report the bytes they read and the lines they
+scanned with `tally()`, once per region or chunk rather than per line.
+Outside a dispatched call (direct calls, tests, pool worker processes) it is
+a no-op; process-pool work is counted by the parent as chunk results arrive.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass
+class CallCounters:
+    bytes_read: int = 0
+    lines_scanned: int = 0
+    matches: int = 0
+
+
+_COUNTERS: ContextVar[CallCounters | None] = ContextVar("call_counters", default=None)
+
+
+@contextmanager
+def call_counters(counters: CallCounters | None = None) -> Iterator[CallCounters]:
+    counters = counters or CallCounters()
+    token = _COUNTERS.set(counters)
+    try:
+        yield counters
+    finally:
+        _COUNTERS.reset(token)
+
+
+def tally(*, bytes_read: int = 0, lines: int = 0, matches: int = 0) -> None:
+    """Add to the current call's counters; `matches` are matching (or returned) lines in the response."""
+    counters = _COUNTERS.get()
+    if counters is None:
+        return
+    counters.bytes_read += bytes_read
+    counters.lines_scanned += lines
+    counters.matches += matches
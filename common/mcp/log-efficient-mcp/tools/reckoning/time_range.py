@@ -0,0 +1,331 @@
+"""`time_range` slicing of timestamp-ordered logs by bisecting byte offsets.
+
+Each probe seeks to a byte offset, skips the partial line, and parses the
+first timestamp found within `TIME_PROBE_MAX_BYTES`; lines without one
+(stack traces, continuations) are skipped and belong to the entry above
+them. Once the remaining span is below `TIME_LINEAR_BYTES`, a forward scan
+finds the first line stamped at or after the start bound and streams lines
+until one is stamped at or after the end bound. Slightly out-of-order lines
+near the start bound may be missed; the window itself is streamed as-is.
+
+A truncated window reports where the next page starts (`next_byte`, or
+`next_line` for the streaming fallback); passing it back as `resume`
+continues inside the window without repeating the bisection.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from tools.reckoning.compression import iter_decompressed_lines
+from tools.reckoning.response import LINE_MAX_CHARS, RESPONSE_MAX_CHARS, clip_raw
+from tools.reckoning.source import decode_line, supports_byte_engine
+from tools.reckoning.tail import line_number_at
+from tools.reckoning.telemetry import tally
+from tools.reckoning.timestamps import TimestampFormat, is_time_of_day, parse_bound, resolve_format
+
+TIME_BLOCK_BYTES = 64 << 10
+TIME_PROBE_MAX_BYTES = 1 << 20
+TIME_LINEAR_BYTES = 256 << 10
+TIME_SAMPLE_LINES = 200
+# Only the head of a line is decoded to look for its timestamp.
+TIME_DECODE_BYTES = 512
+
+
+class _OffsetReader:
+    """Buffered forward line reader over `path[:size]` that counts block reads."""
+
+    def __init__(self, f, size: int):
+        self.f = f
+        self.size = size
+        self.reads = 0
+
+    def lines_from(self, offset: int) -> Iterator[tuple[int, bytes]]:
+        """Yield `(offset, raw line)` for every line starting at or after `offset`."""
+        if offset > 0:
+            # Start one byte early so a line beginning exactly at `offset` is kept.
+            offset -= 1
+            skip_partial = True
+        else:
+            skip_partial = False
+        self.f.seek(offset)
+        pos = offset
+        buf = b""
+        while pos + len(buf) < self.size:
+            block = self.f.read(min(TIME_BLOCK_BYTES, self.size - pos - len(buf)))
+            self.reads += 1
+            tally(bytes_read=len(block))
+            if not block:
+                break
+            buf += block
+            start = 0
+            while True:
+                nl = buf.find(b"\n", start)
+                if nl == -1:
+                    break
+                if not skip_partial:
+                    yield pos, buf[start : nl + 1]
+                skip_partial = False
+                pos += nl + 1 - start
+                start = nl + 1
+            buf = buf[start:]
+        if buf and not skip_partial:
+            yield pos, buf
+
+
+def _line_time(raw: bytes, fmt: TimestampFormat, encoding: str) -> datetime | None:
+    return fmt.line_time(raw[:TIME_DECODE_BYTES].decode(encoding, errors="replace"))
+
+
+def _first_stamp(reader: _OffsetReader, offset: int, fmt: TimestampFormat, encoding: str):
+    """`(line offset, time)` of the first stamped line at or after `offset`, or None."""
+    for line_offset, raw in reader.lines_from(offset):
+        if line_offset - offset > TIME_PROBE_MAX_BYTES:
+            return None
+        stamp = _line_time(raw, fmt, encoding)
+        if stamp is not None:
+            return line_offset, stamp
+    return None
+
+
+def _lower_bound(reader: _OffsetReader, start: datetime, fmt: TimestampFormat, encoding: str) -> int:
+    """Byte offset from which a forward scan reaches the first line stamped at or after `start`."""
+    lo, hi = 0, reader.size
+    while hi - lo > TIME_LINEAR_BYTES:
+        mid = (lo + hi) // 2
+        found = _first_stamp(reader, mid, fmt, encoding)
+        if found is None or found[1] >= start:
+            hi = mid
+        else:
+            lo = found[0] + 1
+    return lo
+
+
+def _window(
+    lines: Iterable[tuple[int, bytes]],
+    *,
+    fmt: TimestampFormat,
+    start: datetime | None,
+    end: datetime | None,
+    max_lines: int,
+    encoding: str,
+    inside: bool = False,
+    max_bytes: int = RESPONSE_MAX_CHARS,
+) -> tuple[list[tuple[int, bytes]], bool]:
+    """Collect lines from the first one stamped at/after `start` until one stamped at/after `end`.
+
+    `inside` means the lines already start within the window (a resumed page).
+    Collection stops early (truncated) at `max_lines` lines or `max_bytes` raw bytes.
+    """
+    rows: list[tuple[int, bytes]] = []
+    size = 0
+    scanned = 0
+    inside = inside or start is None
+    truncated = False
+    for key, raw in lines:
+        scanned += 1
+        stamp = _line_time(raw, fmt, encoding)
+        if not inside:
+            if stamp is None or stamp < start:
+                continue
+            inside = True
+        if end is not None and stamp is not None and stamp >= end:
+            break
+        if len(rows) >= max_lines or (rows and size + len(raw) > max_bytes):
+            truncated = True
+            break
+        rows.append((key, raw))
+        size += len(raw)
+    tally(lines=scanned)
+    return rows, truncated
+
+
+def _sample(lines: Iterable[tuple[int, bytes]], encoding: str) -> list[str]:
+    sample = []
+    for _, raw in lines:
+        sample.append(raw[:TIME_DECODE_BYTES].decode(encoding, errors="replace"))
+        if len(sample) >= TIME_SAMPLE_LINES:
+            break
+    return sample
+
+
+def _bounds(
+    sample: list[str], *, start_time: str, end_time: str, time_format: str
+) -> tuple[TimestampFormat, datetime | None, datetime | None]:
+    fmt = resolve_format(time_format, sample)
+    reference = next((stamp for stamp in map(fmt.line_time, sample) if stamp is not None), None)
+    start = parse_bound(start_time, fmt, reference) if start_time.strip() else None
+    end = parse_bound(end_time, fmt, reference) if end_time.strip() else None
+    if start is not None and end is not None and end <= start and is_time_of_day(end_time):
+        # A bare `23:50`..`00:10` window wraps past midnight.
+        end += timedelta(days=1)
+    return fmt, start, end
+
+
+def _result(
+    fmt: TimestampFormat,
+    start: datetime | None,
+    end: datetime | None,
+    rows: list[tuple[int, bytes]],
+    truncated: bool,
+    *,
+    encoding: str,
+    first_line: int | None,
+    first_byte: int | None = None,
+    reads: int | None = None,
+    byte_offsets: bool = False,
+    max_line_chars: int = LINE_MAX_CHARS,
+) -> dict[str, object]:
+    next_byte = next_line = None
+    if truncated and rows:
+        last_key, last_raw = rows[-1]
+        if byte_offsets:
+            next_byte = last_key + len(last_raw)
+        else:
+            next_line = last_key + 1
+    return {
+        "format": fmt.name,
+        "start_time": start.isoformat() if start is not None else None,
+        "end_time": end.isoformat() if end is not None else None,
+        "first_line": first_line,
+        "first_byte": first_byte,
+        "lines": len(rows),
+        "truncated": truncated,
+        "next_byte": next_byte,
+        "next_line": next_line,
+        "reads": reads,
+        "content": "".join(clip_raw(decode_line(raw, encoding), max_line_chars) for _, raw in rows),
+    }
+
+
+def _linear_window(
+    path: Path,
+    *,
+    start_time: str,
+    end_time: str,
+    time_format: str,
+    max_lines: int,
+    encoding: str,
+    compression: str | None,
+    resume_line: int | None = None,
+    max_chars: int = RESPONSE_MAX_CHARS,
+    max_line_chars: int = LINE_MAX_CHARS,
+) -> dict[str, object]:
+    """Streaming fallback for compressed files and non-ASCII-compatible encodings."""
+
+    def lines(start_line: int = 1) -> Iterator[tuple[int, bytes]]:
+        if compression:
+            for idx, raw in iter_decompressed_lines(path, compression, start_line=start_line):
+                if idx >= start_line:
+                    yield idx, raw
+            return
+        with path.open("r", encoding=encoding, errors="replace", newline="") as f:
+            for idx, line in enumerate(f, start=1):
+                if idx >= start_line:
+                    yield idx, line.encode("utf-8")
+
+    line_encoding = encoding if compression else "utf-8"
+    fmt, start, end = _bounds(
+        _sample(lines(), line_encoding), start_time=start_time, end_time=end_time, time_format=time_format
+    )
+    rows, truncated = _window(
+        lines(resume_line or 1),
+        fmt=fmt,
+        start=start,
+        end=end,
+        max_lines=max_lines,
+        encoding=line_encoding,
+        inside=resume_line is not None,
+        max_bytes=max_chars,
+    )
+    first_line = rows[0][0] if rows else None
+    return _result(
+        fmt,
+        start,
+        end,
+        rows,
+        truncated,
+        encoding=line_encoding,
+        first_line=first_line,
+        max_line_chars=max_line_chars,
+    )
+
+
+def time_window(
+    path: Path,
+    *,
+    start_time: str,
+    end_time: str,
+    time_format: str = "",
+    max_lines: int,
+    encoding: str,
+    compression: str | None = None,
+    resume: tuple[int, int] | None = None,
+    max_chars: int = RESPONSE_MAX_CHARS,
+    max_line_chars: int = LINE_MAX_CHARS,
+) -> dict[str, object]:
+    """Return the lines of `path` stamped in `[start_time, end_time)`, capped at `max_lines`.
+
+    `resume` is `(next_byte, next_line)` from a truncated result; only the
+    field matching the mode that produced it is used. The window also stops
+    once `max_chars` raw bytes were collected; lines are clipped to `max_line_chars`.
+    """
+    if not start_time.strip() and not end_time.strip():
+        raise ValueError("`time_range` needs `start_time`, `end_time`, or both.")
+
+    if compression or not supports_byte_engine(encoding):
+        return _linear_window(
+            path,
+            start_time=start_time,
+            end_time=end_time,
+            time_format=time_format,
+            max_lines=max_lines,
+            encoding=encoding,
+            compression=compression,
+            resume_line=resume[1] if resume is not None else None,
+            max_chars=max_chars,
+            max_line_chars=max_line_chars,
+        )
+
+    size = path.stat().st_size
+    with path.open("rb") as f:
+        reader = _OffsetReader(f, size)
+        fmt, start, end = _bounds(
+            _sample(reader.lines_from(0), encoding),
+            start_time=start_time,
+            end_time=end_time,
+            time_format=time_format,
+        )
+        if resume is not None:
+            offset = resume[0]
+        else:
+            offset = _lower_bound(reader, start, fmt, encoding) if start is not None else 0
+        rows, truncated = _window(
+            reader.lines_from(offset),
+            fmt=fmt,
+            start=start,
+            end=end,
+            max_lines=max_lines,
+            encoding=encoding,
+            inside=resume is not None,
+            max_bytes=max_chars,
+        )
+        reads = reader.reads
+
+    first_byte = rows[0][0] if rows else None
+    first_line = line_number_at(path, first_byte) if first_byte is not None else None
+    return _result(
+        fmt,
+        start,
+        end,
+        rows,
+        truncated,
+        encoding=encoding,
+        first_line=first_line,
+        first_byte=first_byte,
+        reads=reads,
+        byte_offsets=True,
+        max_line_chars=max_line_chars,
+    )
@@ -0,0 +1,194 @@
+"""Timestamp detection and parsing for ordering and slicing log lines."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, time, timezone
+from typing import Callable, Iterable
+
+# ISO-8601-like stamps: `2024-05-01 12:00:00`, `2024-05-01T12:00:00.123Z`, `2024-05-01 12:00:00,123`.
+TIMESTAMP_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:[.,](\d{1,9}))?")
+TIMESTAMP_SEARCH_CHARS = 64
+# Stand-in year for formats without one (syslog); a leap year so `Feb 29` parses.
+YEARLESS_YEAR = 2000
+
+_MONTH_NAMES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+_MONTHS = {name: index for index, name in enumerate(_MONTH_NAMES, start=1)}
+
+
+@dataclass(frozen=True)
+class TimestampFormat:
+    """How to find and parse one kind of line timestamp.
+
+    `parse` returns a naive datetime; zone suffixes are ignored except for
+    epoch stamps, which are read as UTC.
+    """
+
+    name: str
+    pattern: re.Pattern[str]
+    parse: Callable[[re.Match[str]], datetime]
+    yearless: bool = False
+    epoch: bool = False
+
+    def line_time(self, text: str) -> datetime | None:
+        m = self.pattern.search(text, 0, TIMESTAMP_SEARCH_CHARS)
+        if m is None:
+            return None
+        try:
+            return self.parse(m)
+        except (ValueError, KeyError, OverflowError):
+            return None
+
+
+def _micros(fraction: str | None) -> int:
+    return int((fraction or "")[:6].ljust(6, "0"))
+
+
+def _parse_iso(m: re.Match[str]) -> datetime:
+    year, month, day, hour, minute, second, fraction = m.groups()
+    return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second), _micros(fraction))
+
+
+def _parse_clf(m: re.Match[str]) -> datetime:
+    day, month, year, hour, minute, second = m.groups()
+    return datetime(int(year), _MONTHS[month], int(day), int(hour), int(minute), int(second))
+
+
+def _parse_syslog(m: re.Match[str]) -> datetime:
+    month, day, hour, minute, second = m.groups()
+    return datetime(YEARLESS_YEAR, _MONTHS[month], int(day), int(hour), int(minute), int(second))
+
+
+def _parse_epoch(m: re.Match[str]) -> datetime:
+    seconds, fraction, millis = m.groups()
+    micros = _micros(fraction) if fraction else int(millis or 0) * 1000
+    stamp = datetime.fromtimestamp(int(seconds), timezone.utc).replace(microsecond=micros)
+    return stamp.replace(tzinfo=None)
+
+
+# Detection order doubles as the tie-break order.
+KNOWN_FORMATS = (
+    TimestampFormat("iso", TIMESTAMP_PATTERN, _parse_iso),
+    TimestampFormat("clf", re.compile(r"(\d{2})/([A-Z][a-z]{2})/(\d{4}):(\d{2}):(\d{2}):(\d{2})"), _parse_clf),
+    TimestampFormat(
+        "syslog", re.compile(r"\b([A-Z][a-z]{2}) ([ \d]?\d) (\d{2}):(\d{2}):(\d{2})\b"), _parse_syslog, yearless=True
+    ),
+    TimestampFormat("epoch", re.compile(r"\b(1\d{9})(?:\.(\d{1,9})|(\d{3}))?\b"), _parse_epoch, epoch=True),
+)
+
+_STRPTIME_FIELDS = {
+    "Y": r"\d{4}",
+    "y": r"\d{2}",
+    "m": r"\d{1,2}",
+    "d": r"\s?\d{1,2}",
+    "H": r"\d{1,2}",
+    "I": r"\d{1,2}",
+    "M": r"\d{1,2}",
+    "S": r"\d{1,2}",
+    "f": r"\d{1,6}",
+    "j": r"\d{1,3}",
+    "b": r"[A-Za-z]{3}",
+    "a": r"[A-Za-z]{3}",
+    "B": r"[A-Za-z]+",
+    "A": r"[A-Za-z]+",
+    "p": r"[AaPp][Mm]",
+    "z": r"(?:[+-]\d{2}:?\d{2}|Z)",
+    "Z": r"[A-Z]{2,5}",
+    "%": "%",
+}
+
+
+def strptime_format(fmt: str) -> TimestampFormat:
+    """Build a `TimestampFormat` from a `datetime.strptime` format string."""
+    parts: list[str] = []
+    i = 0
+    while i < len(fmt):
+        char = fmt[i]
+        if char == "%":
+            directive = fmt[i + 1 : i + 2]
+            if directive not in _STRPTIME_FIELDS:
+                raise ValueError(f"Unsupported `time_format` directive: %{directive}")
+            parts.append(_STRPTIME_FIELDS[directive])
+            i += 2
+            continue
+        parts.append(r"\s+" if char.isspace() else re.escape(char))
+        i += 1
+
+    def parse(m: re.Match[str]) -> datetime:
+        stamp = datetime.strptime(m.group(0), fmt).replace(tzinfo=None)
+        return stamp.replace(year=YEARLESS_YEAR) if yearless else stamp
+
+    yearless = "%Y" not in fmt and "%y" not in fmt
+    return TimestampFormat(fmt, re.compile("".join(parts)), parse, yearless=yearless)
+
+
+def detect_format(lines: Iterable[str]) -> TimestampFormat | None:
+    """Pick the known format that parses the most sample lines, or None if none do."""
+    sample = list(lines)
+    best: TimestampFormat | None = None
+    best_hits = 0
+    for fmt in KNOWN_FORMATS:
+        hits = sum(1 for line in sample if fmt.line_time(line) is not None)
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+    return best
+
+
+def resolve_format(time_format: str, sample: Iterable[str]) -> TimestampFormat:
+    """Resolve `time_format` (empty/`auto`, a known format name, or a strptime format)."""
+    name = time_format.strip()
+    if not name or name == "auto":
+        fmt = detect_format(sample)
+        if fmt is None:
+            raise ValueError("No known timestamp format found near the start of the file; pass `time_format`.")
+        return fmt
+    for fmt in KNOWN_FORMATS:
+        if fmt.name == name:
+            return fmt
+    if "%" in name:
+        return strptime_format(name)
+    known = ", ".join(fmt.name for fmt in KNOWN_FORMATS)
+    raise ValueError(f"Unknown `time_format` {name!r}; use {known}, or a strptime format such as %d/%b/%Y:%H:%M:%S.")
+
+
+def is_time_of_day(text: str) -> bool:
+    """True for a bare clock time such as `14:02` or `14:02:30.5`."""
+    return re.fullmatch(r"\d{1,2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?", text.strip()) is not None
+
+
+def parse_bound(text: str, fmt: TimestampFormat, reference: datetime | None) -> datetime:
+    """Parse a `start_time`/`end_time` bound into the same naive scale as `fmt` stamps.
+
+    Accepts ISO dates and date-times, the file's own format, epoch seconds, and
+    a bare time of day (`14:02`), which is taken on the date of `reference`.
+    """
+    value = text.strip()
+    stamp: datetime | None = None
+    try:
+        stamp = datetime.fromisoformat(value.replace("Z", "+00:00") if value.endswith("Z") else value)
+    except ValueError:
+        pass
+    if stamp is None and is_time_of_day(value):
+        if reference is None:
+            raise ValueError(f"Cannot resolve time of day {text!r}: no timestamp found in the file.")
+        try:
+            clock = time.fromisoformat(re.sub(r"^(\d):", r"0\1:", value.replace(",", ".")))
+        except ValueError:
+            clock = None
+        if clock is not None:
+            stamp = datetime.combine(reference.date(), clock)
+    if stamp is None:
+        m = fmt.pattern.fullmatch(value)
+        if m is not None:
+            stamp = fmt.parse(m)
+    if stamp is None and re.fullmatch(r"\d{9,10}(?:\.\d+)?", value):
+        stamp = datetime.fromtimestamp(float(value), timezone.utc)
+    if stamp is None:
+        raise ValueError(f"Cannot parse time bound {text!r}; use ISO-8601 such as 2024-05-01T14:02:00 or 14:02.")
+
+    if stamp.tzinfo is not None:
+        stamp = (stamp.astimezone(timezone.utc) if fmt.epoch else stamp).replace(tzinfo=None)
+    if fmt.yearless:
+        stamp = stamp.replace(year=YEARLESS_YEAR)
+    return stamp
@@ -0,0 +1,134 @@
+"""Batch mode for `script_runna`: several independent scripts run side by side.
+
+Up to `max_parallel` scripts run at once, each in its own process group
+with its own log file and `timeout_seconds`, so the call takes about as
+long as the slowest script rather than the sum of all of them. With
+`fail_fast`, the first script that does not succeed kills the running ones
+and the rest are skipped. Each script is summarized by its status, exit
+code, duration, output size, and its last error lines, read back from the
+end of its log.
+"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+from tools.reckoning.progress import ScanCancelled, checkpoint
+from tools.reckoning.response import clip_line, clip_raw
+from tools.reckoning.source import decode_line
+from tools.reckoning.tail import read_tail
+from tools.script_job import append_note, kill_process_group, spawn_script
+
+BATCH_MAX_SCRIPTS = 64
+BATCH_MAX_PARALLEL = 16
+BATCH_POLL_SECONDS = 0.05
+BATCH_ERROR_LINES = 5
+BATCH_TAIL_LINES = 200
+BATCH_LINE_MAX_CHARS = 300
+BATCH_SCRIPT_PREVIEW_CHARS = 120
+ERROR_LINE = re.compile(rb"error|fail|fatal|exception|traceback|panic", re.IGNORECASE)
+
+BatchStatus = Literal["ok", "failed", "timed_out", "cancelled", "skipped"]
+
+
+@dataclass
+class _Run:
+    index: int
+    script: str
+    output_file: Path
+    process: subprocess.Popen | None = None
+    started: float = 0.0
+    ended: float = 0.0
+    status: BatchStatus = "skipped"
+    exit_code: int | None = None
+
+    def finish(self, status: BatchStatus, note: str = "") -> None:
+        if self.process.poll() is None:
+            kill_process_group(self.process)
+        self.exit_code = self.process.wait()
+        self.ended = time.monotonic()
+        self.status = status
+        if note:
+            append_note(self.output_file, note)
+
+
+def last_errors(path: Path, *, fallback: bool) -> str:
+    """The last `BATCH_ERROR_LINES` error-looking lines near the end of `path` (its last lines with `fallback`)."""
+    _, lines = read_tail(path, max_lines=BATCH_TAIL_LINES)
+    picked = [line for line in lines if ERROR_LINE.search(line)][-BATCH_ERROR_LINES:]
+    if not picked and fallback:
+        picked = [line for line in lines if line.strip()][-BATCH_ERROR_LINES:]
+    text = (clip_raw(decode_line(line, "utf-8"), BATCH_LINE_MAX_CHARS) for line in picked)
+    return "".join(line if line.endswith("\n") else line + "\n" for line in text)
+
+
+def _summary(run: _Run) -> dict[str, object]:
+    entry: dict[str, object] = {
+        "index": run.index,
+        "script": clip_line(run.script, BATCH_SCRIPT_PREVIEW_CHARS),
+        "status": run.status,
+        "exit_code": run.exit_code,
+    }
+    if run.process is None:
+        return entry
+    return {
+        **entry,
+        "duration_seconds": round(run.ended - run.started, 3),
+        "output_file": str(run.output_file),
+        "output_size_bytes": run.output_file.stat().st_size,
+        "last_errors": last_errors(run.output_file, fallback=run.status != "ok"),
+    }
+
+
+def run_batch(
+    scripts: list[str],
+    *,
+    output_files: list[Path],
+    cwd: Path | None,
+    timeout_seconds: int,
+    max_parallel: int,
+    fail_fast: bool,
+) -> list[dict[str, object]]:
+    """Run `scripts` with at most `max_parallel` at once; return one summary per script, in order.
+
+    Cancelling the tool call kills every running script.
+    """
+    runs = [_Run(index, script, output_file) for index, (script, output_file) in enumerate(zip(scripts, output_files))]
+    pending = deque(runs)
+    running: list[_Run] = []
+    stopped = False
+    try:
+        while running or (pending and not stopped):
+            while pending and not stopped and len(running) < max_parallel:
+                run = pending.popleft()
+                run.started = time.monotonic()
+                run.process = spawn_script(run.script, run.output_file, cwd)
+                running.append(run)
+            time.sleep(BATCH_POLL_SECONDS)
+            now = time.monotonic()
+            for run in list(running):
+                exit_code = run.process.poll()
+                if exit_code is not None:
+                    run.finish("ok" if exit_code == 0 else "failed")
+                elif now - run.started >= timeout_seconds:
+                    run.finish("timed_out", f"timeout after {timeout_seconds}s")
+                else:
+                    continue
+                running.remove(run)
+                stopped = stopped or (fail_fast and run.status != "ok")
+            if stopped:
+                for run in running:
+                    run.finish("cancelled", "cancelled by fail_fast after another script failed")
+                running.clear()
+            checkpoint(len(runs) - len(pending) - len(running), len(runs))
+    except ScanCancelled:
+        for run in running:
+            run.finish("cancelled", "cancelled")
+        raise
+    return [_summary(run) for run in runs]
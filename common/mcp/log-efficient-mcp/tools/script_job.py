@@ -0,0 +1,286 @@
+"""Background `script_runna` jobs and the `script_job` tool that polls and cancels them.
+
+`script_runna(background=True)` starts the script, registers it in `JOBS`
+and returns its `job_id` and `output_file` at once. A watcher thread per
+job enforces `timeout_seconds` and records the exit code. `script_job`
+reports a job's state and elapsed time, returns the output appended since
+a cursor (through `follow`), and cancels jobs.
+
+At most `SCRIPT_JOBS_MAX_RUNNING` jobs run at once. Finished jobs are
+forgotten `SCRIPT_JOB_RETENTION_SECONDS` after they end, or sooner once
+more than `SCRIPT_JOBS_KEEP_FINISHED` have finished; their log files stay.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Literal
+
+from tools.dispatch import offloaded_tool
+from tools.reckoning.follow import FOLLOW_POLL_SECONDS, follow, start_cursor
+from tools.reckoning.progress import checkpoint
+
+SCRIPT_JOBS_MAX_RUNNING = 8
+SCRIPT_JOBS_KEEP_FINISHED = 32
+SCRIPT_JOB_RETENTION_SECONDS = 3600
+SCRIPT_JOB_CANCEL_WAIT_SECONDS = 5.0
+
+JobState = Literal["running", "exited", "timed_out", "cancelled"]
+
+
+def kill_process_group(process: subprocess.Popen) -> None:
+    """Kill the whole process group of a script started with `start_new_session`, so its children die with it."""
+    if process.poll() is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def spawn_script(script: str, output_file: Path, cwd: Path | None) -> subprocess.Popen:
+    """Start `script` under `bash -lc` in a new process group, with combined output written to `output_file`."""
+    # The child keeps its own copy of the descriptor; notes are appended later by reopening the file.
+    with output_file.open("w", encoding="utf-8", errors="replace") as out:
+        return subprocess.Popen(
+            ["bash", "-lc", script],
+            stdout=out,
+            stderr=subprocess.STDOUT,
+            text=True,
+            cwd=str(cwd) if cwd else None,
+            start_new_session=True,
+        )
+
+
+def append_note(output_file: Path, note: str) -> None:
+    """Append a `[script_runna]` note on its own line after the script's output."""
+    with output_file.open("a", encoding="utf-8") as out:
+        out.write(f"\n[script_runna] {note}\n")
+
+
+def _ends_with_newline(path: Path) -> bool:
+    with path.open("rb") as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+@dataclass
+class ScriptJob:
+    """One background script and what is known about it so far."""
+
+    job_id: str
+    script: str
+    output_file: Path
+    timeout_seconds: int
+    process: subprocess.Popen
+    cursor: str
+    started: float = field(default_factory=time.monotonic)
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    ended: float | None = None
+    exit_code: int | None = None
+    state: JobState = "running"
+    cancel_requested: bool = False
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def elapsed_seconds(self) -> float:
+        return round((self.ended if self.ended is not None else time.monotonic()) - self.started, 3)
+
+    def describe(self) -> dict[str, object]:
+        try:
+            size_bytes = self.output_file.stat().st_size
+        except OSError:
+            size_bytes = None
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "exit_code": self.exit_code,
+            "elapsed_seconds": self.elapsed_seconds(),
+            "started_at": self.started_at,
+            "timeout_seconds": self.timeout_seconds,
+            "output_file": str(self.output_file),
+            "output_size_bytes": size_bytes,
+        }
+
+
+class JobRegistry:
+    """Running and recently finished background jobs, keyed by `job_id`."""
+
+    def __init__(
+        self,
+        *,
+        max_running: int = SCRIPT_JOBS_MAX_RUNNING,
+        keep_finished: int = SCRIPT_JOBS_KEEP_FINISHED,
+        retention_seconds: float = SCRIPT_JOB_RETENTION_SECONDS,
+    ):
+        self.max_running = max_running
+        self.keep_finished = keep_finished
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._jobs: dict[str, ScriptJob] = {}
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        finished = sorted(
+            (job for job in self._jobs.values() if job.ended is not None), key=lambda job: job.ended or 0.0
+        )
+        expired = [job for job in finished if now - (job.ended or now) > self.retention_seconds]
+        expired += finished[len(expired) : max(len(expired), len(finished) - self.keep_finished)]
+        for job in expired:
+            del self._jobs[job.job_id]
+
+    def start(self, script: str, *, output_file: Path, cwd: Path | None, timeout_seconds: int) -> ScriptJob:
+        """Start `script` in its own process group with output to `output_file`; raise ValueError when full."""
+        with self._lock:
+            self._prune()
+            running = sum(1 for job in self._jobs.values() if job.ended is None)
+            if running >= self.max_running:
+                raise ValueError(
+                    f"{running} background jobs are already running (limit {self.max_running}); "
+                    "wait for one to finish or cancel it with `script_job`."
+                )
+            process = spawn_script(script, output_file, cwd)
+            job = ScriptJob(
+                job_id=uuid.uuid4().hex[:12],
+                script=script,
+                output_file=output_file,
+                timeout_seconds=timeout_seconds,
+                process=process,
+                cursor=start_cursor(output_file),
+            )
+            self._jobs[job.job_id] = job
+        threading.Thread(target=self._watch, args=(job,), name=f"script-job-{job.job_id}", daemon=True).start()
+        return job
+
+    def _watch(self, job: ScriptJob) -> None:
+        state: JobState = "exited"
+        try:
+            exit_code = job.process.wait(timeout=job.timeout_seconds)
+        except subprocess.TimeoutExpired:
+            state = "timed_out"
+            kill_process_group(job.process)
+            exit_code = job.process.wait()
+        if job.cancel_requested and state == "exited":
+            state = "cancelled"
+        # Notes go in before the state changes, so a poll that sees the job finished also sees all of its output.
+        if state == "timed_out":
+            append_note(job.output_file, f"timeout after {job.timeout_seconds}s")
+        elif state == "cancelled":
+            append_note(job.output_file, "cancelled")
+        elif not _ends_with_newline(job.output_file):
+            # `follow` only returns complete lines.
+            with job.output_file.open("a", encoding="utf-8") as out:
+                out.write("\n")
+        with self._lock:
+            job.exit_code, job.ended, job.state = exit_code, time.monotonic(), state
+        job.done.set()
+
+    def get(self, job_id: str) -> ScriptJob:
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise ValueError(
+                f"Unknown `job_id`: {job_id!r}. Finished jobs are forgotten after a while; their `output_file` remains."
+            )
+        return job
+
+    def jobs(self) -> list[ScriptJob]:
+        with self._lock:
+            self._prune()
+            return sorted(self._jobs.values(), key=lambda job: job.started)
+
+    def cancel(self, job_id: str) -> ScriptJob:
+        """Kill a running job and wait briefly for its watcher to record the outcome."""
+        job = self.get(job_id)
+        with self._lock:
+            if job.ended is None:
+                job.cancel_requested = True
+                kill_process_group(job.process)
+        job.done.wait(SCRIPT_JOB_CANCEL_WAIT_SECONDS)
+        return job
+
+
+JOBS = JobRegistry()
+
+
+def _poll(job: ScriptJob, cursor: str, max_lines: int, wait_seconds: float) -> dict[str, object]:
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        # Checked before reading: once the job has ended its output is complete.
+        finished = job.done.is_set()
+        output = follow(job.output_file, cursor=cursor, max_lines=max_lines, wait_seconds=0, encoding="utf-8")
+        if output["lines"] or finished or time.monotonic() >= deadline:
+            break
+        checkpoint()
+        job.done.wait(min(FOLLOW_POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+    return {
+        **job.describe(),
+        "content": output["content"],
+        "start_line": output["start_line"],
+        "lines": output["lines"],
+        "has_more": output["has_more"],
+        "complete": finished and not output["has_more"],
+        "cursor": output["cursor"],
+    }
+
+
+@offloaded_tool("script_job")
+def script_job(
+    action: Literal["poll", "status", "cancel", "list"] = "poll",
+    job_id: str = "",
+    cursor: str = "",
+    max_lines: int = 200,
+    wait_seconds: float = 0,
+) -> dict[str, object]:
+    """Check on, read from, or cancel a background `script_runna` job.
+
+    When to use:
+    - After `script_runna(background=True)` returned a `job_id` for a long build, test suite, or install.
+    - Watching a long script's output as it is written, without waiting for it to end.
+
+    When not to use:
+    - Short scripts: run `script_runna` without `background`.
+    - Searching a finished job's log: use `log_explore` on its `output_file`.
+
+    Actions:
+    - `poll`: state, exit code, and elapsed time plus complete output lines written since `cursor`
+      (from line 1 without one), at most `max_lines`, and the `cursor` for the next poll. Waits up
+      to `wait_seconds` for new output or the end of the job. `complete` is true once the job has
+      ended and all of its output has been returned.
+    - `status`: state, exit code, elapsed time, and output size without any output.
+    - `cancel`: kill the job's process group; the log keeps the output written so far.
+    - `list`: all running and recently finished jobs.
+
+    States are `running`, `exited`, `timed_out`, and `cancelled`. Finished jobs are forgotten after
+    an hour or once 32 newer jobs have finished; their `output_file` stays on disk.
+    """
+    if action == "list":
+        jobs = JOBS.jobs()
+        return {
+            "action": action,
+            "running": sum(1 for job in jobs if job.state == "running"),
+            "max_running": JOBS.max_running,
+            "jobs": [job.describe() for job in jobs],
+        }
+    if not job_id:
+        raise ValueError(f"`job_id` is required for the {action} action.")
+    if action == "cancel":
+        return {"action": action, **JOBS.cancel(job_id).describe()}
+    job = JOBS.get(job_id)
+    if action == "status":
+        return {"action": action, **job.describe()}
+    if action != "poll":
+        raise ValueError(f"Unsupported action: {action}")
+    max_lines = max(1, min(max_lines, 5000))
+    wait_seconds = max(0.0, min(wait_seconds, 60.0))
+    return {"action": action, **_poll(job, cursor or job.cursor, max_lines, wait_seconds)}
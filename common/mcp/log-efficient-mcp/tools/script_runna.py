@@ -2,12 +2,82 @@
 
 from __future__ import annotations
 
+import os
 import subprocess
+import threading
 import time
+import uuid
 from pathlib import Path
 from typing import Literal
 
-from mcp_app import mcp
+from tools.dispatch import offloaded_tool
+from tools.reckoning.progress import ScanCancelled, checkpoint
+from tools.reckoning.stream_summary import StreamSummary, compile_patterns
+from tools.script_batch import BATCH_MAX_PARALLEL, BATCH_MAX_SCRIPTS, run_batch
+from tools.script_job import JOBS, kill_process_group
+
+SCRIPT_POLL_SECONDS = 0.2
+SCRIPT_TEE_CHUNK_BYTES = 64 << 10
+# How long to keep draining output after the script exits, in case a background child still holds the pipe.
+SCRIPT_DRAIN_SECONDS = 2.0
+
+
+class _Tee(threading.Thread):
+    """Copies the child's output to the log file and through a `StreamSummary` as it arrives."""
+
+    def __init__(self, source, sink, summary: StreamSummary):
+        super().__init__(name="script-runna-tee", daemon=True)
+        self.source = source
+        self.sink = sink
+        self.summary = summary
+        self.lock = threading.Lock()
+        self._eof = False
+        self._released = False
+
+    def run(self) -> None:
+        try:
+            while chunk := os.read(self.source.fileno(), SCRIPT_TEE_CHUNK_BYTES):
+                self.write(chunk)
+        finally:
+            self.source.close()
+            with self.lock:
+                self._eof = True
+                if self._released:
+                    self.sink.close()
+
+    def write(self, data: bytes) -> None:
+        with self.lock:
+            self.sink.write(data)
+            self.summary.feed(data)
+
+    def release(self) -> None:
+        """Close the log file now, or once the pipe closes if a background child still writes to it."""
+        with self.lock:
+            self._released = True
+            if self._eof:
+                self.sink.close()
+
+
+def _wait(process: subprocess.Popen, timeout_seconds: int, output_file: Path) -> int:
+    """Wait for `process` like `subprocess.run`, killing its process group on timeout or when the call is cancelled.
+
+    The size of `output_file` is reported as progress while waiting.
+    """
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        try:
+            return process.wait(timeout=max(0.0, min(SCRIPT_POLL_SECONDS, deadline - time.monotonic())))
+        except subprocess.TimeoutExpired:
+            if time.monotonic() >= deadline:
+                kill_process_group(process)
+                process.wait()
+                raise
+        try:
+            checkpoint(output_file.stat().st_size)
+        except ScanCancelled:
+            kill_process_group(process)
+            process.wait()
+            raise
 
 
 def _resolve_script_log_dir(requested_dir: str) -> tuple[Path, bool]:
@@ -21,14 +91,20 @@ def _resolve_script_log_dir(requested_dir: str) -> tuple[Path, bool]:
         return fallback.resolve(), True
 
 
-@mcp.tool(name="script_runna")
+@offloaded_tool("script_runna")
 def script_runna(
-    script: str,
+    script: str = "",
     output_dir: str = "/temp/script-runna/logs",
     inline_output_epsilon: int = 4000,
     timeout_seconds: int = 1800,
     cwd: str = "",
     return_mode: Literal["auto", "path_only", "inline_only"] = "auto",
+    summary_max_chars: int = 3000,
+    summary_patterns: dict[str, str] | None = None,
+    background: bool = False,
+    scripts: list[str] | None = None,
+    max_parallel: int = 4,
+    fail_fast: bool = False,
 ) -> dict[str, object]:
     """Run a bash script while controlling context-window impact for agents.
 
@@ -48,22 +124,48 @@ def script_runna(
     - Use `return_mode="path_only"` for noisy tasks (installs, builds, tests, long logs).
     - Use `return_mode="auto"` for normal tasks; only small outputs are returned inline.
     - Use `return_mode="inline_only"` only when immediate text output is required.
+    - Use `background=True` for builds and test suites that take minutes; poll with `script_job`.
+    - Use `scripts=[...]` for independent commands (lint, tests per package, builds per target).
     - For large outputs, chain with `log_explore` on the returned `output_file`.
     - Reserve direct shell execution (`exec_command`) for short checks like `pwd`, `ls`, and compact `rg` queries.
 
     Core behavior:
     - Combined `stdout` + `stderr` is always persisted to a log file.
     - Response payload is controlled by `return_mode` and `inline_output_epsilon`.
+    - When the output is not returned inline, `summary` gives its line/byte counts, head, tail, and
+      the lines matching `summary_patterns` (label -> regex; default error, failure, and warning)
+      with line numbers and byte offsets, within `summary_max_chars` (0 disables it). It is built
+      while the log is written, so it usually replaces `log_explore` `stats`/`tail`/`search` follow-ups.
+    - Runs off the event loop; cancelling the call kills the script and its children.
+    - `background=True` returns `job_id`, `output_file`, and a `cursor` at once, ignoring
+      `return_mode`; `script_job` then polls output since the cursor, reports the exit code and
+      elapsed time, or cancels. `timeout_seconds` still applies.
+    - `scripts` runs a batch instead of `script`: up to `max_parallel` at once, each with its own
+      log file and `timeout_seconds`. `fail_fast=True` kills the rest after the first failure.
+      Returns per-script status, exit code, duration, output size, and last error lines.
     """
-    if not script.strip():
+    if scripts is not None:
+        if script:
+            raise ValueError("Pass either `script` or `scripts`, not both.")
+        if background:
+            raise ValueError("`background` runs a single `script`; start one job per script instead.")
+        if not scripts or any(not item.strip() for item in scripts):
+            raise ValueError("`scripts` must be a non-empty list of non-empty scripts.")
+        if len(scripts) > BATCH_MAX_SCRIPTS:
+            raise ValueError(f"`scripts` accepts at most {BATCH_MAX_SCRIPTS} scripts.")
+    elif not script.strip():
         raise ValueError("`script` cannot be empty.")
 
     inline_output_epsilon = max(0, min(inline_output_epsilon, 200_000))
+    summary_max_chars = max(0, min(summary_max_chars, 200_000))
+    patterns = compile_patterns(summary_patterns)
     timeout_seconds = max(1, min(timeout_seconds, 86_400))
 
     log_dir, used_fallback_dir = _resolve_script_log_dir(output_dir)
     timestamp_ms = int(time.time() * 1000)
-    output_file = log_dir / f"script-{timestamp_ms}.log"
+    # The suffix keeps concurrent calls (and background jobs) started in the same millisecond apart.
+    stem = f"script-{timestamp_ms}-{uuid.uuid4().hex[:6]}"
+    output_file = log_dir / f"{stem}.log"
 
     run_cwd = Path(cwd).expanduser().resolve() if cwd else None
     if run_cwd and not run_cwd.exists():
@@ -71,25 +173,69 @@ def script_runna(
     if run_cwd and not run_cwd.is_dir():
         raise ValueError(f"`cwd` is not a directory: {run_cwd}")
 
+    if scripts is not None:
+        began = time.monotonic()
+        results = run_batch(
+            scripts,
+            output_files=[log_dir / f"{stem}-{index + 1}.log" for index in range(len(scripts))],
+            cwd=run_cwd,
+            timeout_seconds=timeout_seconds,
+            max_parallel=max(1, min(max_parallel, BATCH_MAX_PARALLEL)),
+            fail_fast=fail_fast,
+        )
+        statuses = [str(entry["status"]) for entry in results]
+        return {
+            "exit_code": 0 if all(status == "ok" for status in statuses) else 1,
+            "counts": {status: statuses.count(status) for status in dict.fromkeys(statuses)},
+            "wall_seconds": round(time.monotonic() - began, 3),
+            "script_seconds": round(sum(float(entry.get("duration_seconds", 0)) for entry in results), 3),
+            "scripts": results,
+            "used_fallback_output_dir": used_fallback_dir,
+        }
+
+    if background:
+        job = JOBS.start(script, output_file=output_file, cwd=run_cwd, timeout_seconds=timeout_seconds)
+        return {
+            "job_id": job.job_id,
+            "state": job.state,
+            "output_file": str(output_file),
+            "cursor": job.cursor,
+            "timeout_seconds": timeout_seconds,
+            "used_fallback_output_dir": used_fallback_dir,
+        }
+
     timed_out = False
     exit_code = -1
-    with output_file.open("w", encoding="utf-8", errors="replace") as out:
-        try:
-            completed = subprocess.run(
-                ["bash", "-lc", script],
-                stdout=out,
-                stderr=subprocess.STDOUT,
-                text=True,
-                timeout=timeout_seconds,
-                cwd=str(run_cwd) if run_cwd else None,
-                check=False,
-            )
-            exit_code = completed.returncode
-        except subprocess.TimeoutExpired:
-            timed_out = True
-            out.write(f"\n[script_runna] timeout after {timeout_seconds}s\n")
+    summary = StreamSummary(patterns=patterns, keep_bytes=inline_output_epsilon)
+    out = output_file.open("wb", buffering=0)
+    try:
+        process = subprocess.Popen(
+            ["bash", "-lc", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            cwd=str(run_cwd) if run_cwd else None,
+            start_new_session=True,
+        )
+    except BaseException:
+        out.close()
+        raise
+    tee = _Tee(process.stdout, out, summary)
+    tee.start()
+    try:
+        exit_code = _wait(process, timeout_seconds, output_file)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+    finally:
+        tee.join(SCRIPT_DRAIN_SECONDS)
+        if timed_out:
+            tee.write(f"\n[script_runna] timeout after {timeout_seconds}s\n".encode())
+        with tee.lock:
+            summary.finish()
+            size_bytes = summary.bytes
+            inline = bytes(summary.prefix) if size_bytes <= inline_output_epsilon else None
+            digest = summary.summary(max_chars=summary_max_chars) if summary_max_chars else None
+        tee.release()
 
-    size_bytes = output_file.stat().st_size
     if return_mode == "path_only":
         return {
             "exit_code": exit_code,
@@ -98,10 +244,12 @@ def script_runna(
             "output_size_bytes": size_bytes,
             "used_fallback_output_dir": used_fallback_dir,
             "return_mode": return_mode,
+            **({"summary": digest} if digest else {}),
         }
 
-    if return_mode == "auto" and size_bytes <= inline_output_epsilon:
-        output = output_file.read_text(encoding="utf-8", errors="replace")
+    if return_mode == "auto" and inline is not None:
+        # Same newline handling as `read_text`, without reading the log back.
+        output = inline.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
         return {
             "exit_code": exit_code,
             "timed_out": timed_out,
@@ -131,4 +279,5 @@ def script_runna(
         "output_size_bytes": size_bytes,
         "used_fallback_output_dir": used_fallback_dir,
         "return_mode": return_mode,
+        **({"summary": digest} if digest else {}),
     }